@@ -20,6 +20,10 @@ class SkbioObject(with_metaclass(ABCMeta, object)):
     be implemented in subclasses, otherwise they will not be instantiable.
 
     """
+    # subclasses that do not define __slots__ still get a __dict__; this
+    # allows the ones that do to be compact
+    __slots__ = ()
+
     @abstractmethod
     def __str__(self):
         pass
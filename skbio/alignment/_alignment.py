@@ -8,18 +8,17 @@
 
 from __future__ import absolute_import, division, print_function
 from future.builtins import zip, range
-from future.utils import viewkeys, viewitems
 from six import StringIO
 
+import numbers
 from collections import Counter, defaultdict, OrderedDict
 
 import numpy as np
-from scipy.stats import entropy
 
 from skbio._base import SkbioObject
 from skbio.sequence import Sequence
 from skbio.stats.distance import DistanceMatrix
-from skbio.io.util import open_file
+from skbio.io import read
 from ._exception import (SequenceCollectionError, StockholmParseError,
                          AlignmentError)
 
@@ -748,11 +747,24 @@ class Alignment(SequenceCollection):
         if not self._validate_lengths():
             raise AlignmentError("All sequences need to be of equal length.")
 
+        # Keep a contiguous (sequence count x sequence length) matrix of the
+        # sequences' bytes so that per-position statistics can be computed
+        # with column-wise numpy reductions instead of per-character Python
+        # loops.
+        if self.is_empty():
+            self._matrix = np.empty((0, 0), dtype=np.uint8)
+        else:
+            # sequences that are already the rows of a single matrix (e.g.,
+            # when read from a file) share it rather than being copied again
+            self._matrix = _shared_matrix(self._data)
+            if self._matrix is None:
+                self._matrix = np.vstack([seq._bytes for seq in self._data])
+
         if score is not None:
             self._score = float(score)
         self._start_end_positions = start_end_positions
 
-    def distances(self, distance_fn=None):
+    def distances(self, distance_fn=None, ignore_gaps=False):
         """Compute distances between all pairs of sequences
 
         Parameters
@@ -761,17 +773,39 @@ class Alignment(SequenceCollection):
             Function for computing the distance between a pair of sequences.
             This must take two sequences as input (as `skbio.Sequence` objects)
             and return a single integer or float value. Defaults to the default
-            distance function used by `skbio.Sequence.distance`.
+            distance function used by `skbio.Sequence.distance` (i.e., the
+            Hamming distance).
+        ignore_gaps : bool, optional
+            If ``True``, positions where either sequence of a pair contains a
+            gap character are excluded when computing the Hamming distance
+            between them (i.e., pairwise deletion). Can only be used with the
+            default `distance_fn`.
 
         Returns
         -------
         skbio.DistanceMatrix
             Matrix containing the distances between all pairs of sequences.
 
+        Raises
+        ------
+        ValueError
+            If `ignore_gaps` is ``True`` and `distance_fn` is provided.
+        AlignmentError
+            If the Hamming distance is undefined for a pair of sequences
+            because there are no positions to compare.
+
         See Also
         --------
         skbio.Sequence.distance
 
+        Notes
+        -----
+        When `distance_fn` is not provided, Hamming distances are computed for
+        all pairs at once from the alignment's character matrix: the number of
+        matching characters between every pair of sequences is accumulated as
+        a product of per-character indicator matrices, in blocks of rows so
+        that temporary memory stays bounded.
+
         Examples
         --------
         >>> from skbio import Alignment
@@ -789,8 +823,34 @@ class Alignment(SequenceCollection):
          [ 0.42857143  0.          0.42857143]
          [ 0.28571429  0.42857143  0.        ]]
 
+        Positions containing gaps can be excluded from each comparison:
+
+        >>> print(a1.distances(ignore_gaps=True))
+        3x3 distance matrix
+        IDs:
+        's1', 's2', 's3'
+        Data:
+        [[ 0.          0.          0.16666667]
+         [ 0.          0.          0.2       ]
+         [ 0.16666667  0.2         0.        ]]
+
         """
-        return super(Alignment, self).distances(distance_fn)
+        if distance_fn is not None:
+            if ignore_gaps:
+                raise ValueError("ignore_gaps can only be used with the "
+                                 "default distance function.")
+            return super(Alignment, self).distances(distance_fn)
+
+        if isinstance(self._data, _AlignmentRows):
+            sources = self._data._sources
+        else:
+            sources = self._data
+        if len(set(type(seq) for seq in sources)) > 1:
+            # let Sequence.distance raise its error for mismatched types
+            return super(Alignment, self).distances(distance_fn)
+
+        return DistanceMatrix(self._hamming_distances(ignore_gaps),
+                              self.ids())
 
     def score(self):
         """Returns the score of the alignment.
@@ -845,14 +905,15 @@ class Alignment(SequenceCollection):
 
         Parameters
         ----------
-        seqs_to_keep : list, optional
-            A list of sequence ids to be retained in the resulting
-            `Alignment`. If this is not passed, the default will be to retain
-            all sequences.
-        positions_to_keep : list, optional
+        seqs_to_keep : list or 1D array_like (bool), optional
+            A list of sequence ids (or indices) to be retained in the
+            resulting `Alignment`, or a boolean vector with one entry per
+            sequence. If this is not passed, the default will be to retain all
+            sequences.
+        positions_to_keep : list or 1D array_like (bool), optional
             A list of position indices to be retained in the resulting
-            `Alignment`. If this is not passed, the default will be to retain
-            all positions.
+            `Alignment`, or a boolean vector with one entry per position. If
+            this is not passed, the default will be to retain all positions.
         invert_seqs_to_keep : bool, optional
             If `True`, the sequences identified in `seqs_to_keep` will be
             discarded, rather than retained.
@@ -865,6 +926,20 @@ class Alignment(SequenceCollection):
         Alignment
             The specified subalignment.
 
+        Raises
+        ------
+        ValueError
+            If a boolean vector is passed for `seqs_to_keep` or
+            `positions_to_keep` and its length does not match the number of
+            sequences or positions, respectively.
+
+        Notes
+        -----
+        The subalignment is computed by indexing the alignment's underlying
+        character matrix, which is not copied when sequences and positions are
+        kept in contiguous runs. The sequences of the resulting `Alignment`
+        are only created when they are first accessed.
+
         Examples
         --------
         >>> from skbio import Alignment
@@ -897,26 +972,13 @@ class Alignment(SequenceCollection):
                 # return an empty alignment (because we're inverting the
                 # default of keeping all sequences)
                 return self.__class__([])
-            # else if invert_seqs_to_keep is False
-            else:
-                # default to returning all sequences
-                def keep_seq(i, id):
-                    return True
-        # else, if seqs_to_keep was passed
+            # else if invert_seqs_to_keep is False, default to returning all
+            # sequences
+            seqs_mask = np.ones(self.sequence_count(), dtype=bool)
         else:
-            seqs_to_keep = set(seqs_to_keep)
-            # and invert_seqs_to_keep is True
+            seqs_mask = self._sequences_mask(seqs_to_keep)
             if invert_seqs_to_keep:
-                # keep only sequences that were not listed in seqs_to_keep
-                def keep_seq(i, id):
-                    return not (id in seqs_to_keep or
-                                i in seqs_to_keep)
-            # else if invert_seqs_to_keep is False
-            else:
-                # keep only sequences that were listed in seqs_to_keep
-                def keep_seq(i, id):
-                    return (id in seqs_to_keep or
-                            i in seqs_to_keep)
+                seqs_mask = ~seqs_mask
 
         # if positions_to_keep was not passed
         if positions_to_keep is None:
@@ -925,43 +987,55 @@ class Alignment(SequenceCollection):
                 # return an empty alignment (because we're inverting the
                 # default of keeping all positions)
                 return self.__class__([])
-            # else if invert_positions_to_keep is False
-            else:
-                # default to returning all positions
-                def keep_position(pos):
-                    return True
-        # else, if positions_to_keep was passed
+            # else if invert_positions_to_keep is False, default to returning
+            # all positions
+            positions_mask = np.ones(self.sequence_length(), dtype=bool)
         else:
-            positions_to_keep = set(positions_to_keep)
-            # and invert_positions_to_keep is True
+            positions_mask = self._positions_mask(positions_to_keep)
             if invert_positions_to_keep:
-                # keep only positions that were not listed in
-                # positions_to_keep
-                def keep_position(pos):
-                    return pos not in positions_to_keep
-            # else if invert_positions_to_keep is False
-            else:
-                # keep only sequences that were listed in positions_to_keep
-                def keep_position(pos):
-                    return pos in positions_to_keep
+                positions_mask = ~positions_mask
 
-        # prep the result object
-        result = []
-        # indices to keep
-        indices = [
-            i for i in range(self.sequence_length()) if keep_position(i)]
-        # iterate over sequences
-        for sequence_index, seq in enumerate(self):
-            # determine if we're keeping the current sequence
-            if keep_seq(sequence_index, seq.metadata['id']):
-                # slice the current sequence with the indices
-                result.append(seq[indices])
-            # if we're not keeping the current sequence, move on to the next
+        if not seqs_mask.any():
+            return self.__class__([])
+
+        seqs_indexer = _mask_to_indexer(seqs_mask)
+        positions_indexer = _mask_to_indexer(positions_mask)
+
+        # slice the matrix (this is a view when sequences and positions are
+        # kept in contiguous runs)
+        matrix = self._matrix
+        if seqs_indexer is not None:
+            matrix = matrix[seqs_indexer]
+        if positions_indexer is not None:
+            matrix = matrix[:, positions_indexer]
+
+        # track the sequences that the rows were originally derived from so
+        # that new sequences can be built from them on demand, without
+        # materializing any of the (possibly lazy) sequences in this alignment
+        if isinstance(self._data, _AlignmentRows):
+            sources = self._data._sources
+            source_positions = self._data._positions
+        else:
+            sources = self._data
+            source_positions = None
+        seq_indices = np.flatnonzero(seqs_mask)
+        sources = [sources[i] for i in seq_indices]
+
+        if positions_indexer is not None:
+            if source_positions is None:
+                source_positions = positions_indexer
             else:
-                continue
+                source_positions = np.arange(
+                    len(sources[0]))[source_positions][positions_indexer]
+
         # pack the result up in the same type of object as the current object
         # and return it
-        return self.__class__(result)
+        result = self.__class__([])
+        result._data = _AlignmentRows(matrix, sources, source_positions)
+        result._id_to_index = dict(
+            (seq.metadata['id'], i) for i, seq in enumerate(sources))
+        result._matrix = matrix
+        return result
 
     def iter_positions(self, constructor=None):
         """Generator of Alignment positions (i.e., columns)
@@ -1074,11 +1148,10 @@ class Alignment(SequenceCollection):
         else:
             seq_constructor = self[0].__class__
 
-        # Counter.most_common returns an ordered list of the n most common
-        # (sequence, count) items in Counter. Here we set n=1, and take only
-        # the character, not the count.
-        return seq_constructor(''.join(c.most_common(1)[0][0]
-                               for c in self.position_counters()))
+        codes, counts = self._position_counts()
+        if counts.size == 0:
+            return seq_constructor('')
+        return seq_constructor(codes[counts.argmax(axis=0)])
 
     def omit_gap_positions(self, maximum_gap_frequency):
         """Returns Alignment with positions filtered based on gap frequency
@@ -1120,15 +1193,10 @@ class Alignment(SequenceCollection):
         if self.is_empty():
             return self.__class__([])
 
-        position_frequencies = self.position_frequencies()
-        gap_chars = self[0].gap_chars
-
-        positions_to_keep = []
-        for i, f in enumerate(position_frequencies):
-            gap_frequency = sum([f[c] for c in gap_chars])
-            if gap_frequency <= maximum_gap_frequency:
-                positions_to_keep.append(i)
-        return self.subalignment(positions_to_keep=positions_to_keep)
+        gap_frequencies = (self._gap_mask().sum(axis=0) /
+                           self.sequence_count())
+        return self.subalignment(
+            positions_to_keep=gap_frequencies <= maximum_gap_frequency)
 
     def omit_gap_sequences(self, maximum_gap_frequency):
         """Returns Alignment with sequences filtered based on gap frequency
@@ -1168,14 +1236,14 @@ class Alignment(SequenceCollection):
         if self.is_empty():
             return self.__class__([])
 
-        base_frequencies = self.kmer_frequencies(k=1, relative=True)
-        gap_chars = self[0].gap_chars
-        seqs_to_keep = []
-        for seq, f in zip(self, base_frequencies):
-            gap_frequency = sum([f[c] for c in gap_chars])
-            if gap_frequency <= maximum_gap_frequency:
-                seqs_to_keep.append(seq.metadata['id'])
-        return self.subalignment(seqs_to_keep=seqs_to_keep)
+        sequence_length = self.sequence_length()
+        if sequence_length == 0:
+            # sequences without positions cannot contain gaps
+            return self.subalignment()
+
+        gap_frequencies = self._gap_mask().sum(axis=1) / sequence_length
+        return self.subalignment(
+            seqs_to_keep=gap_frequencies <= maximum_gap_frequency)
 
     def position_counters(self):
         """Return counts of characters at each position in the alignment
@@ -1207,7 +1275,14 @@ class Alignment(SequenceCollection):
         Counter({'C': 2, '-': 1})
 
         """
-        return [Counter(p) for p in self.iter_positions(constructor=str)]
+        codes, counts = self._position_counts()
+        chars = [chr(code) for code in codes]
+        result = []
+        for column in counts.T:
+            present = np.flatnonzero(column)
+            result.append(Counter(
+                dict((chars[i], int(column[i])) for i in present)))
+        return result
 
     def position_frequencies(self):
         """Return frequencies of characters for positions in Alignment
@@ -1241,11 +1316,13 @@ class Alignment(SequenceCollection):
 
         """
         seq_count = self.sequence_count()
+        codes, counts = self._position_counts()
+        chars = [chr(code) for code in codes]
         result = []
-        for pos_counter in self.position_counters():
+        for column in counts.T:
             freqs = defaultdict(float)
-            for char, count in viewitems(pos_counter):
-                freqs[char] = count / seq_count
+            for i in np.flatnonzero(column):
+                freqs[chars[i]] = float(column[i] / seq_count)
             result.append(freqs)
         return result
 
@@ -1299,19 +1376,23 @@ class Alignment(SequenceCollection):
         [0.56233514461880829, 1.3862943611198906, nan, nan]
 
         """
-        result = []
         # handle empty Alignment case
         if self.is_empty():
-            return result
-
-        iupac_standard_characters = self[0].nondegenerate_chars
-        for f in self.position_frequencies():
-            if (nan_on_non_standard_chars and
-                    len(viewkeys(f) - iupac_standard_characters) > 0):
-                result.append(np.nan)
-            else:
-                result.append(entropy(list(f.values()), base=base))
-        return result
+            return []
+
+        codes, counts = self._position_counts()
+        freqs = counts / self.sequence_count()
+        # 0 * log(0) is taken to be 0, as in scipy.stats.entropy. Every term
+        # is non-positive, so abs is used to negate the sum (and avoid -0.0).
+        log_freqs = np.log(np.where(freqs > 0, freqs, 1.0))
+        result = np.abs((freqs * log_freqs).sum(axis=0))
+        if base is not None:
+            result /= np.log(base)
+
+        if nan_on_non_standard_chars:
+            non_standard = ~np.in1d(codes, self[0]._nondegenerate_codes)
+            result[counts[non_standard].any(axis=0)] = np.nan
+        return list(result)
 
     def sequence_length(self):
         """Return the number of positions in Alignment
@@ -1342,16 +1423,304 @@ class Alignment(SequenceCollection):
         if self.is_empty():
             return 0
         else:
-            return len(self._data[0])
+            return self._matrix.shape[1]
+
+    def sequence_lengths(self):
+        """Return lengths of the sequences in the `Alignment`
+
+        Returns
+        -------
+        list
+            The ordered list of sequence lengths. These are all equal to
+            ``sequence_length()``.
+
+        See Also
+        --------
+        sequence_length
+        sequence_count
+
+        Examples
+        --------
+        >>> from skbio import Alignment
+        >>> from skbio import DNA
+        >>> sequences = [DNA('AC--', metadata={'id': "seq1"}),
+        ...              DNA('AT-C', metadata={'id': "seq2"})]
+        >>> a1 = Alignment(sequences)
+        >>> a1.sequence_lengths()
+        [4, 4]
+
+        """
+        return [self.sequence_length()] * self.sequence_count()
+
+    def _sequences_mask(self, seqs_to_keep):
+        """Return boolean vector marking the sequences in `seqs_to_keep`"""
+        seq_count = self.sequence_count()
+        if not isinstance(seqs_to_keep, np.ndarray):
+            # keep the keys themselves, as converting a mix of ids and
+            # indices to an array would turn the indices into strs
+            seqs_to_keep = list(seqs_to_keep)
+
+        if np.asarray(seqs_to_keep).dtype == bool:
+            seqs_to_keep = np.asarray(seqs_to_keep)
+            if seqs_to_keep.shape != (seq_count,):
+                raise ValueError(
+                    "Boolean vector of sequences to keep must have one entry "
+                    "per sequence (%d != %d)." % (seqs_to_keep.size,
+                                                  seq_count))
+            return seqs_to_keep.copy()
+
+        mask = np.zeros(seq_count, dtype=bool)
+        for key in seqs_to_keep:
+            # keys may be sequence ids or sequence indices
+            if key in self._id_to_index:
+                mask[self._id_to_index[key]] = True
+            if isinstance(key, numbers.Integral) and 0 <= key < seq_count:
+                mask[key] = True
+        return mask
+
+    def _positions_mask(self, positions_to_keep):
+        """Return boolean vector marking the positions in `positions_to_keep`
+        """
+        sequence_length = self.sequence_length()
+        if not isinstance(positions_to_keep, np.ndarray):
+            positions_to_keep = np.asarray(list(positions_to_keep))
+
+        if positions_to_keep.dtype == bool:
+            if positions_to_keep.shape != (sequence_length,):
+                raise ValueError(
+                    "Boolean vector of positions to keep must have one entry "
+                    "per position (%d != %d)." % (positions_to_keep.size,
+                                                  sequence_length))
+            return positions_to_keep.copy()
+
+        mask = np.zeros(sequence_length, dtype=bool)
+        indices = positions_to_keep.astype(int).ravel()
+        # indices outside of the alignment do not match any position
+        indices = indices[(indices >= 0) & (indices < sequence_length)]
+        mask[indices] = True
+        return mask
+
+    def _position_counts(self):
+        """Return character codes and their counts at each position
+
+        Returns
+        -------
+        np.ndarray
+            The (sorted) distinct character codes present in the `Alignment`,
+            as a 1D array of dtype ``np.uint8``.
+        np.ndarray
+            2D array of shape ``(len(codes), sequence_length)``, where entry
+            ``[i, j]`` is the number of sequences with ``codes[i]`` at
+            position ``j``.
+
+        """
+        # find which characters are present with a single pass over the
+        # matrix, then count each one per column. Alignments only use a small
+        # alphabet, so this is much cheaper than binning every column.
+        codes = np.flatnonzero(
+            np.bincount(self._matrix.ravel(), minlength=256)).astype(np.uint8)
+        counts = np.empty((len(codes), self.sequence_length()), dtype=int)
+        for i, code in enumerate(codes):
+            np.sum(self._matrix == code, axis=0, out=counts[i])
+        return codes, counts
+
+    def _hamming_distances(self, ignore_gaps=False, block_size=512):
+        """Return 2D array of Hamming distances between all sequences
+
+        Parameters
+        ----------
+        ignore_gaps : bool, optional
+            If ``True``, positions where either sequence contains a gap are
+            excluded from each pairwise comparison.
+        block_size : int, optional
+            Number of rows of the distance matrix to compute at a time.
+
+        Returns
+        -------
+        np.ndarray
+            Square array of distances (dtype ``np.float64``).
+
+        Raises
+        ------
+        AlignmentError
+            If there are no positions to compare for a pair of sequences.
+
+        """
+        seq_count, sequence_length = self._matrix.shape
+        codes = np.flatnonzero(np.bincount(self._matrix.ravel(),
+                                           minlength=256))
+        if ignore_gaps:
+            codes = np.setdiff1d(codes, self[0]._gap_codes)
+            non_gaps = ~self._gap_mask()
+        # counts are exactly representable as float32 up to 2**24, which is
+        # faster to multiply and half the size of float64
+        dtype = np.float32 if sequence_length < 2 ** 24 else np.float64
+
+        if not ignore_gaps and sequence_length == 0 and seq_count > 1:
+            self._raise_undefined_hamming(0, 1)
+
+        # only the upper triangle of each block of rows is computed and it is
+        # mirrored into the lower triangle, so the temporaries are the size of
+        # a block of rows rather than of the whole matrix
+        distances = np.empty((seq_count, seq_count))
+        for start in range(0, seq_count, block_size):
+            num_rows = min(block_size, seq_count - start)
+
+            # compared[i, j] is the number of positions that are compared
+            # between sequences start + i and start + j
+            if ignore_gaps:
+                compared = _gram_block(non_gaps[start:], num_rows, dtype)
+                undefined = compared == 0
+                np.fill_diagonal(undefined, False)
+                if undefined.any():
+                    i, j = np.argwhere(undefined)[0]
+                    self._raise_undefined_hamming(start + i, start + j)
+            else:
+                compared = sequence_length
+
+            # matches[i, j] is the number of positions with the same (non-gap,
+            # if ignoring gaps) character in sequences start + i and start + j
+            matches = np.zeros((num_rows, seq_count - start), dtype=dtype)
+            for code in codes:
+                matches += _gram_block(self._matrix[start:] == code, num_rows,
+                                       dtype)
+
+            # convert match counts into fractions of mismatches, in double
+            # precision, directly in the distance matrix
+            block = distances[start:start + num_rows, start:]
+            np.subtract(compared, matches, out=block)
+            block /= compared
+            distances[start:, start:start + num_rows] = block.T
+        np.fill_diagonal(distances, 0)
+        return distances
+
+    def _raise_undefined_hamming(self, i, j):
+        """Raise an error for sequences i and j having nothing to compare"""
+        raise AlignmentError(
+            "Hamming distance is undefined between sequences %r and %r "
+            "because there are no positions to compare." %
+            (self[i].metadata['id'], self[j].metadata['id']))
+
+    def _gap_mask(self):
+        """Return boolean matrix that is ``True`` where a gap is present"""
+        return np.in1d(self._matrix, self[0]._gap_codes).reshape(
+            self._matrix.shape)
 
     def _validate_lengths(self):
         """Return ``True`` if all sequences same length, ``False`` otherwise
         """
-        seq1_length = self.sequence_length()
-        for seq in self:
-            if seq1_length != len(seq):
-                return False
-        return True
+        return len(set(len(seq) for seq in self)) <= 1
+
+
+def _gram_block(x, num_rows, dtype):
+    """Return ``x[:num_rows].dot(x.T)``, computed as `dtype`"""
+    x = x.astype(dtype)
+    return np.dot(x[:num_rows], x.T)
+
+
+def _shared_matrix(seqs):
+    """Return the matrix whose rows are the sequences' bytes, if there is one
+
+    ``None`` is returned unless the sequences' bytes are views onto the
+    consecutive rows of a single C-contiguous matrix, in order.
+    """
+    matrix = seqs[0]._bytes.base
+    if (not isinstance(matrix, np.ndarray) or matrix.ndim != 2 or
+            matrix.shape[0] != len(seqs) or not matrix.flags.c_contiguous):
+        return None
+
+    address = matrix.ctypes.data
+    row_size = matrix.strides[0]
+    for i, seq in enumerate(seqs):
+        row = seq._bytes
+        if (row.base is not matrix or len(row) != matrix.shape[1] or
+                row.ctypes.data != address + i * row_size):
+            return None
+    return matrix
+
+
+def _mask_to_indexer(mask):
+    """Return an indexer selecting the ``True`` entries of a boolean vector
+
+    ``None`` is returned if every entry is selected, and a slice if the
+    selected entries form a single contiguous run (so that indexing returns a
+    view). Otherwise, an array of indices is returned.
+    """
+    indices = np.flatnonzero(mask)
+    if len(indices) == len(mask):
+        return None
+    elif len(indices) == 0:
+        return slice(0, 0)
+    elif indices[-1] - indices[0] + 1 == len(indices):
+        return slice(indices[0], indices[-1] + 1)
+    else:
+        return indices
+
+
+class _AlignmentRows(object):
+    """Sequences backed by the rows of an alignment matrix, built on demand
+
+    Parameters
+    ----------
+    matrix : 2D np.ndarray of np.uint8
+        Character codes of the sequences, one row per sequence.
+    sources : list of skbio.Sequence
+        The sequences that the rows of `matrix` were derived from. The type,
+        metadata and (sliced) positional metadata of each source sequence are
+        propagated to the sequence that is built from its row.
+    positions : slice or 1D np.ndarray of int, optional
+        Positions of the source sequences that are present in `matrix`. If
+        ``None``, all positions are present and the source sequences are
+        returned unchanged.
+
+    Notes
+    -----
+    This supports the subset of the ``list`` interface that
+    `SequenceCollection` uses to access its sequences.
+
+    """
+
+    def __init__(self, matrix, sources, positions=None):
+        self._matrix = matrix
+        self._sources = sources
+        self._positions = positions
+        self._seqs = [None] * len(sources)
+
+    def __len__(self):
+        return len(self._seqs)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reversed__(self):
+        for i in reversed(range(len(self))):
+            yield self[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        seq = self._seqs[index]
+        if seq is None:
+            seq = self._build_sequence(index)
+            self._seqs[index] = seq
+        return seq
+
+    def _build_sequence(self, index):
+        source = self._sources[index]
+        if self._positions is None:
+            # sequences are immutable, so the source can be shared
+            return source
+
+        positional_metadata = None
+        if source.has_positional_metadata():
+            positional_metadata = source._slice_positional_metadata(
+                self._positions)
+        # rows of the matrix are contiguous, so the new sequence is a view
+        # onto the matrix rather than a copy
+        return source._to(sequence=self._matrix[index],
+                          positional_metadata=positional_metadata)
 
 
 class StockholmAlignment(Alignment):
@@ -1444,6 +1813,8 @@ class StockholmAlignment(Alignment):
     seq2          UCC--G-GGGA
     //
     """
+    default_write_format = 'stockholm'
+
     def __init__(self, seqs, gf=None, gs=None, gr=None, gc=None):
         self.gf = gf if gf else {}
         self.gs = gs if gs else {}
@@ -1464,100 +1835,22 @@ class StockholmAlignment(Alignment):
         If references are included in GF data, the RN lines are automatically
         generated if not provided.
 
-        """
+        See Also
+        --------
+        skbio.io.stockholm
 
-        # find length of leader info needed to make file pretty
-        # 10 comes from the characters for '#=GF ' and the feature after label
-        infolen = max(len(seq.metadata['id']) for seq in self._data) + 10
-
-        GF_lines = []
-        GS_lines = []
-        GC_lines = []
-        # NOTE: EVERYTHING MUST BE COERECED TO STR in case int or float passed
-        # add GF information if applicable
-        if self.gf:
-            skipfeatures = set(("NH", "RC", "RM", "RN", "RA", "RL"))
-            for feature, value in self.gf.items():
-                # list of features to skip and parse special later
-                if feature in skipfeatures:
-                    continue
-                # list of features to parse special
-                elif feature == "TN":
-                    # trees must be in proper order of identifier then tree
-                    ident = value if isinstance(value, list) else [value]
-                    tree = self.gf["NH"] if isinstance(self.gf["NH"], list) \
-                        else [self.gf["NH"]]
-                    for ident, tree in zip(self.gf["TN"], self.gf["NH"]):
-                        GF_lines.append(' '.join(["#=GF", "TN", str(ident)]))
-                        GF_lines.append(' '.join(["#=GF", "NH", str(tree)]))
-                elif feature == "RT":
-                    # make sure each reference block stays together
-                    # set up lists to zip in case some bits are missing
-                    # create rn list if needed
-                    default_none = [0]*len(value)
-                    rn = self.gf.get("RN", ["[%i]" % x for x in
-                                     range(1, len(value)+1)])
-                    rm = self.gf.get("RM", default_none)
-                    rt = self.gf.get("RT", default_none)
-                    ra = self.gf.get("RA", default_none)
-                    rl = self.gf.get("RL", default_none)
-                    rc = self.gf.get("RC", default_none)
-                    # order: RN, RM, RT, RA, RL, RC
-                    for n, m, t, a, l, c in zip(rn, rm, rt, ra, rl, rc):
-                        GF_lines.append(' '.join(["#=GF", "RN", n]))
-                        if m:
-                            GF_lines.append(' '.join(["#=GF", "RM", str(m)]))
-                        if t:
-                            GF_lines.append(' '.join(["#=GF", "RT", str(t)]))
-                        if a:
-                            GF_lines.append(' '.join(["#=GF", "RA", str(a)]))
-                        if l:
-                            GF_lines.append(' '.join(["#=GF", "RL", str(l)]))
-                        if c:
-                            GF_lines.append(' '.join(["#=GF", "RC", str(c)]))
-                else:
-                    # normal addition for everything else
-                    if not isinstance(value, list):
-                        value = [value]
-                    for val in value:
-                        GF_lines.append(' '.join(["#=GF", feature, str(val)]))
-
-        # add GS information if applicable
-        if self.gs:
-            for feature in self.gs:
-                for seqname in self.gs[feature]:
-                    GS_lines.append(' '.join(["#=GS", seqname, feature,
-                                             str(self.gs[feature][seqname])]))
-
-        # add GC information if applicable
-        if self.gc:
-            for feature, value in viewitems(self.gc):
-                leaderinfo = ' '.join(["#=GC", feature])
-                spacer = ' ' * (infolen - len(leaderinfo))
-                GC_lines.append(spacer.join([leaderinfo,
-                                             str(self.gc[feature])]))
-
-        sto_lines = ["# STOCKHOLM 1.0"] + GF_lines + GS_lines
-        # create seq output along with GR info if applicable
-        for label, seq in self.iteritems():
-            spacer = ' ' * (infolen - len(label))
-            sto_lines.append(spacer.join([label, str(seq)]))
-            # GR info added for sequence
-            for feature in viewkeys(self.gr):
-                value = self.gr[feature][label]
-                leaderinfo = ' '.join(['#=GR', label, feature])
-                spacer = ' ' * (infolen - len(leaderinfo))
-                sto_lines.append(spacer.join([leaderinfo, value]))
-
-        sto_lines.extend(GC_lines)
-        # add final slashes to end of file
-        sto_lines.append('//')
-
-        return '\n'.join(sto_lines)
+        """
+        fh = StringIO()
+        self.write(fh, format='stockholm')
+        # drop the newline following the final '//'
+        return fh.getvalue()[:-1]
 
     def to_file(self, out_f):
         r"""Save the alignment to file in text format.
 
+        Lines are written to the file as they are formatted, so the
+        formatted alignment is never held in memory as a whole.
+
         Parameters
         ----------
         out_f : file-like object or filename
@@ -1569,9 +1862,10 @@ class StockholmAlignment(Alignment):
         See Also
         --------
         from_file
+        skbio.io.stockholm
+
         """
-        with open_file(out_f, 'w') as out_f:
-            out_f.write(self.__str__())
+        self.write(out_f, format='stockholm')
 
     @staticmethod
     def _parse_gf_info(lines):
@@ -1637,20 +1931,15 @@ class StockholmAlignment(Alignment):
             if init != "#=GC":
                 raise StockholmParseError("Non-GC line encountered!")
 
-            # add current feature to the parsed information
-            if feature in parsed:
-                if strict:
-                    raise StockholmParseError("Should not have multiple lines "
-                                              "with the same feature: %s" %
-                                              feature)
-            else:
-                parsed[feature] = [content]
+            # add current feature to the parsed information, taking into
+            # account interleaved format
+            parsed.setdefault(feature, []).append(content)
 
         # removing unneccessary lists from parsed. Use .items() for py3 support
         for feature, value in parsed.items():
             parsed[feature] = ''.join(value)
             if strict:
-                if len(value) != seqlen:
+                if len(parsed[feature]) != seqlen:
                     raise StockholmParseError("GC must have exactly one char "
                                               "per position in alignment!")
 
@@ -1673,11 +1962,8 @@ class StockholmAlignment(Alignment):
                     raise StockholmParseError("Non-GS/GR line encountered!")
 
             # parse each line, taking into account interleaved format
-            if feature in parsed and label in parsed[feature]:
-                # interleaved format, so need list of content
-                parsed[feature][label].append(content)
-            else:
-                parsed[feature] = {label: [content]}
+            parsed.setdefault(feature, OrderedDict()).setdefault(
+                label, []).append(content)
 
         # join all the crazy lists created during parsing
         for feature in parsed:
@@ -1715,60 +2001,12 @@ class StockholmAlignment(Alignment):
         ------
         skbio.StockholmParseError
             If any lines are found that don't conform to stockholm format
+
+        See Also
+        --------
+        skbio.io.stockholm
+
         """
-        # make sure first line is corect
-        line = infile.readline()
-        if not line.startswith("# STOCKHOLM 1.0"):
-            raise StockholmParseError("Incorrect header found")
-        gs_lines = []
-        gf_lines = []
-        gr_lines = []
-        gc_lines = []
-        # OrderedDict used so sequences maintain same order as in file
-        seqs = OrderedDict()
-        for line in infile:
-            line = line.strip()
-            if line == "" or line.startswith("# S"):
-                # skip blank lines or secondary headers
-                continue
-            elif line == "//":
-                # parse the record since we are at its end
-                # build the seuence list for alignment construction
-                seqs = [seq_constructor(seq, metadata={'id': _id})
-                        for _id, seq in viewitems(seqs)]
-                # get length of sequences in the alignment
-                seqlen = len(seqs[0][1])
-
-                # parse information lines
-                gf = cls._parse_gf_info(gf_lines)
-                gs = cls._parse_gs_gr_info(gs_lines)
-                gr = cls._parse_gs_gr_info(gr_lines, strict, seqlen)
-                gc = cls._parse_gc_info(gc_lines, strict, seqlen)
-
-                # yield the actual stockholm object
-                yield cls(seqs, gf, gs, gr, gc)
-
-                # reset all storage variables
-                gs_lines = []
-                gf_lines = []
-                gr_lines = []
-                gc_lines = []
-                seqs = OrderedDict()
-            # add the metadata lines to the proper lists
-            elif line.startswith("#=GF"):
-                gf_lines.append(line)
-            elif line.startswith("#=GS"):
-                gs_lines.append(line)
-            elif line.startswith("#=GR"):
-                gr_lines.append(line)
-            elif line.startswith("#=GC"):
-                gc_lines.append(line)
-            else:
-                lineinfo = line.split()
-                # assume sequence since nothing else in format is left
-                # in case of interleaved format, need to do check
-                if lineinfo[0] in seqs:
-                    sequence = seqs[lineinfo[0]]
-                    seqs[lineinfo[0]] = ''.join([sequence, lineinfo[1]])
-                else:
-                    seqs[lineinfo[0]] = lineinfo[1]
+        for alignment in read(infile, format='stockholm', verify=False,
+                              constructor=seq_constructor, strict=strict):
+            yield alignment
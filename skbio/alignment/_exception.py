@@ -8,7 +8,7 @@
 
 from __future__ import absolute_import, division, print_function
 
-from skbio.io import FileFormatError
+from skbio.io import StockholmFormatError
 
 
 class SequenceCollectionError(Exception):
@@ -21,6 +21,12 @@ class AlignmentError(SequenceCollectionError):
     pass
 
 
-class StockholmParseError(FileFormatError):
-    """Exception raised when a Stockholm formatted file cannot be parsed."""
+class StockholmParseError(StockholmFormatError):
+    """Exception raised when a Stockholm formatted file cannot be parsed.
+
+    It is a subclass of ``skbio.io.StockholmFormatError`` so that errors
+    raised by the ``stockholm`` reader can be handled like those of any other
+    file format.
+
+    """
     pass
@@ -56,7 +56,8 @@ np_aa_table = np.array([
     23,  0, 20,  4,  3,  6, 13,  7,  8,  9, 23, 11, 10, 12,  2, 23,
     14,  5,  1, 15, 16, 23, 19, 17, 22, 18, 21, 23, 23, 23, 23, 23,
     23,  0, 20,  4,  3,  6, 13,  7,  8,  9, 23, 11, 10, 12,  2, 23,
-    14,  5,  1, 15, 16, 23, 19, 17, 22, 18, 21, 23, 23, 23, 23, 23])
+    14,  5,  1, 15, 16, 23, 19, 17, 22, 18, 21, 23, 23, 23, 23, 23],
+    dtype=np.int8)
 
 np_nt_table = np.array([
     4,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,
@@ -66,7 +67,8 @@ np_nt_table = np.array([
     4,  0,  4,  1,  4,  4,  4,  2,  4,  4,  4,  4,  4,  4,  4,  4,
     4,  4,  4,  4,  3,  0,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4,
     4,  0,  4,  1,  4,  4,  4,  2,  4,  4,  4,  4,  4,  4,  4,  4,
-    4,  4,  4,  4,  3,  0,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4])
+    4,  4,  4,  4,  3,  0,  4,  4,  4,  4,  4,  4,  4,  4,  4,  4],
+    dtype=np.int8)
 
 mid_table = np.array(['M', 'I', 'D'])
 
@@ -88,6 +90,8 @@ cdef class AlignmentStructure:
     cdef str reference_sequence
     cdef int index_starts_at
     cdef str _cigar_string
+    cdef str _aligned_query_sequence
+    cdef str _aligned_target_sequence
 
     def __cinit__(self, read_sequence, reference_sequence, index_starts_at):
         # We use `read_sequence` and `reference_sequence` here as they are
@@ -313,13 +317,16 @@ cdef class AlignmentStructure:
         This will return `None` if `suppress_sequences` was True when this
         object was created
 
+        The aligned sequence is only built the first time it is requested.
+
         """
-        if self.query_sequence:
-            return self._get_aligned_sequence(self.query_sequence,
-                                              self._tuples_from_cigar(),
-                                              self.query_begin, self.query_end,
-                                              "D")
-        return None
+        if not self.query_sequence:
+            return None
+        if self._aligned_query_sequence is None:
+            self._aligned_query_sequence = self._get_aligned_sequence(
+                self.query_sequence, self._tuples_from_cigar(),
+                self.p.read_begin1, self.p.read_end1, "D")
+        return self._aligned_query_sequence
 
     @property
     def aligned_target_sequence(self):
@@ -335,14 +342,16 @@ cdef class AlignmentStructure:
         This will return `None` if `suppress_sequences` was True when this
         object was created
 
+        The aligned sequence is only built the first time it is requested.
+
         """
-        if self.target_sequence:
-            return self._get_aligned_sequence(self.target_sequence,
-                                              self._tuples_from_cigar(),
-                                              self.target_begin,
-                                              self.target_end_optimal,
-                                              "I")
-        return None
+        if not self.target_sequence:
+            return None
+        if self._aligned_target_sequence is None:
+            self._aligned_target_sequence = self._get_aligned_sequence(
+                self.target_sequence, self._tuples_from_cigar(),
+                self.p.ref_begin1, self.p.ref_end1, "I")
+        return self._aligned_target_sequence
 
     def set_zero_based(self, is_zero_based):
         """Set the aligment indices to start at 0 if True else 1 if False
@@ -366,36 +375,27 @@ cdef class AlignmentStructure:
 
     def _get_aligned_sequence(self, sequence, tuple_cigar, begin, end,
                               gap_type):
-        # Save the original index scheme and then set it to 0 (1/2)
-        orig_z_base = self.is_zero_based()
-        self.set_zero_based(True)
+        # `begin` and `end` are 0-based, inclusive indices
         aligned_sequence = []
         seq = sequence[begin:end + 1]
         index = 0
         for length, mid in tuple_cigar:
             if mid == 'M':
-                aligned_sequence += [seq[i]
-                                     for i in range(index, length + index)]
+                aligned_sequence.append(seq[index:index + length])
                 index += length
             elif mid == gap_type:
-                aligned_sequence += (['-'] * length)
-            else:
-                pass
+                aligned_sequence.append('-' * length)
         # Our sequence end is sometimes beyond the cigar:
-        aligned_sequence += [seq[i] for i in range(index, end - begin + 1)]
-        # Revert our index scheme to the original (2/2)
-        self.set_zero_based(orig_z_base)
+        aligned_sequence.append(seq[index:end - begin + 1])
         return "".join(aligned_sequence)
 
     def _tuples_from_cigar(self):
+        # Read the cigar operations straight from the struct rather than
+        # parsing the cigar string
         tuples = []
-        length_stack = []
-        for character in self.cigar:
-            if character.isdigit():
-                length_stack.append(character)
-            else:
-                tuples.append((int("".join(length_stack)), character))
-                length_stack = []
+        for i in range(self.p.cigarLen):
+            tuples.append((self.p.cigar[i] >> 4,
+                           "MID"[self.p.cigar[i] & 0xf]))
         return tuples
 
 cdef class StripedSmithWaterman:
@@ -673,13 +673,12 @@ cdef class StripedSmithWaterman:
             self,
             sequence):
         cdef cnp.ndarray[cnp.int8_t, ndim = 1, mode = "c"] seq
-        seq = np.empty(len(sequence), dtype=np.int8)
+        # translate all characters at once with a lookup table
+        codes = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
         if self.is_protein:
-            for i, char in enumerate(sequence):
-                seq[i] = np_aa_table[ord(char)]
+            seq = np_aa_table.take(codes)
         else:
-            for i, char in enumerate(sequence):
-                seq[i] = np_nt_table[ord(char)]
+            seq = np_nt_table.take(codes)
         return seq
 
     cdef cnp.ndarray[cnp.int8_t, ndim = 1, mode = "c"] \
@@ -714,7 +713,7 @@ cdef class StripedSmithWaterman:
 
 
 def local_pairwise_align_ssw(sequence1, sequence2, constructor=Sequence,
-                             **kwargs):
+                             lightweight=False, **kwargs):
     """Align query and target sequences with Striped Smith-Waterman.
 
     Parameters
@@ -725,11 +724,21 @@ def local_pairwise_align_ssw(sequence1, sequence2, constructor=Sequence,
         The second unaligned sequence
     constructor : Sequence subclass
         A constructor to use if `protein` is not True.
+    lightweight : bool, optional
+        If True, return the ``AlignmentStructure`` computed by SSW instead of
+        building an ``Alignment`` from it. Its score, begin and end positions
+        and cigar are available directly, and the aligned sequences are only
+        built if ``aligned_query_sequence`` or ``aligned_target_sequence`` is
+        accessed. This avoids creating any ``Sequence`` objects, which is
+        useful when screening many alignments for their scores or
+        coordinates. `constructor` is ignored if True.
+        Default is False.
 
     Returns
     -------
-    ``skbio.alignment.Alignment``
-        The resulting alignment as an Alignment object
+    ``skbio.alignment.Alignment`` or ``skbio.alignment.AlignmentStructure``
+        The resulting alignment as an Alignment object, or as an
+        AlignmentStructure if `lightweight` is True
 
     Notes
     -----
@@ -770,6 +779,9 @@ def local_pairwise_align_ssw(sequence1, sequence2, constructor=Sequence,
     if not alignment.cigar:
         return None
 
+    if lightweight:
+        return alignment
+
     start_end = None
     if alignment.query_begin != -1:
         start_end = [
@@ -17,6 +17,7 @@ except ImportError:  # python3 system
 import tempfile
 
 import numpy as np
+import numpy.testing as npt
 from scipy.spatial.distance import hamming
 
 from skbio import (Sequence, DNA, RNA,
@@ -478,6 +479,61 @@ class AlignmentTests(TestCase):
         actual = self.a1.distances(dumb_distance)
         self.assertEqual(actual, expected)
 
+    def test_distances_matches_pairwise_hamming(self):
+        seqs = [DNA(''.join(chars), metadata={'id': str(i)})
+                for i, chars in enumerate(
+                    np.random.RandomState(0).choice(list('ACGT-.N'),
+                                                    size=(25, 40)))]
+        aln = Alignment(seqs)
+        expected = aln.distances(hamming)
+        self.assertEqual(aln.distances(), expected)
+        for block_size in 1, 7, 25, 100:
+            npt.assert_array_equal(
+                aln._hamming_distances(block_size=block_size), expected.data)
+
+    def test_distances_ignore_gaps(self):
+        expected = [[0, 0, 1. / 8],
+                    [0, 0, 1. / 7],
+                    [1. / 8, 1. / 7, 0]]
+        expected = DistanceMatrix(expected, ['d1', 'd2', 'd3'])
+        actual = self.a1.distances(ignore_gaps=True)
+        self.assertEqual(actual, expected)
+        npt.assert_array_equal(
+            self.a1._hamming_distances(ignore_gaps=True, block_size=2),
+            expected.data)
+
+        # a single sequence of only gaps has nothing to be compared with
+        aln = Alignment([DNA('--', metadata={'id': 'a'})])
+        self.assertEqual(aln.distances(ignore_gaps=True),
+                         DistanceMatrix([[0.]], ['a']))
+
+    def test_distances_undefined(self):
+        aln = Alignment([DNA('A-', metadata={'id': 'a'}),
+                         DNA('-C', metadata={'id': 'b'})])
+        with self.assertRaisesRegexp(AlignmentError, "'a' and 'b'"):
+            aln.distances(ignore_gaps=True)
+
+        # pairs are found in blocks of rows after the first one
+        aln = Alignment([DNA('AC', metadata={'id': 'x'}),
+                         DNA('AC', metadata={'id': 'y'}),
+                         DNA('A-', metadata={'id': 'a'}),
+                         DNA('-C', metadata={'id': 'b'})])
+        with self.assertRaisesRegexp(AlignmentError, "'a' and 'b'"):
+            aln._hamming_distances(ignore_gaps=True, block_size=2)
+
+        with self.assertRaisesRegexp(AlignmentError, "'a' and 'b'"):
+            self.no_positions.distances()
+
+    def test_distances_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            self.a1.distances(hamming, ignore_gaps=True)
+
+    def test_distances_mixed_sequence_types(self):
+        aln = Alignment([DNA('AC', metadata={'id': 'a'}),
+                         RNA('AC', metadata={'id': 'b'})])
+        with self.assertRaises(TypeError):
+            aln.distances()
+
     def test_score(self):
         self.assertEqual(self.a3.score(), 42.0)
         self.assertEqual(self.a4.score(), -42.0)
@@ -543,6 +599,88 @@ class AlignmentTests(TestCase):
         expected = Alignment([d2])
         self.assertEqual(actual, expected)
 
+    def test_subalignment_boolean_vectors(self):
+        actual = self.a1.subalignment(
+            seqs_to_keep=np.array([True, False, True]),
+            positions_to_keep=np.array([True, False, True, True] +
+                                       [False] * 9))
+        expected = Alignment([DNA('.AC', metadata={'id': "d1"}),
+                              DNA('.AC', metadata={'id': "d3"})])
+        self.assertEqual(actual, expected)
+
+        actual = self.a1.subalignment(
+            seqs_to_keep=np.array([True, False, True]),
+            invert_seqs_to_keep=True)
+        self.assertEqual(actual, Alignment([self.d2]))
+
+        # lists of bools are masks too
+        actual = self.a1.subalignment(
+            seqs_to_keep=[True, False, True],
+            positions_to_keep=[True, False, True, True] + [False] * 9)
+        self.assertEqual(actual, expected)
+
+        with self.assertRaises(ValueError):
+            self.a1.subalignment(seqs_to_keep=np.array([True, False]))
+        with self.assertRaises(ValueError):
+            self.a1.subalignment(seqs_to_keep=[True, False])
+        with self.assertRaises(ValueError):
+            self.a1.subalignment(positions_to_keep=np.array([True, False]))
+
+    def test_subalignment_out_of_range_keys_ignored(self):
+        actual = self.a1.subalignment(seqs_to_keep=['d2', 'abc', 42],
+                                      positions_to_keep=[-1, 0, 100])
+        expected = Alignment([DNA('T', metadata={'id': "d2"})])
+        self.assertEqual(actual, expected)
+
+    def test_subalignment_shares_matrix(self):
+        # contiguous runs of sequences and positions yield a view
+        sub = self.a1.subalignment(seqs_to_keep=['d2', 'd3'],
+                                   positions_to_keep=range(2, 8))
+        self.assertTrue(np.shares_memory(sub._matrix, self.a1._matrix))
+        self.assertEqual(str(sub[0]), 'ACCGGT')
+        self.assertEqual(str(sub[1]), 'ACC-GT')
+        self.assertTrue(np.shares_memory(sub[0]._bytes, self.a1._matrix))
+
+        # other selections are copied
+        sub = self.a1.subalignment(positions_to_keep=[0, 2])
+        self.assertFalse(np.shares_memory(sub._matrix, self.a1._matrix))
+
+    def test_subalignment_lazy_sequences(self):
+        sub = self.a1.subalignment(positions_to_keep=[0, 2, 3])
+        self.assertEqual(sub._data._seqs, [None, None, None])
+        self.assertEqual(sub.sequence_lengths(), [3, 3, 3])
+        self.assertTrue('d2' in sub)
+        self.assertEqual(sub._data._seqs, [None, None, None])
+
+        self.assertEqual(sub['d2'], DNA('TAC', metadata={'id': "d2"}))
+        self.assertEqual(sub._data._seqs[0], None)
+        self.assertIs(sub[1], sub[1])
+
+        # sequences are reused when all positions are kept
+        sub = self.a1.subalignment(seqs_to_keep=['d3'])
+        self.assertIs(sub[0], self.d3)
+
+    def test_subalignment_of_subalignment(self):
+        seqs = [DNA('AC-GT', metadata={'id': 'a'},
+                    positional_metadata={'quality': range(5)}),
+                DNA('ACTGT', metadata={'id': 'b'},
+                    positional_metadata={'quality': range(5, 10)}),
+                DNA('A--GT', metadata={'id': 'c'},
+                    positional_metadata={'quality': range(10, 15)})]
+        aln = Alignment(seqs)
+
+        sub = aln.subalignment(positions_to_keep=[0, 1, 3, 4])
+        sub = sub.subalignment(seqs_to_keep=['a', 'c'],
+                               positions_to_keep=[1, 2, 3])
+        expected = Alignment([
+            DNA('CGT', metadata={'id': 'a'},
+                positional_metadata={'quality': [1, 3, 4]}),
+            DNA('-GT', metadata={'id': 'c'},
+                positional_metadata={'quality': [11, 13, 14]})])
+        self.assertEqual(sub, expected)
+        self.assertEqual(sub.omit_gap_positions(0.0),
+                         expected.subalignment(positions_to_keep=[1, 2]))
+
     def test_subalignment_filter_out_everything(self):
         exp = Alignment([])
 
@@ -680,7 +818,9 @@ class AlignmentTests(TestCase):
                     defaultdict(float, {'A': 0.5, 'G': 0.5}),
                     defaultdict(float, {'U': 1.0}),
                     defaultdict(float, {'-': 0.5, 'U': 0.5})]
-        self.assertEqual(self.a2.position_frequencies(), expected)
+        obs = self.a2.position_frequencies()
+        self.assertEqual(obs, expected)
+        self.assertIs(type(obs[0]['A']), float)
 
     def test_position_frequencies_floating_point_precision(self):
         # Test that a position with no variation yields a frequency of exactly
@@ -717,6 +857,38 @@ class AlignmentTests(TestCase):
         np.testing.assert_almost_equal(self.empty.position_entropies(base=2),
                                        [])
 
+        # non-standard characters contribute to the entropy
+        expected = [1.0, 1.0, 1.0, 0.0, 1.0]
+        np.testing.assert_almost_equal(
+            self.a2.position_entropies(base=2,
+                                       nan_on_non_standard_chars=False),
+            expected, 5)
+
+        # invariant positions have an entropy of exactly zero
+        obs = self.a2.position_entropies()[3]
+        self.assertIsInstance(obs, np.float64)
+        self.assertEqual(obs, 0.0)
+        self.assertFalse(np.signbit(obs))
+
+    def test_position_counts(self):
+        codes, counts = self.a2._position_counts()
+        npt.assert_array_equal(codes, np.array([ord(c) for c in '-ACGU'],
+                                               dtype=np.uint8))
+        npt.assert_array_equal(counts, [[0, 0, 0, 0, 1],
+                                        [1, 0, 1, 0, 0],
+                                        [0, 1, 0, 0, 0],
+                                        [0, 0, 1, 0, 0],
+                                        [1, 1, 0, 2, 1]])
+
+        codes, counts = self.no_positions._position_counts()
+        self.assertEqual(codes.size, 0)
+        self.assertEqual(counts.shape, (0, 0))
+
+    def test_gap_mask(self):
+        npt.assert_array_equal(self.a2._gap_mask(),
+                               [[False, False, False, False, True],
+                                [False, False, False, False, False]])
+
     def test_kmer_frequencies(self):
         expected = [defaultdict(float, {'U': 3 / 5, 'A': 1 / 5, '-': 1 / 5}),
                     defaultdict(float, {'A': 1 / 5, 'C': 1 / 5, 'G': 1 / 5,
@@ -727,6 +899,11 @@ class AlignmentTests(TestCase):
             np.testing.assert_almost_equal(sorted(a.values()),
                                            sorted(e.values()), 5)
 
+    def test_sequence_lengths(self):
+        self.assertEqual(self.a1.sequence_lengths(), [13, 13, 13])
+        self.assertEqual(self.no_positions.sequence_lengths(), [0, 0])
+        self.assertEqual(self.empty.sequence_lengths(), [])
+
     def test_sequence_length(self):
         self.assertEqual(self.a1.sequence_length(), 13)
         self.assertEqual(self.a2.sequence_length(), 5)
@@ -962,7 +1139,7 @@ class StockholmAlignmentTests(TestCase):
                    '#=GR seq1 SS  1110101111\n'
                    'seq2          TCC-G-GGCA\n'
                    '#=GR seq2 SS  0110101110\n'
-                   '#=GC SS_cons  (((....)))\n//')
+                   '#=GC SS_cons  (((....)))\n//\n')
         self.assertEqual(obs, exp)
 
     def test_str_gc(self):
@@ -604,6 +604,26 @@ class TestAlignStripedSmithWaterman(TestSSW):
         self.assertEquals(type(align1[0]), Sequence)
         self.assertEquals(type(align2[0]), DNA)
 
+    def test_lightweight(self):
+        query_sequence = 'AGGGTAATTAGGCGTGTTCACCTA'
+        target_sequence = 'TACTTATAAGATGTCTCAACGGCATGCGCAACTTGTGAAGTG'
+        expected = StripedSmithWaterman(query_sequence)(target_sequence)
+
+        obs = local_pairwise_align_ssw(DNA(query_sequence),
+                                       DNA(target_sequence),
+                                       lightweight=True)
+
+        self.assertIsInstance(obs, AlignmentStructure)
+        for attr in self.align_attributes:
+            self.assertEqual(obs[attr], expected[attr])
+        self._check_Alignment_to_AlignmentStructure(
+            local_pairwise_align_ssw(query_sequence, target_sequence), obs)
+
+    def test_lightweight_filtered(self):
+        self.assertIsNone(local_pairwise_align_ssw(
+            'AGGGTAATTAGGCGTGTTCACCTA', 'TACTTATAAGATGTCTCAACGGCATGCGC',
+            lightweight=True, score_filter=500))
+
 
 class TestAlignmentStructure(TestSSW):
 
@@ -739,6 +759,23 @@ class TestAlignmentStructure(TestSSW):
         self.assertEqual("AGGGTAAT-TAGGCGTGTTCACCTA",
                          alignment.aligned_query_sequence)
 
+    def test_aligned_query_target_sequence_one_based(self):
+        query = StripedSmithWaterman("AGGGTAATTAGGCGTGTTCACCTA",
+                                     zero_index=False)
+        alignment = query("AGTCGAAGGGTAATATAGGCGTGTCACCTA")
+        self.assertEqual("AGGGTAATATAGGCGT-GTCACCTA",
+                         alignment.aligned_target_sequence)
+        self.assertEqual("AGGGTAAT-TAGGCGTGTTCACCTA",
+                         alignment.aligned_query_sequence)
+
+    def test_aligned_query_target_sequence_is_cached(self):
+        query = StripedSmithWaterman("AGGGTAATTAGGCGTGTTCACCTA")
+        alignment = query("AGTCGAAGGGTAATATAGGCGTGTCACCTA")
+        self.assertIs(alignment.aligned_target_sequence,
+                      alignment.aligned_target_sequence)
+        self.assertIs(alignment.aligned_query_sequence,
+                      alignment.aligned_query_sequence)
+
     def test_aligned_query_target_sequence_with_suppressed_sequences(self):
         query = StripedSmithWaterman("AGGGTAATTAGGCGTGTTCACCTA",
                                      suppress_sequences=True)
@@ -0,0 +1,73 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+from skbio.tree import TreeArray
+
+# number of node by sample values computed at a time
+_BLOCK_SIZE = 2 ** 20
+
+
+def _sample_branch_matrix(counts, otu_ids, tree, weighted):
+    """Return a sparse sample by node matrix of observed branch lengths.
+
+    Each entry is the length of the branch above a node, if the sample has
+    counts below that node, or, if `weighted`, that length multiplied by the
+    proportion of the counts of the sample below the node.
+
+    """
+    if not isinstance(tree, TreeArray):
+        tree = TreeArray.from_tree_node(tree)
+    length = tree._nonroot_lengths()
+
+    tips = tree.tips()
+    tip_index = dict(zip(tree.name[tips].tolist(), tips.tolist()))
+    otu_ids = list(otu_ids)
+    if len(set(otu_ids)) != len(otu_ids):
+        raise ValueError("otu_ids must be unique.")
+    missing = [otu_id for otu_id in otu_ids if otu_id not in tip_index]
+    if missing:
+        raise ValueError("%d OTU id(s) are not tips of the tree, including "
+                         "%r." % (len(missing), missing[0]))
+    if len(tip_index) != len(tips):
+        raise ValueError("The names of the tips of the tree must be unique.")
+    otu_nodes = np.array([tip_index[otu_id] for otu_id in otu_ids],
+                         dtype=np.intp)
+
+    counts = csr_matrix(counts, dtype=np.float64)
+    if counts.shape[1] != len(otu_ids):
+        raise ValueError("Number of columns in counts (%d) must be equal to "
+                         "the number of OTU ids (%d)." %
+                         (counts.shape[1], len(otu_ids)))
+    if (counts.data < 0).any():
+        raise ValueError("Counts must not be negative.")
+    if weighted:
+        totals = np.asarray(counts.sum(axis=1)).ravel()
+        totals[totals == 0] = 1
+        counts = csr_matrix(counts.multiply(1 / totals[:, np.newaxis]))
+
+    # the counts below every node are computed for as many samples at a time
+    # as there are values in a block
+    num_samples = counts.shape[0]
+    block_rows = max(1, _BLOCK_SIZE // len(tree))
+    blocks = []
+    for start in range(0, num_samples, block_rows):
+        block = counts[start:start + block_rows]
+        values = np.zeros((len(tree), block.shape[0]))
+        values[otu_nodes] = block.T.toarray()
+        below = tree.subtree_sum(values)
+        if not weighted:
+            below = below > 0
+        blocks.append(csr_matrix((below * length[:, np.newaxis]).T))
+    if not blocks:
+        return csr_matrix((0, len(tree)))
+    return vstack(blocks, format='csr')
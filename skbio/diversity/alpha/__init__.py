@@ -61,6 +61,7 @@ Functions
    :toctree: generated/
 
    ace
+   alpha_diversity
    berger_parker_d
    brillouin_d
    chao1
@@ -70,6 +71,7 @@ Functions
    enspie
    equitability
    esty_ci
+   faith_pd
    fisher_alpha
    gini_index
    goods_coverage
@@ -84,6 +86,7 @@ Functions
    michaelis_menten_fit
    observed_otus
    osd
+   rarefaction
    robbins
    shannon
    simpson
@@ -128,6 +131,23 @@ Let's see how many singletons and doubletons there are in the sample:
 >>> doubles(counts)
 1
 
+Phylogenetic measures, such as ``faith_pd``, also take the names of the tips of
+a tree that the OTUs correspond to, and accept a matrix of counts (one row per
+sample) to compute the measure for many samples at once.
+
+To compute several measures for many samples, pass a matrix of counts (one row
+per sample, optionally a ``scipy.sparse`` matrix) to ``alpha_diversity``,
+which computes each measure for all samples at once and returns a
+``pandas.DataFrame``:
+
+>>> df = alpha_diversity([counts, [0, 2, 2, 0, 0, 0, 1, 5]],
+...                      ['observed_otus', 'singles', 'doubles'])
+>>> df.values.tolist()
+[[5, 2, 1], [4, 1, 2]]
+
+``rarefaction`` computes measures in the same way for every sample repeatedly
+subsampled to several depths (see also ``skbio.stats.rarefy``).
+
 """
 
 # ----------------------------------------------------------------------------
@@ -141,7 +161,9 @@ Let's see how many singletons and doubletons there are in the sample:
 from skbio.util import TestRunner
 
 from ._ace import ace
+from ._batch import alpha_diversity, rarefaction
 from ._chao1 import chao1, chao1_ci
+from ._faith_pd import faith_pd
 from ._base import (
     berger_parker_d, brillouin_d, dominance, doubles, enspie, equitability,
     esty_ci, fisher_alpha, goods_coverage, heip_e, kempton_taylor_q, margalef,
@@ -150,12 +172,12 @@ from ._base import (
 from ._gini import gini_index
 from ._lladser import lladser_pe, lladser_ci
 
-__all__ = ['ace', 'chao1', 'chao1_ci', 'berger_parker_d', 'brillouin_d',
-           'dominance', 'doubles', 'enspie', 'equitability', 'esty_ci',
-           'fisher_alpha', 'goods_coverage', 'heip_e', 'kempton_taylor_q',
-           'margalef', 'mcintosh_d', 'mcintosh_e', 'menhinick',
-           'michaelis_menten_fit', 'observed_otus', 'osd', 'robbins',
-           'shannon', 'simpson', 'simpson_e', 'singles', 'strong',
-           'gini_index', 'lladser_pe', 'lladser_ci']
+__all__ = ['ace', 'alpha_diversity', 'chao1', 'chao1_ci', 'berger_parker_d',
+           'brillouin_d', 'dominance', 'doubles', 'enspie', 'equitability',
+           'esty_ci', 'faith_pd', 'fisher_alpha', 'goods_coverage', 'heip_e',
+           'kempton_taylor_q', 'margalef', 'mcintosh_d', 'mcintosh_e',
+           'menhinick', 'michaelis_menten_fit', 'observed_otus', 'osd',
+           'rarefaction', 'robbins', 'shannon', 'simpson', 'simpson_e',
+           'singles', 'strong', 'gini_index', 'lladser_pe', 'lladser_ci']
 
 test = TestRunner(__file__).test
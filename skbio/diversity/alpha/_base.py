@@ -9,6 +9,7 @@
 from __future__ import absolute_import, division, print_function
 
 import numpy as np
+from scipy.sparse import issparse, csr_matrix
 from scipy.special import gammaln
 from scipy.optimize import fmin_powell, minimize_scalar
 
@@ -34,6 +35,28 @@ def _validate(counts, suppress_cast=False):
     return counts
 
 
+def _validate_matrix(counts):
+    """Validate and convert input to a sparse counts matrix.
+
+    The returned ``csr_matrix`` has one row per sample and stores no zeros.
+
+    """
+    if issparse(counts):
+        counts = csr_matrix(counts, copy=True)
+    else:
+        counts = np.asarray(counts)
+        if counts.ndim != 2:
+            raise ValueError("Only 2-D matrices are supported.")
+        counts = csr_matrix(counts.astype(int, casting='safe', copy=False))
+
+    counts.data = counts.data.astype(int, casting='safe', copy=False)
+    if (counts.data < 0).any():
+        raise ValueError("Counts matrix cannot contain negative values.")
+    counts.sum_duplicates()
+    counts.eliminate_zeros()
+    return counts
+
+
 def berger_parker_d(counts):
     """Calculate Berger-Parker dominance.
 
@@ -0,0 +1,355 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+import pandas as pd
+from six import string_types
+from scipy.special import gammaln
+
+from skbio.stats import rarefy
+
+from ._base import (_validate_matrix, fisher_alpha, kempton_taylor_q,
+                    michaelis_menten_fit, strong)
+from ._faith_pd import faith_pd
+from ._gini import gini_index
+from ._lladser import lladser_pe
+
+
+def alpha_diversity(counts, metrics, ids=None, otu_ids=None, tree=None):
+    """Compute alpha diversity metrics for every sample in a counts matrix
+
+    Parameters
+    ----------
+    counts : 2-D array_like, int, or scipy.sparse matrix
+        Matrix of counts where each row contains the counts of a sample.
+    metrics : str or iterable of strs
+        Names of the alpha diversity measures to compute (e.g.,
+        ``"shannon"``), each with its default parameters. Measures returning
+        a confidence interval or several values (e.g., ``chao1_ci`` or
+        ``osd``) are not supported.
+    ids : iterable of strs, optional
+        Identifiers for each sample in `counts`.
+    otu_ids : iterable of strs, optional
+        The name of the tip of `tree` that each column of `counts`
+        corresponds to. Required by phylogenetic measures (``faith_pd``).
+    tree : skbio.TreeNode or skbio.tree.TreeArray, optional
+        Tree relating the OTUs. Required by phylogenetic measures
+        (``faith_pd``).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The value of each measure (columns, in the order of `metrics`) for
+        each sample (rows, indexed by `ids` if provided).
+
+    Raises
+    ------
+    ValueError
+        If a measure is unknown or not supported, if ``len(ids)`` is not the
+        number of rows in `counts`, if `counts` is not a 2-D matrix or
+        contains negative values, or if ``faith_pd`` is requested without
+        `otu_ids` and `tree`.
+    TypeError
+        If `counts` does not contain integers.
+
+    See Also
+    --------
+    skbio.diversity.beta.pw_distances
+
+    Notes
+    -----
+    The results are the same as those of applying each measure to every row
+    of `counts` (e.g., ``nan`` for measures that are undefined for a sample),
+    but `counts` is validated once, and most measures are computed for all
+    samples at once from the nonzero counts of a sparse matrix. The
+    statistics they are built from (total, observed OTUs, singletons,
+    doubletons, etc.) are computed once and shared between measures. The
+    measures ``fisher_alpha``, ``gini_index``, ``kempton_taylor_q``,
+    ``lladser_pe``, ``michaelis_menten_fit`` and ``strong`` are computed
+    one sample at a time.
+
+    Examples
+    --------
+    >>> from skbio.diversity.alpha import alpha_diversity
+    >>> counts = [[1, 0, 0, 4, 1, 2, 3, 0],
+    ...           [0, 2, 2, 0, 0, 0, 1, 5]]
+    >>> df = alpha_diversity(counts, ['observed_otus', 'singles', 'chao1'],
+    ...                      ids=['A', 'B'])
+    >>> df.loc['A', 'observed_otus']
+    5
+    >>> df.loc['B', 'chao1']
+    4.0
+
+    """
+    if isinstance(metrics, string_types):
+        metrics = [metrics]
+    metrics = list(metrics)
+    for metric in metrics:
+        if metric not in _vectorized_metrics and \
+                metric not in _row_metrics and metric != 'faith_pd':
+            raise ValueError(
+                "Unknown or unsupported alpha diversity measure %r. "
+                "Supported measures: %s." %
+                (metric, ', '.join(sorted(
+                    list(_vectorized_metrics) + list(_row_metrics) +
+                    ['faith_pd']))))
+    if 'faith_pd' in metrics and (otu_ids is None or tree is None):
+        raise ValueError("otu_ids and tree must be provided to compute "
+                         "faith_pd.")
+
+    counts = _validate_matrix(counts)
+    num_samples = counts.shape[0]
+    if ids is not None:
+        ids = list(ids)
+        if len(ids) != num_samples:
+            raise ValueError(
+                "Number of rows in counts must be equal to number of "
+                "provided ids.")
+
+    stats = _SampleStats(counts)
+    results = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for metric in metrics:
+            if metric in _vectorized_metrics:
+                results[metric] = _vectorized_metrics[metric](stats)
+            elif metric == 'faith_pd':
+                results[metric] = faith_pd(counts, otu_ids, tree)
+            else:
+                func = _row_metrics[metric]
+                results[metric] = np.array(
+                    [func(counts[i].toarray().ravel())
+                     for i in range(num_samples)])
+    return pd.DataFrame(results, index=ids, columns=metrics)
+
+
+def rarefaction(counts, metrics, depths, iterations=10, ids=None, n_jobs=1,
+                otu_ids=None, tree=None):
+    """Compute alpha diversity metrics of repeatedly subsampled samples
+
+    Parameters
+    ----------
+    counts : 2-D array_like, int, or scipy.sparse matrix
+        Matrix of counts where each row contains the counts of a sample.
+    metrics : str or iterable of strs
+        Names of the alpha diversity measures to compute, as in
+        ``alpha_diversity``.
+    depths : int or iterable of ints
+        Numbers of items to subsample (without replacement) from each sample.
+    iterations : int, optional
+        Number of times each sample is subsampled to each depth.
+    ids : iterable of strs, optional
+        Identifiers for each sample in `counts`.
+    n_jobs : int, optional
+        Number of threads subsampling chunks of samples.
+    otu_ids : iterable of strs, optional
+        The name of the tip of `tree` that each column of `counts`
+        corresponds to, as in ``alpha_diversity``.
+    tree : skbio.TreeNode or skbio.tree.TreeArray, optional
+        Tree relating the OTUs, as in ``alpha_diversity``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The value of each measure (columns) for each sample, depth and
+        iteration (rows, indexed by a ``MultiIndex`` of levels ``"id"``,
+        ``"depth"`` and ``"iteration"``, in this order). The measures of a
+        sample at a depth larger than its number of counts are ``nan``.
+
+    Raises
+    ------
+    ValueError
+        For the same reasons as ``alpha_diversity`` and
+        ``skbio.stats.rarefy``.
+    TypeError
+        If `counts` does not contain integers.
+
+    See Also
+    --------
+    alpha_diversity
+    skbio.stats.rarefy
+
+    Notes
+    -----
+    The subsamples of all samples at all depths are drawn by
+    ``skbio.stats.rarefy`` (all depths from one nested draw per iteration),
+    and the measures of each subsampled matrix are computed by
+    ``alpha_diversity``.
+
+    Examples
+    --------
+    >>> from skbio.diversity.alpha import rarefaction
+    >>> counts = [[1, 0, 0, 4, 1, 2, 3, 0],
+    ...           [0, 2, 2, 0, 0, 0, 1, 5]]
+    >>> df = rarefaction(counts, 'observed_otus', [1, 20], iterations=2,
+    ...                  ids=['A', 'B'])
+    >>> df.loc['A', 'observed_otus'].tolist()
+    [1.0, 1.0, nan, nan]
+    >>> list(df.index.names)
+    ['id', 'depth', 'iteration']
+
+    """
+    counts = _validate_matrix(counts)
+    num_samples = counts.shape[0]
+    ids = list(range(num_samples) if ids is None else ids)
+    if len(ids) != num_samples:
+        raise ValueError(
+            "Number of rows in counts must be equal to number of provided "
+            "ids.")
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+
+    frames = []
+    for iteration, depth, subsampled in rarefy(counts, depths, iterations,
+                                               n_jobs):
+        frame = alpha_diversity(subsampled, metrics, otu_ids=otu_ids,
+                                tree=tree).astype(float)
+        frame.loc[totals < depth] = np.nan
+        frame.index = pd.MultiIndex.from_arrays(
+            [ids, np.repeat(depth, num_samples),
+             np.repeat(iteration, num_samples)],
+            names=['id', 'depth', 'iteration'])
+        frames.append(frame)
+    return pd.concat(frames).sort_index()
+
+
+class _SampleStats(object):
+    """Statistics of each row of a sparse counts matrix
+
+    The statistics used by several measures are computed on first use and
+    kept for the other measures.
+
+    """
+
+    def __init__(self, counts):
+        self.num_samples = counts.shape[0]
+        self.data = counts.data
+        self.indptr = counts.indptr
+        self.rows = np.repeat(np.arange(self.num_samples),
+                              np.diff(counts.indptr))
+        self._cache = {}
+
+    def row_sums(self, values):
+        """Sum per-nonzero-count `values` over each row, as doubles."""
+        # bincount gives integers if there are no values at all
+        return np.bincount(self.rows, values,
+                           minlength=self.num_samples).astype(np.float64)
+
+    def _cached(self, name, compute):
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    @property
+    def total(self):
+        return self._cached('total', lambda: self.row_sums(self.data))
+
+    @property
+    def observed(self):
+        return self._cached('observed', lambda: np.diff(self.indptr))
+
+    @property
+    def singles(self):
+        return self._cached(
+            'singles', lambda: np.bincount(self.rows[self.data == 1],
+                                           minlength=self.num_samples))
+
+    @property
+    def doubles(self):
+        return self._cached(
+            'doubles', lambda: np.bincount(self.rows[self.data == 2],
+                                           minlength=self.num_samples))
+
+    @property
+    def sum_of_squares(self):
+        return self._cached('sum_of_squares',
+                            lambda: self.row_sums(self.data ** 2))
+
+    @property
+    def dominance(self):
+        return self._cached('dominance',
+                            lambda: self.sum_of_squares / self.total ** 2)
+
+    @property
+    def entropy(self):
+        # Shannon entropy in nats, undefined (as in shannon) without counts
+        def compute():
+            freqs = self.data / self.total[self.rows]
+            entropy = -self.row_sums(freqs * np.log(freqs))
+            entropy[self.total == 0] = np.nan
+            return entropy
+        return self._cached('entropy', compute)
+
+    @property
+    def max(self):
+        def compute():
+            maxes = np.zeros(self.num_samples, dtype=self.data.dtype)
+            nonempty = self.observed > 0
+            maxes[nonempty] = np.maximum.reduceat(
+                self.data, self.indptr[:-1][nonempty])
+            return maxes
+        return self._cached('max', compute)
+
+
+def _ace(stats, rare_threshold=10):
+    rare = stats.data <= rare_threshold
+    s_rare = np.bincount(stats.rows[rare], minlength=stats.num_samples)
+    singles = stats.singles
+    if ((singles > 0) & (singles == s_rare)).any():
+        raise ValueError("The only rare OTUs are singletons, so the ACE "
+                         "metric is undefined. EstimateS suggests using "
+                         "bias-corrected Chao1 instead.")
+    s_abun = stats.observed - s_rare
+    n_rare = stats.row_sums(stats.data * rare)
+    c_ace = 1 - singles / n_rare
+    top = s_rare * stats.row_sums(stats.data * (stats.data - 1) * rare)
+    bottom = c_ace * n_rare * (n_rare - 1)
+    gamma_ace = np.maximum(top / bottom - 1, 0)
+    estimate = s_abun + (s_rare / c_ace) + ((singles / c_ace) * gamma_ace)
+    return np.where(s_rare == 0, s_abun, estimate)
+
+
+# Measures computed for all samples at once from their statistics, with the
+# same formulas as the functions of the same names
+_vectorized_metrics = {
+    'ace': _ace,
+    'berger_parker_d': lambda s: s.max / s.total,
+    'brillouin_d': lambda s: (gammaln(s.total + 1) -
+                              s.row_sums(gammaln(s.data + 1))) / s.total,
+    'chao1': lambda s: (s.observed +
+                        s.singles * (s.singles - 1) / (2 * (s.doubles + 1))),
+    'dominance': lambda s: s.dominance,
+    'doubles': lambda s: s.doubles,
+    'enspie': lambda s: 1 / s.dominance,
+    'equitability': lambda s: s.entropy / np.log(s.observed),
+    'goods_coverage': lambda s: 1 - (s.singles / s.total),
+    'heip_e': lambda s: (np.exp(s.entropy) - 1) / (s.observed - 1),
+    'margalef': lambda s: (s.observed - 1) / np.log(s.total),
+    'mcintosh_d': lambda s: ((s.total - np.sqrt(s.sum_of_squares)) /
+                             (s.total - np.sqrt(s.total))),
+    'mcintosh_e': lambda s: (np.sqrt(s.sum_of_squares) /
+                             np.sqrt((s.total - s.observed + 1) ** 2 +
+                                     s.observed - 1)),
+    'menhinick': lambda s: s.observed / np.sqrt(s.total),
+    'observed_otus': lambda s: s.observed,
+    'robbins': lambda s: s.singles / s.total,
+    'shannon': lambda s: s.entropy / np.log(2),
+    'simpson': lambda s: 1 - s.dominance,
+    'simpson_e': lambda s: 1 / s.dominance / s.observed,
+    'singles': lambda s: s.singles,
+}
+
+# Measures computed one sample (dense row of counts) at a time
+_row_metrics = {
+    'fisher_alpha': fisher_alpha,
+    'gini_index': gini_index,
+    'kempton_taylor_q': kempton_taylor_q,
+    'lladser_pe': lladser_pe,
+    'michaelis_menten_fit': michaelis_menten_fit,
+    'strong': strong,
+}
@@ -0,0 +1,84 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+from scipy.sparse import issparse
+
+from skbio.diversity._phylogenetic import _sample_branch_matrix
+from ._base import _validate
+
+
+def faith_pd(counts, otu_ids, tree):
+    """Calculate Faith's phylogenetic diversity.
+
+    Faith's phylogenetic diversity (PD) is the total length of the branches
+    of the tree connecting the OTUs observed in a sample to the root.
+
+    Parameters
+    ----------
+    counts : 1-D or 2-D array_like, int, or scipy.sparse matrix
+        Vector of counts, or matrix of counts where each row contains the
+        counts of a sample.
+    otu_ids : iterable of strs
+        The name of the tip of `tree` that each OTU in `counts` corresponds
+        to.
+    tree : skbio.TreeNode or skbio.tree.TreeArray
+        Tree relating the OTUs, with lengths on all of its branches.
+
+    Returns
+    -------
+    double or np.ndarray of doubles
+        Faith's PD of the sample, or of each sample if `counts` is a matrix.
+
+    Raises
+    ------
+    ValueError
+        If `otu_ids` are not unique tip names of `tree`, or if their number
+        does not match the number of OTUs in `counts`.
+    skbio.tree.NoLengthError
+        If a branch of `tree` has no length.
+
+    See Also
+    --------
+    skbio.TreeNode.descending_branch_length
+
+    Notes
+    -----
+    Faith's PD was first described in [1]_. Branches on the path from the
+    lowest common ancestor of the observed OTUs to the root are included, so
+    that the PDs of samples are comparable; unlike
+    ``TreeNode.descending_branch_length``, which stops at that ancestor.
+
+    The branches observed in every sample are found at once, from subtree
+    sums of the counts over an array representation of the tree
+    (``skbio.tree.TreeArray``), so the tree is not walked once per sample.
+
+    References
+    ----------
+    .. [1] Faith, D. P. Conservation evaluation and phylogenetic diversity.
+       Biol. Conserv. 61, 1-10 (1992).
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> tree = TreeNode.read(StringIO(u'((a:1,b:2):1,c:3);'))
+    >>> print(faith_pd([1, 0, 0], ['a', 'b', 'c'], tree))
+    2.0
+    >>> faith_pd([[1, 0, 0], [0, 1, 1], [0, 0, 0]], ['a', 'b', 'c'], tree)
+    array([ 2.,  6.,  0.])
+
+    """
+    single = not issparse(counts) and np.ndim(counts) == 1
+    if single:
+        counts = _validate(counts)[np.newaxis]
+    branches = _sample_branch_matrix(counts, otu_ids, tree, weighted=False)
+    pd = np.asarray(branches.sum(axis=1)).ravel()
+    return pd[0] if single else pd
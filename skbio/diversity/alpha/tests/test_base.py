@@ -12,13 +12,14 @@ from unittest import TestCase, main
 
 import numpy as np
 import numpy.testing as npt
+from scipy.sparse import csr_matrix
 
 from skbio.diversity.alpha import (
     berger_parker_d, brillouin_d, dominance, doubles, enspie, equitability,
     esty_ci, fisher_alpha, goods_coverage, heip_e, kempton_taylor_q, margalef,
     mcintosh_d, mcintosh_e, menhinick, michaelis_menten_fit, observed_otus,
     osd, robbins, shannon, simpson, simpson_e, singles, strong)
-from skbio.diversity.alpha._base import _validate
+from skbio.diversity.alpha._base import _validate, _validate_matrix
 
 
 class BaseTests(TestCase):
@@ -76,6 +77,23 @@ class BaseTests(TestCase):
         with self.assertRaises(ValueError):
             _validate([0, 0, 2, -1, 3])
 
+    def test_validate_matrix(self):
+        exp = [[0, 2, 1], [0, 0, 0]]
+        for counts in exp, csr_matrix(exp):
+            obs = _validate_matrix(counts)
+            npt.assert_array_equal(obs.toarray(), exp)
+            self.assertEqual(obs.nnz, 2)
+            self.assertEqual(obs.dtype, int)
+
+        with self.assertRaises(TypeError):
+            _validate_matrix([[0, 2.5]])
+        with self.assertRaises(TypeError):
+            _validate_matrix(csr_matrix([[0, 2.5]]))
+        with self.assertRaises(ValueError):
+            _validate_matrix([0, 2])
+        with self.assertRaises(ValueError):
+            _validate_matrix(csr_matrix([[0, -2]]))
+
     def test_berger_parker_d(self):
         self.assertEqual(berger_parker_d(np.array([5])), 1)
         self.assertEqual(berger_parker_d(np.array([5, 5])), 0.5)
@@ -0,0 +1,165 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pandas.util.testing as pdt
+from scipy.sparse import csr_matrix
+from six import StringIO
+
+from skbio import TreeNode
+from skbio.diversity import alpha
+from skbio.diversity.alpha import alpha_diversity, faith_pd, rarefaction
+from skbio.diversity.alpha._batch import _vectorized_metrics, _row_metrics
+from skbio.stats import rarefy
+
+
+class AlphaDiversityTests(TestCase):
+    def setUp(self):
+        self.counts = np.array([[0, 1, 1, 4, 2, 5, 2, 4, 1, 2],
+                                [1, 0, 0, 4, 1, 2, 3, 0, 0, 0],
+                                [3, 3, 12, 0, 0, 1, 2, 8, 1, 1],
+                                [7, 7, 7, 7, 7, 7, 7, 7, 7, 7],
+                                [0, 0, 0, 30, 0, 0, 0, 0, 0, 0]])
+        self.ids = list('ABCDE')
+
+    def expected(self, counts, metrics):
+        return pd.DataFrame(
+            {metric: [getattr(alpha, metric)(row) for row in counts]
+             for metric in metrics}, index=self.ids, columns=metrics)
+
+    def test_matches_single_sample_measures(self):
+        metrics = sorted(_vectorized_metrics) + sorted(_row_metrics)
+        np.random.seed(0)
+        exp = self.expected(self.counts, metrics)
+        for counts in self.counts, csr_matrix(self.counts):
+            np.random.seed(0)
+            obs = alpha_diversity(counts, metrics, self.ids)
+            self.assertEqual(list(obs.columns), metrics)
+            self.assertEqual(list(obs.index), self.ids)
+            npt.assert_almost_equal(obs.values, exp.values)
+
+    def test_sample_without_counts(self):
+        metrics = sorted(set(_vectorized_metrics) - set(['ace']))
+        counts = np.vstack([self.counts[:3], np.zeros(10, dtype=int),
+                            self.counts[3:4]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exp = self.expected(counts, metrics)
+        obs = alpha_diversity(counts, metrics, self.ids)
+        npt.assert_almost_equal(obs.values, exp.values)
+        self.assertTrue(np.isnan(obs.loc['D', 'shannon']))
+
+    def test_all_samples_without_counts(self):
+        metrics = ['shannon', 'equitability', 'heip_e', 'dominance']
+        obs = alpha_diversity([[0, 0], [0, 0]], metrics)
+        self.assertEqual(obs.shape, (2, 4))
+        self.assertTrue(np.isnan(obs[['shannon', 'equitability',
+                                      'heip_e']].values).all())
+
+    def test_single_metric_and_default_index(self):
+        obs = alpha_diversity(self.counts, 'observed_otus')
+        exp = pd.DataFrame({'observed_otus': [9, 5, 8, 10, 1]})
+        pdt.assert_frame_equal(obs, exp, check_dtype=False)
+
+    def test_faith_pd(self):
+        tree = TreeNode.read(StringIO(
+            u'((a:1,b:2):1,(c:3,(d:1,e:1):2):1,(f:1,g:2,h:1,i:1,j:1):4);'))
+        otu_ids = list('abcdefghij')
+        obs = alpha_diversity(self.counts, ['faith_pd', 'singles'], self.ids,
+                              otu_ids=otu_ids, tree=tree)
+        npt.assert_almost_equal(obs['faith_pd'].values,
+                                faith_pd(self.counts, otu_ids, tree))
+
+        with self.assertRaises(ValueError):
+            alpha_diversity(self.counts, ['faith_pd'], self.ids)
+
+    def test_invalid_input(self):
+        for metric in 'chao1_ci', 'osd', 'foo':
+            with self.assertRaises(ValueError):
+                alpha_diversity(self.counts, [metric])
+        with self.assertRaises(ValueError):
+            alpha_diversity(self.counts, ['shannon'], ids=list('AB'))
+        with self.assertRaises(ValueError):
+            alpha_diversity(self.counts[0], ['shannon'])
+        with self.assertRaises(ValueError):
+            alpha_diversity(-self.counts, ['shannon'])
+        with self.assertRaises(TypeError):
+            alpha_diversity(self.counts / 2, ['shannon'])
+
+    def test_ace_only_rare_singletons(self):
+        with self.assertRaises(ValueError):
+            alpha_diversity([[1, 1, 20], [2, 3, 4]], ['ace'])
+
+
+class RarefactionTests(TestCase):
+    def setUp(self):
+        self.counts = np.array([[0, 1, 1, 4, 2, 5, 2, 4, 1, 2],
+                                [1, 0, 0, 4, 1, 2, 3, 0, 0, 0],
+                                [30, 3, 12, 0, 0, 1, 2, 8, 1, 1]])
+        self.ids = list('ABC')
+
+    def test_rarefaction(self):
+        metrics = ['observed_otus', 'shannon', 'chao1']
+        depths = [5, 11, 20]
+        np.random.seed(0)
+        obs = rarefaction(csr_matrix(self.counts), metrics, depths,
+                          iterations=3, ids=self.ids)
+        self.assertEqual(list(obs.columns), metrics)
+        self.assertEqual(list(obs.index.names),
+                         ['id', 'depth', 'iteration'])
+        self.assertEqual(list(obs.index),
+                         [(i, d, it) for i in self.ids for d in depths
+                          for it in range(3)])
+
+        np.random.seed(0)
+        for iteration, depth, sub in rarefy(self.counts, depths, 3):
+            exp = alpha_diversity(sub, metrics, self.ids)
+            for i, sample_id in enumerate(self.ids):
+                values = obs.loc[(sample_id, depth, iteration)].values
+                if self.counts[i].sum() < depth:
+                    self.assertTrue(np.isnan(values).all())
+                else:
+                    npt.assert_almost_equal(values,
+                                            exp.loc[sample_id].values)
+
+    def test_rarefaction_default_ids(self):
+        obs = rarefaction(self.counts, 'observed_otus', 5, iterations=2)
+        self.assertEqual(list(obs.index),
+                         [(i, 5, it) for i in range(3) for it in range(2)])
+        self.assertTrue((obs['observed_otus'] <= 5).all())
+
+    def test_rarefaction_no_subsampled_counts(self):
+        # no sample has counts at depth 0, and none reaches depth 100
+        metrics = ['observed_otus', 'shannon', 'heip_e']
+        obs = rarefaction(self.counts, metrics, [0, 100], iterations=2,
+                          ids=self.ids)
+        self.assertEqual(list(obs.index),
+                         [(i, d, it) for i in self.ids for d in (0, 100)
+                          for it in range(2)])
+        npt.assert_equal(obs.xs(0, level='depth')['observed_otus'].values,
+                         np.zeros(6))
+        self.assertTrue(np.isnan(obs.xs(0, level='depth')[
+            ['shannon', 'heip_e']].values).all())
+        self.assertTrue(np.isnan(obs.xs(100, level='depth').values).all())
+
+    def test_rarefaction_invalid_input(self):
+        with self.assertRaises(ValueError):
+            rarefaction(self.counts, 'observed_otus', 5, ids=list('AB'))
+        with self.assertRaises(ValueError):
+            rarefaction(self.counts, 'foo', 5)
+        with self.assertRaises(ValueError):
+            rarefaction(self.counts, 'observed_otus', -5)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+from scipy.sparse import csr_matrix
+from six import StringIO
+
+from skbio import TreeNode
+from skbio.tree import TreeArray, NoLengthError
+from skbio.diversity.alpha import faith_pd
+
+
+class FaithPDTests(TestCase):
+    def setUp(self):
+        self.tree = TreeNode.read(StringIO(
+            u"(((OTU1:0.5,OTU2:0.5):0.5,OTU3:1.0):1.0,"
+            u"(OTU4:0.75,(OTU5:0.5,(OTU6:0.5,OTU7:0.5):0.5):0.5):1.25)"
+            u"root;"))
+        self.otu_ids = ['OTU%d' % i for i in range(1, 8)]
+        self.counts = np.array([[1, 1, 0, 0, 0, 0, 0],
+                                [0, 3, 35, 42, 0, 12, 1],
+                                [0, 0, 0, 0, 0, 0, 0],
+                                [4, 5, 6, 7, 8, 9, 10],
+                                [0, 0, 0, 0, 0, 0, 1]])
+
+    def naive_faith_pd(self, counts):
+        branches = set()
+        for otu_id, count in zip(self.otu_ids, counts):
+            if count:
+                node = self.tree.find(otu_id)
+                branches.update(node.ancestors()[:-1])
+                branches.add(node)
+        return sum(node.length for node in branches)
+
+    def test_faith_pd(self):
+        exp = [self.naive_faith_pd(counts) for counts in self.counts]
+        npt.assert_almost_equal(exp, [2.5, 7.0, 0.0, 8.0, 2.75])
+        for counts in self.counts, csr_matrix(self.counts):
+            npt.assert_almost_equal(
+                faith_pd(counts, self.otu_ids, self.tree), exp)
+        npt.assert_almost_equal(
+            faith_pd(self.counts, self.otu_ids,
+                     TreeArray.from_tree_node(self.tree)), exp)
+
+        for counts, pd in zip(self.counts, exp):
+            obs = faith_pd(counts, self.otu_ids, self.tree)
+            self.assertAlmostEqual(obs, pd)
+            self.assertEqual(np.ndim(obs), 0)
+
+    def test_faith_pd_otu_subset(self):
+        obs = faith_pd([0, 1, 2], ['OTU7', 'OTU2', 'OTU4'], self.tree)
+        self.assertAlmostEqual(obs, 0.5 + 0.5 + 1.0 + 0.75 + 1.25)
+
+    def test_faith_pd_invalid_input(self):
+        with self.assertRaises(ValueError):
+            faith_pd([1, -1], ['OTU1', 'OTU2'], self.tree)
+        with self.assertRaises(TypeError):
+            faith_pd([1.5, 1], ['OTU1', 'OTU2'], self.tree)
+        with self.assertRaises(ValueError):
+            faith_pd([1, 1], ['OTU1', 'OTU9'], self.tree)
+        with self.assertRaises(ValueError):
+            faith_pd([1, 1, 1], ['OTU1', 'OTU2'], self.tree)
+
+        tree = TreeNode.read(StringIO(u'((a:1,b):1,c:3);'))
+        with self.assertRaises(NoLengthError):
+            faith_pd([1, 0, 0], 'abc', tree)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,13 @@ to contain pairwise distance/dissimilarity methods that are not implemented
 The functions in this package currently support applying ``pdist`` functions
 to all pairs of samples in a sample by observation count or abundance matrix
 and returning an ``skbio.DistanceMatrix`` object. This application is
-illustrated below for a few different forms of input.
+illustrated below for a few different forms of input. Counts can also be
+provided as a ``scipy.sparse`` matrix for the Bray-Curtis, city block, Jaccard
+and Euclidean distances, and the distances can be computed by several threads
+and written to a memory-mapped array (see ``pw_distances``).
+
+Phylogenetic distances between samples, which relate the observations through
+a tree, are computed by ``unweighted_unifrac`` and ``weighted_unifrac``.
 
 Functions
 ---------
@@ -22,6 +28,8 @@ Functions
 
     pw_distances
     pw_distances_from_table
+    unweighted_unifrac
+    weighted_unifrac
 
 Examples
 --------
@@ -188,7 +196,9 @@ References
 from skbio.util import TestRunner
 
 from ._base import pw_distances, pw_distances_from_table
+from ._unifrac import unweighted_unifrac, weighted_unifrac
 
-__all__ = ["pw_distances", "pw_distances_from_table"]
+__all__ = ["pw_distances", "pw_distances_from_table", "unweighted_unifrac",
+           "weighted_unifrac"]
 
 test = TestRunner(__file__).test
@@ -8,20 +8,25 @@
 
 from __future__ import absolute_import, division, print_function
 
+from functools import partial
 from warnings import warn
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
+from scipy.sparse import issparse, csr_matrix
+from scipy.spatial.distance import cdist, squareform
 
 from skbio.stats.distance import DistanceMatrix
+from skbio.stats.distance._base import _condensed_row_ranges
 
 
-def pw_distances(counts, ids=None, metric="braycurtis"):
+def pw_distances(counts, ids=None, metric="braycurtis", n_jobs=1,
+                 condensed=False, out=None):
     """Compute distances between all pairs of columns in a counts matrix
 
     Parameters
     ----------
-    counts : 2D array_like of ints or floats
+    counts : 2D array_like of ints or floats, or scipy.sparse matrix
         Matrix containing count/abundance data where each row contains counts
         of observations in a given sample.
     ids : iterable of strs, optional
@@ -29,7 +34,19 @@ def pw_distances(counts, ids=None, metric="braycurtis"):
     metric : str, optional
         The name of the pairwise distance function to use when generating
         pairwise distances. See the scipy ``pdist`` docs, linked under *See
-        Also*, for available metrics.
+        Also*, for available metrics. If ``counts`` is sparse, only
+        ``"braycurtis"``, ``"cityblock"``, ``"jaccard"`` and ``"euclidean"``
+        are supported.
+    n_jobs : int, optional
+        Number of threads computing blocks of distances.
+    condensed : bool, optional
+        If ``True``, the returned ``DistanceMatrix`` stores its distances in
+        condensed format (see ``DistanceMatrix``).
+    out : 1D array_like of floats, optional
+        Vector (for example, a ``numpy.memmap``) of ``n * (n - 1) / 2``
+        floats that the distances between the ``n`` samples are written to in
+        condensed format. If provided, the returned ``DistanceMatrix`` stores
+        its distances in `out`.
 
     Returns
     -------
@@ -40,23 +57,183 @@ def pw_distances(counts, ids=None, metric="braycurtis"):
     Raises
     ------
     ValueError
-        If ``len(ids) != len(counts)``.
+        If ``len(ids) != len(counts)``, if `out` is not of the right shape, or
+        if `metric` is not supported for sparse ``counts``.
 
     See Also
     --------
     scipy.spatial.distance.pdist
     pw_distances_from_table
 
+    Notes
+    -----
+    The distances are computed a block of rows at a time, and written to the
+    condensed distances directly. Dense ``counts`` are compared with
+    ``scipy.spatial.distance.cdist``. For sparse ``counts``, each sample is
+    compared to the others only on the observations it has, which does not
+    require converting ``counts`` to a dense matrix; the results are the same
+    as ``pdist``'s (up to rounding, for Euclidean distances).
+
+    """
+    if issparse(counts):
+        if metric not in _sparse_metrics:
+            raise ValueError(
+                "Metric %r is not supported for sparse counts. Supported "
+                "metrics: %s." % (metric, ', '.join(sorted(_sparse_metrics))))
+        filler = partial(_sparse_block_filler, counts, _sparse_metrics[metric])
+        num_samples = counts.shape[0]
+    else:
+        counts = np.asarray(counts)
+        filler = partial(_dense_block_filler, counts, metric)
+        num_samples = len(counts)
+    return _blocked_distances(filler, num_samples, ids, n_jobs, condensed,
+                              out)
+
+
+# number of distances computed at a time
+_BLOCK_SIZE = 2 ** 20
+
+
+def _blocked_distances(filler, num_samples, ids, n_jobs, condensed, out):
+    """Compute the distances between all pairs of samples in blocks.
+
+    ``filler(out)`` returns a function filling the condensed distances of a
+    range of rows (see ``_condensed_row_ranges``) in `out`. The other
+    parameters are those of `pw_distances`.
+
     """
-    num_samples = len(counts)
     if ids is not None and num_samples != len(ids):
         raise ValueError(
             "Number of rows in counts must be equal to number of provided "
             "ids.")
 
-    distances = pdist(counts, metric)
-    return DistanceMatrix(
-        squareform(distances, force='tomatrix', checks=False), ids)
+    num_distances = num_samples * (num_samples - 1) // 2
+    if out is None:
+        out = np.empty(num_distances)
+    else:
+        condensed = True
+        if out.shape != (num_distances,):
+            raise ValueError(
+                "out must be a vector of the %d distances between %d "
+                "samples, not an array of shape %r." %
+                (num_distances, num_samples, out.shape))
+
+    fill_block = filler(out)
+    blocks = list(_condensed_row_ranges(num_samples, _BLOCK_SIZE))
+    if n_jobs == 1 or len(blocks) < 2:
+        for block in blocks:
+            fill_block(block)
+    else:
+        pool = ThreadPool(n_jobs)
+        try:
+            pool.map(fill_block, blocks)
+        finally:
+            pool.close()
+
+    if condensed:
+        return DistanceMatrix(out, ids, condensed=True)
+    return DistanceMatrix(squareform(out, force='tomatrix', checks=False), ids)
+
+
+def _dense_block_filler(counts, metric, out):
+    """Return a function filling blocks of `out` with ``cdist`` distances."""
+    def fill_block(block):
+        row, stop_row, start, stop = block
+        # the distances from each row to the rows that follow it are in the
+        # upper triangle of the block
+        dists = cdist(counts[row:stop_row], counts[row + 1:], metric)
+        out[start:stop] = dists[np.triu(np.ones(dists.shape, dtype=bool))]
+
+    return fill_block
+
+
+def _sparse_block_filler(counts, kernel, out):
+    """Return a function filling blocks of `out` with sparse distances.
+
+    Each sample is compared to the samples that follow it through the nonzero
+    counts of the observations it has: a distance is computed from a
+    statistic of each of the two samples, corrected for the observations that
+    both samples have. `kernel` is a pair of functions, as in
+    ``_sparse_metrics``.
+
+    """
+    counts = csr_matrix(counts, dtype=np.float64)
+    counts.sum_duplicates()
+    counts.eliminate_zeros()
+    by_observation = counts.tocsc()
+    row_stat, distances = kernel
+    stats = np.asarray(row_stat(counts), dtype=np.float64).ravel()
+
+    def fill_block(block):
+        row, stop_row, start, _ = block
+        for i in range(row, stop_row):
+            lo, hi = counts.indptr[i:i + 2]
+            shared = by_observation[:, counts.indices[lo:hi]]
+
+            # the counts of both samples in each observation they share, and
+            # the index of the other sample among those following sample i
+            u = np.repeat(counts.data[lo:hi], np.diff(shared.indptr))
+            follows = shared.indices > i
+            others = shared.indices[follows] - (i + 1)
+
+            stop = start + len(stats) - i - 1
+            out[start:stop] = distances(stats[i] + stats[i + 1:], u[follows],
+                                        shared.data[follows], others)
+            start = stop
+
+    return fill_block
+
+
+def _sparse_braycurtis(sums, u, v, others):
+    # sum(|u - v|) / sum(|u + v|), where both are sum(|u|) + sum(|v|) except
+    # for the shared observations
+    num = len(sums)
+    diffs = sums + np.bincount(others, abs(u - v) - abs(u) - abs(v),
+                               minlength=num)
+    totals = sums + np.bincount(others, abs(u + v) - abs(u) - abs(v),
+                                minlength=num)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return diffs / totals
+
+
+def _sparse_cityblock(sums, u, v, others):
+    # sum(|u - v|), as for Bray-Curtis
+    return sums + np.bincount(others, abs(u - v) - abs(u) - abs(v),
+                              minlength=len(sums))
+
+
+def _sparse_jaccard(sums, u, v, others):
+    # the proportion of unequal counts among the observations with nonzero
+    # counts in either sample, as in scipy, which is 0 when both samples are
+    # empty
+    num = len(sums)
+    nonzero = sums - np.bincount(others, minlength=num)
+    equal = np.bincount(others, u == v, minlength=num)
+    return (nonzero - equal) / np.maximum(nonzero, 1)
+
+
+def _sparse_euclidean(sums, u, v, others):
+    # sum(u ** 2) + sum(v ** 2) - 2 * dot(u, v), clipped against rounding
+    squares = sums - 2 * np.bincount(others, u * v, minlength=len(sums))
+    return np.sqrt(np.maximum(squares, 0))
+
+
+def _abs_row_sums(counts):
+    return abs(counts).sum(axis=1)
+
+
+# For each metric supported for sparse counts, the statistic of each sample
+# that its sums are passed to the distance function with. The distance
+# function is passed these sums for sample i and each sample j > i, and the
+# values u and v of samples i and j in each observation that they share, with
+# the index j - i - 1 of the other sample.
+_sparse_metrics = {
+    'braycurtis': (_abs_row_sums, _sparse_braycurtis),
+    'cityblock': (_abs_row_sums, _sparse_cityblock),
+    'jaccard': (lambda counts: np.diff(counts.indptr), _sparse_jaccard),
+    'euclidean': (lambda counts: counts.multiply(counts).sum(axis=1),
+                  _sparse_euclidean),
+}
 
 
 def pw_distances_from_table(table, metric="braycurtis"):
@@ -84,19 +261,24 @@ def pw_distances_from_table(table, metric="braycurtis"):
     biom.table.Table
     pw_distances
 
+    Notes
+    -----
+    The counts of the samples are extracted from ``table`` once, as a sparse
+    matrix if ``table`` stores one (``Table.matrix_data``) and `metric` is
+    supported for sparse counts by ``pw_distances``, and the distances are
+    then computed by ``pw_distances``.
+
     """
     warn("pw_distances_from_table is deprecated. In the future (tentatively "
          "scikit-bio 0.3.0), pw_distance will take a biom.table.Table object "
          "and this function will be removed. You will need to update your "
          "code to call pw_distances at that time.", DeprecationWarning)
     sample_ids = table.ids(axis="sample")
-    num_samples = len(sample_ids)
-
-    # initialize the result object
-    dm = np.zeros((num_samples, num_samples))
-    for i, sid1 in enumerate(sample_ids):
-        v1 = table.data(sid1)
-        for j, sid2 in enumerate(sample_ids[:i]):
-            v2 = table.data(sid2)
-            dm[i, j] = dm[j, i] = pdist([v1, v2], metric)
-    return DistanceMatrix(dm, sample_ids)
+
+    matrix_data = getattr(table, 'matrix_data', None)
+    if issparse(matrix_data) and metric in _sparse_metrics:
+        # observations are the rows of the table's matrix
+        counts = matrix_data.T
+    else:
+        counts = np.asarray([table.data(sid) for sid in sample_ids])
+    return pw_distances(counts, sample_ids, metric)
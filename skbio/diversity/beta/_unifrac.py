@@ -0,0 +1,234 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from functools import partial
+
+import numpy as np
+
+from skbio.diversity._phylogenetic import _sample_branch_matrix
+from ._base import (_blocked_distances, _sparse_block_filler, _abs_row_sums,
+                    _sparse_cityblock)
+
+
+def unweighted_unifrac(counts, otu_ids, tree, ids=None, n_jobs=1,
+                       condensed=False, out=None):
+    r"""Compute unweighted UniFrac distances between all pairs of samples
+
+    Parameters
+    ----------
+    counts : 2D array_like of ints or floats, or scipy.sparse matrix
+        Matrix containing count/abundance data where each row contains counts
+        of observations in a given sample.
+    otu_ids : iterable of strs
+        The name of the tip of `tree` that each column of `counts`
+        corresponds to.
+    tree : skbio.TreeNode or skbio.tree.TreeArray
+        Tree relating the OTUs, with lengths on all of its branches.
+    ids : iterable of strs, optional
+        Identifiers for each sample in `counts`.
+    n_jobs : int, optional
+        Number of threads computing blocks of distances.
+    condensed : bool, optional
+        If ``True``, the returned ``DistanceMatrix`` stores its distances in
+        condensed format.
+    out : 1D array_like of floats, optional
+        Vector that the distances are written to in condensed format, as in
+        ``pw_distances``.
+
+    Returns
+    -------
+    skbio.DistanceMatrix
+        Distances between all pairs of samples (i.e., rows).
+
+    Raises
+    ------
+    ValueError
+        If `otu_ids` are not unique tip names of `tree`, if their number does
+        not match the number of columns in `counts`, if `counts` contains
+        negative values, or for the same reasons as ``pw_distances``.
+    skbio.tree.NoLengthError
+        If a branch of `tree` has no length.
+
+    See Also
+    --------
+    weighted_unifrac
+    pw_distances
+
+    Notes
+    -----
+    The unweighted UniFrac distance [1]_ between two samples is the fraction
+    of the branch length of the tree observed in either sample that is
+    observed in only one of them:
+
+    .. math::
+
+       u = \frac{\sum_i b_i |I(A_i > 0) - I(B_i > 0)|}
+                {\sum_i b_i \max(I(A_i > 0), I(B_i > 0))}
+
+    where :math:`b_i` is the length of branch :math:`i` and :math:`A_i` and
+    :math:`B_i` are the counts of the two samples below it. The distance
+    between two samples without observations is ``0``.
+
+    The branches observed in each sample are computed once for all samples,
+    with vectorized passes over the tree, as a sparse sample by branch
+    matrix. The distances are then computed in blocks of samples, as for
+    sparse counts in ``pw_distances``, and the tree is not traversed again.
+
+    References
+    ----------
+    .. [1] Lozupone, C. & Knight, R. UniFrac: a new phylogenetic method for
+       comparing microbial communities. Appl. Environ. Microbiol. 71,
+       8228-8235 (2005).
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.diversity.beta import unweighted_unifrac
+    >>> tree = TreeNode.read(StringIO(u'((a:1,b:2):1,c:3);'))
+    >>> dm = unweighted_unifrac([[1, 1, 0], [0, 1, 1]], ['a', 'b', 'c'], tree,
+    ...                         ids=['A', 'B'])
+    >>> print(round(dm['A', 'B'], 4))
+    0.5714
+
+    """
+    branches = _sample_branch_matrix(counts, otu_ids, tree, weighted=False)
+    filler = partial(_sparse_block_filler, branches,
+                     (_abs_row_sums, _unweighted_unifrac))
+    return _blocked_distances(filler, branches.shape[0], ids, n_jobs,
+                              condensed, out)
+
+
+def weighted_unifrac(counts, otu_ids, tree, ids=None, normalized=False,
+                     n_jobs=1, condensed=False, out=None):
+    r"""Compute weighted UniFrac distances between all pairs of samples
+
+    Parameters
+    ----------
+    counts : 2D array_like of ints or floats, or scipy.sparse matrix
+        Matrix containing count/abundance data where each row contains counts
+        of observations in a given sample.
+    otu_ids : iterable of strs
+        The name of the tip of `tree` that each column of `counts`
+        corresponds to.
+    tree : skbio.TreeNode or skbio.tree.TreeArray
+        Tree relating the OTUs, with lengths on all of its branches.
+    ids : iterable of strs, optional
+        Identifiers for each sample in `counts`.
+    normalized : bool, optional
+        If ``True``, normalize the distances to be between ``0`` and ``1``.
+    n_jobs : int, optional
+        Number of threads computing blocks of distances.
+    condensed : bool, optional
+        If ``True``, the returned ``DistanceMatrix`` stores its distances in
+        condensed format.
+    out : 1D array_like of floats, optional
+        Vector that the distances are written to in condensed format, as in
+        ``pw_distances``.
+
+    Returns
+    -------
+    skbio.DistanceMatrix
+        Distances between all pairs of samples (i.e., rows).
+
+    Raises
+    ------
+    ValueError
+        If `otu_ids` are not unique tip names of `tree`, if their number does
+        not match the number of columns in `counts`, if `counts` contains
+        negative values, or for the same reasons as ``pw_distances``.
+    skbio.tree.NoLengthError
+        If a branch of `tree` has no length.
+
+    See Also
+    --------
+    unweighted_unifrac
+    pw_distances
+
+    Notes
+    -----
+    The weighted UniFrac distance [1]_ between two samples weighs each branch
+    of the tree by the difference between the proportions of the counts of
+    the two samples below it:
+
+    .. math::
+
+       u = \sum_i b_i \left| \frac{A_i}{A_T} - \frac{B_i}{B_T} \right|
+
+    where :math:`b_i` is the length of branch :math:`i`, :math:`A_i` and
+    :math:`B_i` are the counts of the two samples below it and :math:`A_T`
+    and :math:`B_T` are the total counts of the samples. Normalized
+    distances are divided by
+
+    .. math::
+
+       \sum_j d_j \left(\frac{A_j}{A_T} + \frac{B_j}{B_T}\right)
+
+    where :math:`d_j` is the distance from tip :math:`j` to the root. This
+    is the sum of the proportion-weighted branch lengths of both samples, so
+    the normalized distance is the Bray-Curtis distance between the
+    samples' branch lengths weighted by proportions. The proportions of a
+    sample without observations are all ``0``, and the normalized distance
+    between two such samples is ``0``.
+
+    The proportions of each sample below each branch are computed once for
+    all samples, with vectorized passes over the tree, as a sparse sample by
+    branch matrix. The distances are then computed in blocks of samples, as
+    for sparse counts in ``pw_distances``, and the tree is not traversed
+    again.
+
+    References
+    ----------
+    .. [1] Lozupone, C. A., Hamady, M., Kelley, S. T. & Knight, R.
+       Quantitative and qualitative beta diversity measures lead to
+       different insights into factors that structure microbial
+       communities. Appl. Environ. Microbiol. 73, 1576-1585 (2007).
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.diversity.beta import weighted_unifrac
+    >>> tree = TreeNode.read(StringIO(u'((a:1,b:2):1,c:3);'))
+    >>> counts = [[1, 1, 0], [0, 1, 1]]
+    >>> dm = weighted_unifrac(counts, ['a', 'b', 'c'], tree, ids=['A', 'B'])
+    >>> print(dm['A', 'B'])
+    2.5
+    >>> dm = weighted_unifrac(counts, ['a', 'b', 'c'], tree, ids=['A', 'B'],
+    ...                       normalized=True)
+    >>> print(round(dm['A', 'B'], 4))
+    0.4545
+
+    """
+    branches = _sample_branch_matrix(counts, otu_ids, tree, weighted=True)
+    if normalized:
+        kernel = (_abs_row_sums, _normalized_weighted_unifrac)
+    else:
+        kernel = (_abs_row_sums, _sparse_cityblock)
+    filler = partial(_sparse_block_filler, branches, kernel)
+    return _blocked_distances(filler, branches.shape[0], ids, n_jobs,
+                              condensed, out)
+
+
+def _ratio(num, den):
+    # num / den, and 0 where den is 0
+    ratio = np.zeros(len(den))
+    np.divide(num, den, out=ratio, where=den != 0)
+    return ratio
+
+
+def _unweighted_unifrac(sums, u, v, others):
+    # u and v are both the lengths of the branches the samples share
+    shared = np.bincount(others, u, minlength=len(sums))
+    return _ratio(sums - 2 * shared, sums - shared)
+
+
+def _normalized_weighted_unifrac(sums, u, v, others):
+    return _ratio(_sparse_cityblock(sums, u, v, others), sums)
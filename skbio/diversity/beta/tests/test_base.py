@@ -12,9 +12,12 @@ from unittest import TestCase, main
 
 import numpy as np
 import numpy.testing as npt
+from scipy.sparse import csr_matrix
+from scipy.spatial.distance import pdist, squareform
 
 from skbio import DistanceMatrix
 from skbio.diversity.beta import pw_distances, pw_distances_from_table
+import skbio.diversity.beta._base as beta_base
 
 
 class HelperBiomTable(object):
@@ -38,6 +41,18 @@ class HelperBiomTable(object):
         return self._data[i]
 
 
+class HelperSparseBiomTable(HelperBiomTable):
+    """A BIOM-like object that also exposes its sparse observation matrix"""
+
+    def __init__(self, data, observation_ids, sample_ids):
+        super(HelperSparseBiomTable, self).__init__(data, observation_ids,
+                                                    sample_ids)
+        self.matrix_data = csr_matrix(data)
+
+    def data(self, sample_id):
+        raise AssertionError("The counts should be taken from matrix_data.")
+
+
 class BaseTests(TestCase):
     def setUp(self):
         self.t1 = [[1, 5],
@@ -70,6 +85,72 @@ class BaseTests(TestCase):
         self.assertRaises(ValueError, pw_distances, self.t1, list('AB'),
                           'euclidean')
 
+    def test_pw_distances_invalid_out(self):
+        with self.assertRaises(ValueError):
+            pw_distances(self.t1, self.ids1, out=np.empty(2))
+        with self.assertRaises(ValueError):
+            pw_distances(self.t1, self.ids1, out=np.empty((3, 3)))
+
+    def test_pw_distances_sparse_invalid_metric(self):
+        with self.assertRaises(ValueError):
+            pw_distances(csr_matrix(self.t1), self.ids1, 'cosine')
+
+    def test_pw_distances_matches_pdist(self):
+        counts = np.array(self.t2)
+        block_size = beta_base._BLOCK_SIZE
+        try:
+            # also compute the distances in many small blocks
+            for beta_base._BLOCK_SIZE in block_size, 4:
+                for metric in ('braycurtis', 'jaccard', 'euclidean',
+                               'cityblock'):
+                    exp = squareform(pdist(counts, metric))
+                    for n_jobs in 1, 3:
+                        obs = pw_distances(counts, self.ids2, metric,
+                                           n_jobs=n_jobs)
+                        npt.assert_equal(obs.data, exp)
+                        self.assertEqual(obs.ids, tuple(self.ids2))
+        finally:
+            beta_base._BLOCK_SIZE = block_size
+
+    def test_pw_distances_sparse(self):
+        counts = np.array(self.t2, dtype=float)
+        # add a sample without observations, and one with negative counts
+        counts = np.vstack([counts, np.zeros(7), -counts[1]])
+        counts[1, 5] = 0.5
+        block_size = beta_base._BLOCK_SIZE
+        try:
+            for beta_base._BLOCK_SIZE in block_size, 4:
+                for metric in ('braycurtis', 'cityblock', 'jaccard',
+                               'euclidean'):
+                    exp = pw_distances(counts, metric=metric)
+                    for n_jobs in 1, 3:
+                        obs = pw_distances(csr_matrix(counts), metric=metric,
+                                           n_jobs=n_jobs)
+                        npt.assert_almost_equal(obs.data, exp.data)
+        finally:
+            beta_base._BLOCK_SIZE = block_size
+
+    def test_pw_distances_sparse_empty_samples(self):
+        # distances between samples without observations are as in pdist
+        counts = np.vstack([np.zeros(7), self.t2[:2], np.zeros(7)])
+        for metric in 'jaccard', 'euclidean', 'cityblock':
+            exp = squareform(pdist(counts, metric))
+            obs = pw_distances(csr_matrix(counts), metric=metric)
+            npt.assert_almost_equal(obs.data, exp)
+            self.assertEqual(obs[0, 3], 0.0)
+
+    def test_pw_distances_condensed(self):
+        exp = pw_distances(self.t2, self.ids2)
+
+        obs = pw_distances(self.t2, self.ids2, condensed=True)
+        self.assertTrue(obs._condensed)
+        self.assertEqual(obs, exp)
+
+        out = np.empty(15, dtype=np.float32)
+        obs = pw_distances(csr_matrix(self.t2), self.ids2, out=out)
+        self.assertTrue(obs.condensed_form() is out)
+        npt.assert_almost_equal(out, exp.condensed_form())
+
     def test_pw_distances_euclidean(self):
         actual_dm = pw_distances(self.t1, self.ids1, 'euclidean')
         self.assertEqual(actual_dm.shape, (3, 3))
@@ -142,6 +223,33 @@ class BaseTests(TestCase):
             for id2 in self.ids2:
                 npt.assert_almost_equal(m_dm[id1, id2], t_dm[id1, id2])
 
+    def test_pw_distances_from_table_sparse(self):
+        for metric in 'braycurtis', 'jaccard', 'euclidean':
+            m_dm = pw_distances(self.t2, self.ids2, metric)
+            table = HelperSparseBiomTable(np.array(self.t2).T,
+                                          observation_ids=range(7),
+                                          sample_ids=self.ids2)
+            t_dm = npt.assert_warns(
+                DeprecationWarning, pw_distances_from_table, table, metric)
+            self.assertEqual(t_dm.ids, m_dm.ids)
+            npt.assert_almost_equal(t_dm.data, m_dm.data)
+
+    def test_pw_distances_from_table_sparse_empty_samples(self):
+        # samples without observations are as in the dense table
+        counts = np.vstack([self.t2, np.zeros(7), np.zeros(7)])
+        ids = self.ids2 + ['G', 'H']
+        dense = HelperBiomTable(counts.T, observation_ids=range(7),
+                                sample_ids=ids)
+        sparse = HelperSparseBiomTable(counts.T, observation_ids=range(7),
+                                       sample_ids=ids)
+        for metric in 'jaccard', 'euclidean', 'cityblock':
+            exp = npt.assert_warns(
+                DeprecationWarning, pw_distances_from_table, dense, metric)
+            obs = npt.assert_warns(
+                DeprecationWarning, pw_distances_from_table, sparse, metric)
+            self.assertEqual(obs.ids, exp.ids)
+            npt.assert_almost_equal(obs.data, exp.data)
+
     def test_pw_distances_from_table_braycurtis(self):
         # results are equal when passed as Table or matrix
         m_dm = pw_distances(self.t1, self.ids1, 'braycurtis')
@@ -0,0 +1,179 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+from scipy.sparse import csr_matrix
+from six import StringIO
+
+from skbio import TreeNode
+from skbio.tree import TreeArray, NoLengthError
+from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
+import skbio.diversity.beta._base as beta_base
+
+
+def naive_unifrac(counts, otu_ids, tree, weighted, normalized=False):
+    """UniFrac distance between two samples, one branch at a time"""
+    counts = [dict(zip(otu_ids, sample)) for sample in counts]
+    totals = [sum(sample.values()) or 1 for sample in counts]
+    num = den = 0.0
+    for node in tree.traverse():
+        if node.is_root():
+            continue
+        # tips(include_self=True) yields nothing for a tip itself
+        tips = [node] if node.is_tip() else list(node.tips())
+        below = [sum(sample.get(tip.name, 0) for tip in tips)
+                 for sample in counts]
+        if weighted:
+            a, b = [x / total for x, total in zip(below, totals)]
+            num += node.length * abs(a - b)
+            if node.is_tip():
+                depth = node.accumulate_to_ancestor(tree)
+                den += depth * (a + b)
+        else:
+            a, b = [x > 0 for x in below]
+            num += node.length * (a != b)
+            den += node.length * (a or b)
+    if weighted and not normalized:
+        return num
+    return num / den if den else 0.0
+
+
+class UniFracTests(TestCase):
+    def setUp(self):
+        self.tree = TreeNode.read(StringIO(
+            u"(((OTU1:0.5,OTU2:0.5):0.5,OTU3:1.0):1.0,"
+            u"(OTU4:0.75,(OTU5:0.5,(OTU6:0.5,OTU7:0.5):0.5):0.5):1.25)"
+            u"root;"))
+        self.otu_ids = ['OTU%d' % i for i in range(1, 8)]
+        self.counts = np.array([[23, 64, 14, 0, 0, 3, 1],
+                                [0, 3, 35, 42, 0, 12, 1],
+                                [0, 5, 5, 0, 40, 40, 0],
+                                [44, 35, 9, 0, 1, 0, 0],
+                                [0, 2, 8, 0, 35, 45, 1],
+                                [0, 0, 25, 35, 0, 19, 0],
+                                [0, 0, 0, 0, 0, 0, 0],
+                                [0, 0, 0, 0, 0, 0, 0]])
+        self.ids = list('ABCDEFGH')
+
+    def expected(self, weighted, normalized=False):
+        n = len(self.counts)
+        exp = np.zeros((n, n))
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    exp[i, j] = naive_unifrac(
+                        self.counts[[i, j]], self.otu_ids, self.tree,
+                        weighted, normalized)
+        return exp
+
+    def test_unweighted(self):
+        exp = self.expected(weighted=False)
+        block_size = beta_base._BLOCK_SIZE
+        try:
+            for beta_base._BLOCK_SIZE in block_size, 4:
+                for counts in self.counts, csr_matrix(self.counts):
+                    for n_jobs in 1, 3:
+                        obs = unweighted_unifrac(counts, self.otu_ids,
+                                                 self.tree, self.ids,
+                                                 n_jobs=n_jobs)
+                        self.assertEqual(obs.ids, tuple(self.ids))
+                        npt.assert_almost_equal(obs.data, exp)
+        finally:
+            beta_base._BLOCK_SIZE = block_size
+
+    def test_weighted(self):
+        block_size = beta_base._BLOCK_SIZE
+        try:
+            for normalized in False, True:
+                exp = self.expected(weighted=True, normalized=normalized)
+                for beta_base._BLOCK_SIZE in block_size, 4:
+                    for n_jobs in 1, 3:
+                        obs = weighted_unifrac(
+                            csr_matrix(self.counts), self.otu_ids, self.tree,
+                            self.ids, normalized=normalized, n_jobs=n_jobs)
+                        npt.assert_almost_equal(obs.data, exp)
+        finally:
+            beta_base._BLOCK_SIZE = block_size
+
+    def test_known_values(self):
+        tree = TreeNode.read(StringIO(u'((a:1,b:2):1,c:3);'))
+        counts = [[1, 1, 0], [0, 1, 1]]
+        npt.assert_almost_equal(
+            unweighted_unifrac(counts, 'abc', tree)[0, 1], 4 / 7)
+        npt.assert_almost_equal(
+            weighted_unifrac(counts, 'abc', tree)[0, 1], 2.5)
+        npt.assert_almost_equal(
+            weighted_unifrac(counts, 'abc', tree, normalized=True)[0, 1],
+            2.5 / 5.5)
+
+        # the reference implementation agrees, including on tip branches
+        npt.assert_almost_equal(
+            naive_unifrac(counts, 'abc', tree, weighted=False), 4 / 7)
+        npt.assert_almost_equal(
+            naive_unifrac(counts, 'abc', tree, weighted=True), 2.5)
+        npt.assert_almost_equal(
+            naive_unifrac(counts, 'abc', tree, weighted=True,
+                          normalized=True), 2.5 / 5.5)
+
+    def test_otu_subset_and_order(self):
+        # OTUs can be in any order and need not cover all tips
+        order = [6, 2, 0, 4]
+        exp = unweighted_unifrac(self.counts[:, [0, 2, 4, 6]],
+                                 ['OTU1', 'OTU3', 'OTU5', 'OTU7'], self.tree)
+        obs = unweighted_unifrac(self.counts[:, order],
+                                 [self.otu_ids[i] for i in order], self.tree)
+        self.assertEqual(obs, exp)
+
+    def test_tree_array(self):
+        arr = TreeArray.from_tree_node(self.tree)
+        for func in unweighted_unifrac, weighted_unifrac:
+            self.assertEqual(func(self.counts, self.otu_ids, arr),
+                             func(self.counts, self.otu_ids, self.tree))
+
+    def test_condensed(self):
+        exp = weighted_unifrac(self.counts, self.otu_ids, self.tree)
+        obs = weighted_unifrac(self.counts, self.otu_ids, self.tree,
+                               condensed=True)
+        self.assertTrue(obs._condensed)
+        self.assertEqual(obs, exp)
+
+        out = np.empty(28)
+        obs = unweighted_unifrac(self.counts, self.otu_ids, self.tree,
+                                 out=out)
+        self.assertTrue(obs.condensed_form() is out)
+
+    def test_invalid_input(self):
+        with self.assertRaisesRegexp(ValueError, "'OTU9'"):
+            unweighted_unifrac(self.counts, self.otu_ids[:-1] + ['OTU9'],
+                               self.tree)
+        with self.assertRaisesRegexp(ValueError, 'unique'):
+            unweighted_unifrac(self.counts, self.otu_ids[:-1] + ['OTU1'],
+                               self.tree)
+        with self.assertRaisesRegexp(ValueError, 'columns'):
+            weighted_unifrac(self.counts, self.otu_ids[:-1], self.tree)
+        with self.assertRaisesRegexp(ValueError, 'negative'):
+            weighted_unifrac(-self.counts, self.otu_ids, self.tree)
+        with self.assertRaises(ValueError):
+            weighted_unifrac(self.counts, self.otu_ids, self.tree, ids='AB')
+
+        tree = TreeNode.read(StringIO(u'((a:1,b):1,c:3);'))
+        with self.assertRaises(NoLengthError):
+            unweighted_unifrac([[1, 0, 0]], 'abc', tree)
+
+        tree = TreeNode.read(StringIO(u'((a:1,b:2):1,a:3);'))
+        with self.assertRaisesRegexp(ValueError, 'tips'):
+            unweighted_unifrac([[1, 0]], 'ab', tree)
+
+
+if __name__ == '__main__':
+    main()
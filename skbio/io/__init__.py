@@ -112,6 +112,7 @@ see the associated documentation.
 .. autosummary::
    :toctree: generated/
 
+   binary_dm
    clustal
    fasta
    fastq
@@ -120,6 +121,7 @@ see the associated documentation.
    ordination
    phylip
    qseq
+   stockholm
 
 Formats are considered to be names which represent a way of encoding a file.
 
@@ -141,6 +143,7 @@ User exceptions
 
    UnrecognizedFormatError
    FileFormatError
+   BinaryDMFormatError
    ClustalFormatError
    FASTAFormatError
    FASTQFormatError
@@ -150,6 +153,7 @@ User exceptions
    PhylipFormatError
    QSeqFormatError
    QUALFormatError
+   StockholmFormatError
 
 User warnings
 ^^^^^^^^^^^^^
@@ -274,10 +278,12 @@ from skbio.util import TestRunner
 from ._warning import FormatIdentificationWarning, ArgumentOverrideWarning
 from ._exception import (DuplicateRegistrationError, InvalidRegistrationError,
                          UnrecognizedFormatError, FileFormatError,
-                         ClustalFormatError, FASTAFormatError,
-                         FASTQFormatError, LSMatFormatError, NewickFormatError,
+                         BinaryDMFormatError, ClustalFormatError,
+                         FASTAFormatError, FASTQFormatError, LSMatFormatError,
+                         NewickFormatError,
                          OrdinationFormatError, PhylipFormatError,
-                         QSeqFormatError, QUALFormatError)
+                         QSeqFormatError, QUALFormatError,
+                         StockholmFormatError)
 from ._registry import (write, read, sniff, get_writer, get_reader,
                         get_sniffer, list_write_formats, list_read_formats,
                         register_writer, register_reader, register_sniffer,
@@ -295,6 +301,7 @@ __all__ = ['write', 'read', 'sniff',
            'UnrecognizedFormatError',
 
            'FileFormatError',
+           'BinaryDMFormatError',
            'ClustalFormatError',
            'FASTAFormatError',
            'FASTQFormatError',
@@ -303,11 +310,13 @@ __all__ = ['write', 'read', 'sniff',
            'OrdinationFormatError',
            'PhylipFormatError',
            'QSeqFormatError',
-           'QUALFormatError']
+           'QUALFormatError',
+           'StockholmFormatError']
 
 # Necessary to import each file format module to have them added to the I/O
 # registry. We use import_module instead of a typical import to avoid flake8
 # unused import errors.
+import_module('skbio.io.binary_dm')
 import_module('skbio.io.clustal')
 import_module('skbio.io.fasta')
 import_module('skbio.io.fastq')
@@ -316,6 +325,7 @@ import_module('skbio.io.newick')
 import_module('skbio.io.ordination')
 import_module('skbio.io.phylip')
 import_module('skbio.io.qseq')
+import_module('skbio.io.stockholm')
 
 # Now that all of our I/O has loaded, we can add the object oriented methods
 # (read and write) to each class which has registered I/O operations.
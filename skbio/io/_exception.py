@@ -39,6 +39,11 @@ class LSMatFormatError(FileFormatError):
     pass
 
 
+class BinaryDMFormatError(FileFormatError):
+    """Raised when a ``binary_dm`` formatted file cannot be parsed."""
+    pass
+
+
 class OrdinationFormatError(FileFormatError):
     """Raised when an ``ordination`` formatted file cannot be parsed."""
     pass
@@ -69,6 +74,11 @@ class QSeqFormatError(FileFormatError):
     pass
 
 
+class StockholmFormatError(FileFormatError):
+    """Raised when a ``stockholm`` formatted file cannot be parsed."""
+    pass
+
+
 class InvalidRegistrationError(Exception):
     """Raised if function doesn't meet the expected API of its registration."""
     pass
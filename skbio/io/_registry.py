@@ -227,8 +227,8 @@ def register_reader(format, cls=None):
                                                            "generator." %
                                                            reader.__name__)
 
-                    while True:
-                        yield next(generator)
+                    for item in generator:
+                        yield item
 
         else:
             # When an object is instantiated we don't need to worry about the
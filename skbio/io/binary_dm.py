@@ -0,0 +1,270 @@
+"""
+Memory-mapped binary distance matrix format (:mod:`skbio.io.binary_dm`)
+=======================================================================
+
+.. currentmodule:: skbio.io.binary_dm
+
+The binary distance matrix format (``binary_dm``) stores the dissimilarities
+of a dissimilarity or distance matrix as raw binary floats, preceded by a small
+header holding the object IDs and the layout of the data. When read from a
+file on disk, the data are memory-mapped instead of loaded, so that a matrix
+opens in milliseconds regardless of its size, is loaded from disk only as its
+values are used, and can be shared between processes reading the same file.
+
+Format Support
+--------------
+**Has Sniffer: Yes**
+
++------+------+---------------------------------------------------------------+
+|Reader|Writer|                          Object Class                         |
++======+======+===============================================================+
+|Yes   |Yes   |:mod:`skbio.stats.distance.DissimilarityMatrix`                |
++------+------+---------------------------------------------------------------+
+|Yes   |Yes   |:mod:`skbio.stats.distance.DistanceMatrix`                     |
++------+------+---------------------------------------------------------------+
+
+Format Specification
+--------------------
+A file in this format consists of:
+
+1. The 8 bytes ``SKBIO-DM``.
+2. The length in bytes of the header, as a little-endian unsigned 64-bit
+   integer.
+3. The header, a UTF-8 encoded JSON object with the keys ``version`` (the
+   format version, currently ``1``), ``layout`` (``"condensed"`` or
+   ``"redundant"``), ``dtype`` (``"<f4"`` or ``"<f8"``, i.e., little-endian
+   single or double precision floats) and ``ids`` (the list of object IDs).
+   The header is padded with spaces so that the data start at a multiple of
+   64 bytes from the start of the file.
+4. The data: for ``n`` IDs, the ``n * (n - 1) / 2`` distances of the upper
+   triangle in row-major order if the layout is ``condensed`` (as in
+   ``scipy.spatial.distance.squareform``), or all ``n * n`` dissimilarities in
+   row-major order if the layout is ``redundant``.
+
+Only distance matrices (which are symmetric and hollow) can be stored in
+condensed layout. A distance matrix stored in condensed layout is read into a
+`DistanceMatrix` that stores its distances in condensed format (see
+``DistanceMatrix(..., condensed=True)``), with no check for symmetry needed.
+
+.. note:: Files in this format must be written in binary mode (i.e., pass
+   ``mode='wb'`` when writing to a file path). Memory mapping requires a file
+   on disk; the data of file-like objects that are not backed by a file
+   (e.g., ``io.BytesIO``) are read into memory, and these must be opened in
+   binary mode.
+
+Format Parameters
+-----------------
+The reader accepts ``mmap_mode``, which is passed to ``numpy.memmap`` as its
+``mode`` and defaults to ``'r'`` (read-only). Use ``'c'`` for a copy-on-write
+mapping, ``'r+'`` to write changes back to the file, or ``None`` to read the
+data into memory instead.
+
+The `DistanceMatrix` writer accepts ``condensed``, which defaults to ``True``.
+If ``False``, the distances are written in redundant layout. Dissimilarity
+matrices are always written in redundant layout. The data are written with the
+precision of the matrix (``float32`` or ``float64``).
+
+Examples
+--------
+>>> import os
+>>> from tempfile import mkdtemp
+>>> import numpy as np
+>>> from skbio import DistanceMatrix
+>>> dm = DistanceMatrix([[0, 1, 2], [1, 0, 3], [2, 3, 0]], ['a', 'b', 'c'])
+>>> fp = os.path.join(mkdtemp(), 'dm.bin')
+>>> dm.write(fp, format='binary_dm', mode='wb')
+>>> dm2 = DistanceMatrix.read(fp, format='binary_dm', mode='rb')
+>>> dm2 == dm
+True
+>>> isinstance(dm2.condensed_form(), np.memmap)
+True
+
+"""
+
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+import os
+import struct
+
+import numpy as np
+from scipy.spatial.distance import squareform
+from six import string_types, text_type
+
+from skbio.stats.distance import DissimilarityMatrix, DistanceMatrix
+from skbio.io import (register_reader, register_writer, register_sniffer,
+                      BinaryDMFormatError)
+
+
+_MAGIC = b'SKBIO-DM'
+_VERSION = 1
+# the data start at a multiple of this many bytes
+_ALIGNMENT = 64
+# number of values written at a time
+_WRITE_BLOCK_SIZE = 2 ** 20
+
+
+@register_sniffer('binary_dm')
+def _binary_dm_sniffer(fh):
+    path = _mappable_path(fh)
+    if path is not None:
+        with open(path, 'rb') as bfh:
+            magic = bfh.read(len(_MAGIC))
+    else:
+        magic = fh.read(len(_MAGIC))
+        if isinstance(magic, text_type):
+            magic = magic.encode('ascii', 'replace')
+    return magic == _MAGIC, {}
+
+
+@register_reader('binary_dm', DissimilarityMatrix)
+def _binary_dm_to_dissimilarity_matrix(fh, mmap_mode='r'):
+    layout, ids, data = _read_binary_dm(fh, mmap_mode)
+    if layout == 'condensed':
+        data = squareform(data, force='tomatrix', checks=False)
+    return DissimilarityMatrix(data, ids)
+
+
+@register_reader('binary_dm', DistanceMatrix)
+def _binary_dm_to_distance_matrix(fh, mmap_mode='r'):
+    layout, ids, data = _read_binary_dm(fh, mmap_mode)
+    return DistanceMatrix(data, ids, condensed=layout == 'condensed')
+
+
+@register_writer('binary_dm', DissimilarityMatrix)
+def _dissimilarity_matrix_to_binary_dm(obj, fh):
+    _write_binary_dm(obj, fh, 'redundant')
+
+
+@register_writer('binary_dm', DistanceMatrix)
+def _distance_matrix_to_binary_dm(obj, fh, condensed=True):
+    _write_binary_dm(obj, fh, 'condensed' if condensed else 'redundant')
+
+
+def _mappable_path(fh):
+    """Return the path of the file on disk behind `fh`, or ``None``."""
+    path = getattr(fh, 'name', None)
+    if isinstance(path, string_types) and os.path.isfile(path):
+        return path
+    return None
+
+
+def _is_text(fh):
+    return isinstance(fh, io.TextIOBase) or 'b' not in getattr(fh, 'mode', 'b')
+
+
+def _read_binary_dm(fh, mmap_mode):
+    path = _mappable_path(fh)
+    if path is not None:
+        # The file is reopened in binary mode, as `fh` may have been opened
+        # in text mode.
+        with open(path, 'rb') as bfh:
+            layout, dtype, ids, offset = _read_header(bfh)
+        num_values = _num_values(layout, len(ids))
+        if os.path.getsize(path) < offset + num_values * dtype.itemsize:
+            raise BinaryDMFormatError(
+                "Expected %d value(s) of data, but the file is too short." %
+                num_values)
+
+        if mmap_mode is None:
+            with open(path, 'rb') as bfh:
+                bfh.seek(offset)
+                data = np.fromfile(bfh, dtype=dtype, count=num_values)
+        elif num_values == 0:
+            # an empty file region cannot be mapped
+            data = np.zeros(0, dtype=dtype)
+        else:
+            data = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset,
+                             shape=(num_values,))
+    else:
+        if _is_text(fh):
+            raise BinaryDMFormatError("The file must be opened in binary "
+                                      "mode.")
+        layout, dtype, ids, offset = _read_header(fh)
+        num_values = _num_values(layout, len(ids))
+        buf = fh.read(num_values * dtype.itemsize)
+        if len(buf) != num_values * dtype.itemsize:
+            raise BinaryDMFormatError(
+                "Expected %d value(s) of data, but the file is too short." %
+                num_values)
+        data = np.frombuffer(buf, dtype=dtype)
+
+    if layout == 'redundant':
+        data = data.reshape(len(ids), len(ids))
+    return layout, ids, data
+
+
+def _read_header(fh):
+    """Return the layout, dtype, IDs and data offset from the header."""
+    preamble = fh.read(len(_MAGIC) + 8)
+    if isinstance(preamble, text_type) or \
+            preamble[:len(_MAGIC)] != _MAGIC:
+        raise BinaryDMFormatError("The file does not start with %r." %
+                                  _MAGIC.decode('ascii'))
+    if len(preamble) != len(_MAGIC) + 8:
+        raise BinaryDMFormatError("The file ends before its header.")
+    header_size, = struct.unpack('<Q', preamble[len(_MAGIC):])
+
+    raw_header = fh.read(header_size)
+    if len(raw_header) != header_size:
+        raise BinaryDMFormatError("The file ends before its header.")
+    try:
+        header = json.loads(raw_header.decode('utf-8'))
+        version = header['version']
+        layout = header['layout']
+        dtype = header['dtype']
+        ids = header['ids']
+    except (ValueError, KeyError, TypeError) as e:
+        raise BinaryDMFormatError("Could not parse the header: %s" % e)
+
+    if version != _VERSION:
+        raise BinaryDMFormatError("Unsupported format version %r." % version)
+    if layout not in ('condensed', 'redundant'):
+        raise BinaryDMFormatError("Unknown data layout %r." % layout)
+    if dtype not in ('<f4', '<f8'):
+        raise BinaryDMFormatError("Unsupported data type %r." % dtype)
+    return layout, np.dtype(dtype), ids, len(preamble) + header_size
+
+
+def _num_values(layout, num_ids):
+    if layout == 'condensed':
+        return num_ids * (num_ids - 1) // 2
+    return num_ids * num_ids
+
+
+def _write_binary_dm(obj, fh, layout):
+    if _is_text(fh):
+        raise BinaryDMFormatError("The file must be opened in binary mode.")
+    dtype = np.dtype(np.float32 if obj.dtype == np.float32 else np.float64)
+    dtype = dtype.newbyteorder('<')
+
+    header = json.dumps({'version': _VERSION, 'layout': layout,
+                         'dtype': dtype.str, 'ids': list(obj.ids)})
+    header = header.encode('utf-8')
+    unpadded_size = len(_MAGIC) + 8 + len(header)
+    header += b' ' * (-unpadded_size % _ALIGNMENT)
+
+    fh.write(_MAGIC)
+    fh.write(struct.pack('<Q', len(header)))
+    fh.write(header)
+
+    if layout == 'condensed':
+        data = obj.condensed_form()
+        for start in range(0, len(data), _WRITE_BLOCK_SIZE):
+            block = data[start:start + _WRITE_BLOCK_SIZE]
+            fh.write(np.asarray(block, dtype=dtype).tobytes())
+    else:
+        data = obj.data
+        rows_per_block = max(1, _WRITE_BLOCK_SIZE // max(1, data.shape[1]))
+        for start in range(0, data.shape[0], rows_per_block):
+            block = data[start:start + rows_per_block]
+            fh.write(np.ascontiguousarray(block, dtype=dtype).tobytes())
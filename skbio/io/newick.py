@@ -18,6 +18,8 @@ Format Support
 +======+======+===============================================================+
 |Yes   |Yes   |:mod:`skbio.tree.TreeNode`                                     |
 +------+------+---------------------------------------------------------------+
+|Yes   |No    |:mod:`skbio.tree.TreeArray`                                    |
++------+------+---------------------------------------------------------------+
 
 Format Specification
 --------------------
@@ -155,6 +157,10 @@ words, the same tree can be written multiple ways. For example: ``(A, B);`` is
 isomorphic to ``(B, A);``. The implementation in scikit-bio maintains the given
 sibling order in its object representations.
 
+When read into a ``skbio.tree.TreeArray``, no ``skbio.tree.TreeNode`` objects
+are created. Nodes are numbered in the order in which they appear in the file
+(i.e., in preorder), so the root is node 0.
+
 Newick has no representation of an unrooted tree. Some biological packages make
 the assumption that when a trifurcated root exists in an otherwise bifurcated
 tree that the tree must be unrooted. In scikit-bio, ``skbio.tree.TreeNode``
@@ -222,11 +228,15 @@ References
 
 from __future__ import absolute_import, division, print_function
 
+import re
+from itertools import islice
+
+import numpy as np
 from future.builtins import zip, range
 
 from skbio.io import (register_reader, register_writer, register_sniffer,
                       NewickFormatError)
-from skbio.tree import TreeNode
+from skbio.tree import TreeNode, TreeArray
 
 
 @register_sniffer("newick")
@@ -272,17 +282,48 @@ def _newick_sniffer(fh):
 
 @register_reader('newick', TreeNode)
 def _newick_to_tree_node(fh, convert_underscores=True):
-    tree_stack = []
+    parent, name, length = _parse_newick(fh, convert_underscores)
+    nodes = [TreeNode(name=node_name, length=node_length)
+             for node_name, node_length in zip(name, length)]
+    # This is much faster than TreeNode.append
+    for node, p in zip(islice(nodes, 1, None), islice(parent, 1, None)):
+        node.parent = nodes[p]
+        nodes[p].children.append(node)
+    return nodes[0]
+
+
+@register_reader('newick', TreeArray)
+def _newick_to_tree_array(fh, convert_underscores=True):
+    parent, name, length = _parse_newick(fh, convert_underscores)
+    length = [np.nan if node_length is None else node_length
+              for node_length in length]
+    names = np.empty(len(name), dtype=object)
+    names[:] = name
+    return TreeArray(parent, length, names)
+
+
+def _parse_newick(fh, convert_underscores=True):
+    # Nodes are numbered in the order they are opened in the file (i.e., in
+    # preorder), so the root is node 0 and siblings are ordered by index. The
+    # parent of a node is only known once its enclosing `)` is read.
+    parent = [-1]
+    name = [None]
+    length = [None]
+    has_children = [False]
+    tree_stack = [(0, 0)]
     current_depth = 0
     last_token = ''
     next_is_distance = False
-    root = TreeNode()
-    tree_stack.append((root, current_depth))
+    # labels are often repeated (e.g., support values or taxonomic ranks), so
+    # nodes with the same label share a single string
+    names = {}
     for token in _tokenize_newick(fh, convert_underscores=convert_underscores):
         # Check for a label
         if last_token not in '(,):':
             if not next_is_distance:
-                tree_stack[-1][0].name = last_token if last_token else None
+                if last_token:
+                    name[tree_stack[-1][0]] = names.setdefault(last_token,
+                                                               last_token)
             else:
                 next_is_distance = False
         # Check for a distance
@@ -290,16 +331,19 @@ def _newick_to_tree_node(fh, convert_underscores=True):
             next_is_distance = True
         elif last_token == ':':
             try:
-                tree_stack[-1][0].length = float(token)
+                length[tree_stack[-1][0]] = float(token)
             except ValueError:
                 raise NewickFormatError("Could not read length as numeric type"
                                         ": %s." % token)
 
-        elif token == '(':
-            current_depth += 1
-            tree_stack.append((TreeNode(), current_depth))
-        elif token == ',':
-            tree_stack.append((TreeNode(), current_depth))
+        elif token == '(' or token == ',':
+            if token == '(':
+                current_depth += 1
+            tree_stack.append((len(parent), current_depth))
+            parent.append(-1)
+            name.append(None)
+            length.append(None)
+            has_children.append(False)
         elif token == ')':
             if len(tree_stack) < 2:
                 raise NewickFormatError("Could not parse file as newick."
@@ -308,20 +352,18 @@ def _newick_to_tree_node(fh, convert_underscores=True):
             # Pop all nodes at this depth as they belong to the remaining
             # node on the top of the stack as children.
             while current_depth == tree_stack[-1][1]:
-                node, _ = tree_stack.pop()
-                children.insert(0, node)
-            parent = tree_stack[-1][0]
-            if parent.children:
+                children.append(tree_stack.pop()[0])
+            node = tree_stack[-1][0]
+            if has_children[node]:
                 raise NewickFormatError("Could not parse file as newick."
                                         " Contains unnested children.")
-            # This is much faster than TreeNode.extend
+            has_children[node] = bool(children)
             for child in children:
-                child.parent = parent
-            parent.children = children
+                parent[child] = node
             current_depth -= 1
         elif token == ';':
             if len(tree_stack) == 1:
-                return root
+                return parent, name, length
             break
 
         last_token = token
@@ -371,19 +413,28 @@ def _tree_node_to_newick(obj, fh):
     fh.write(';\n')
 
 
+# Characters which end a run of text that can be split on structure tokens
+# alone: the start of an escaped literal or a comment, and whitespace.
+_NEWICK_SPECIAL = re.compile(r"['\[\s]", re.UNICODE)
+_NEWICK_WHITESPACE = re.compile(r"\s+", re.UNICODE)
+_NEWICK_STRUCTURE = re.compile(r"([(),;:])")
+_NEWICK_COMMENT_BRACKET = re.compile(r"[\[\]]")
+
+
 def _tokenize_newick(fh, convert_underscores=True):
-    structure_tokens = set('(),;:')
-    not_escaped = True
-    label_start = False
-    last_non_ws_char = ''
-    last_char = ''
-    comment_depth = 0
-    metadata_buffer = []
     # Strategy:
-    # We will iterate by character.
+    # Each chunk of text read from `fh` is cut at escaped literals, comments
+    # and whitespace, and the runs in between are split on the structure
+    # tokens with a single compiled regex, so that labels and lengths are
+    # consumed in one step instead of one character at a time. Escaped
+    # literals and comments are skipped over with `str.find` and a regex for
+    # brackets. The state below is carried across
+    # chunks, so tokens, literals and comments may span lines.
+    #
     # Comments in newick are defined as:
     # [This is a comment]
-    # Nested comments are allowed.
+    # Nested comments are allowed. A bracket preceded by ' inside of a comment
+    # neither opens nor closes a comment.
     #
     # The following characters indicate structure:
     #      ( ) , ; :
@@ -392,95 +443,121 @@ def _tokenize_newick(fh, convert_underscores=True):
     # thrown.
     #
     # We use ' to indicate a literal string. It has the highest precedence of
-    # any operator.
-    for line in fh:
-        for character in line:
-            # We will start by handling the comment case.
-            # This code branch will probably never execute in practice.
-            # Using a comment_depth we can handle nested comments.
-            # Additionally if we are inside an escaped literal string, then
-            # we don't want to consider it a comment.
-            if character == "[" and not_escaped:
-                # Sometimes we might not want to nest a comment, so we will use
-                # our escape character. This is not explicitly mentioned in
-                # any format specification, but seems like what a reasonable
-                # person might do.
-                if last_non_ws_char != "'" or comment_depth == 0:
-                    # Once again, only advance our depth if [ has not been
-                    # escaped inside our comment.
-                    comment_depth += 1
+    # any operator. A ' that directly follows the last non-whitespace ' is
+    # added to the label, so '' -> '.
+    not_escaped = True
+    # whether a label has started since the last structure token
+    label_start = False
+    # whether the last character outside of a comment was whitespace
+    last_is_space = False
+    # whether the last non-whitespace character was a ' that was not itself
+    # escaped
+    last_is_quote = False
+    comment_depth = 0
+    # the last character read, needed to check for escaped brackets when a
+    # comment spans chunks
+    last_char = ''
+    metadata_buffer = []
+    for text in fh:
+        pos = 0
+        end = len(text)
+        while pos < end:
             if comment_depth > 0:
-                # Same as above, but in reverse
-                if character == "]" and last_non_ws_char != "'":
-                    comment_depth -= 1
-                last_non_ws_char = character
+                for match in _NEWICK_COMMENT_BRACKET.finditer(text, pos):
+                    i = match.start()
+                    if (text[i - 1] if i > 0 else last_char) == "'":
+                        continue
+                    comment_depth += 1 if text[i] == '[' else -1
+                    if comment_depth == 0:
+                        last_is_quote = False
+                        pos = i + 1
+                        break
+                else:
+                    pos = end
                 continue
-            # We are not in a comment block if we are below here.
-
-            # If we are inside of an escaped string literal, then ( ) , ; are
-            # meaningless to the structure.
-            # Otherwise, we are ready to submit our metadata token.
-            if not_escaped and character in structure_tokens:
-                label_start = False
-                metadata = ''.join(metadata_buffer)
-                # If the following condition is True, then we must have just
-                # closed a literal. We know this because last_non_ws_char is
-                # either None or the last non-whitespace character.
-                # last_non_ws_char is None when we have just escaped an escape
-                # and at the first iteration.
-                if last_non_ws_char == "'" or not convert_underscores:
-                    # Make no modifications.
-                    yield metadata
-                elif metadata:
-                    # Underscores are considered to be spaces when not in an
-                    # escaped literal string.
-                    yield metadata.replace('_', ' ')
-                # Clear our buffer for the next metadata token and yield our
-                # current structure token.
-                metadata_buffer = []
-                yield character
-            # We will now handle escaped string literals.
-            # They are inconvenient because any character inside of them is
-            # valid, especially whitespace.
-            # We also need to allow ' to be escaped by '. e.g. '' -> '
-            elif character == "'":
-                not_escaped = not not_escaped
-                label_start = True
-                if last_non_ws_char == "'":
-                    # We are escaping our escape, so it should be added to our
-                    # metadata_buffer which will represent some future token.
-                    metadata_buffer.append(character)
-                    # We do not want a running chain of overcounts, so we need
-                    # to clear the last character and continue iteration from
-                    # the top. Without this, the following would happen:
-                    # ''' ' -> '' <open literal>
-                    # What we want is:
-                    # ''' ' -> '<open literal> <close literal>
-                    last_non_ws_char = ''
-                    last_char = ''
-                    continue
-
-            elif not character.isspace() or not not_escaped:
-                if label_start and last_char.isspace() and not_escaped:
-                    raise NewickFormatError("Newick files cannot have"
-                                            " unescaped whitespace in their"
-                                            " labels.")
-                metadata_buffer.append(character)
-                label_start = True
 
-            # This is equivalent to an `else` however it prevents coverage from
-            # mis-identifying the `continue` as uncalled because cpython will
-            # optimize it to a jump that is slightly different from the normal
-            # jump it would have done anyways.
-            elif True:
-                # Skip the last statement
-                last_char = character
+            if not not_escaped:
+                # Inside of an escaped string literal any character, including
+                # whitespace, ( ) , ; [ and ], is part of the label.
+                i = text.find("'", pos)
+                if i == -1:
+                    i = end
+                if i > pos:
+                    metadata_buffer.append(text[pos:i])
+                    label_start = True
+                    last_is_quote = False
+                    last_is_space = text[i - 1].isspace()
+                pos = i
+                if pos < end:
+                    not_escaped = True
+                    label_start = True
+                    last_is_space = False
+                    if last_is_quote:
+                        metadata_buffer.append("'")
+                        last_is_quote = False
+                    else:
+                        last_is_quote = True
+                    pos += 1
                 continue
 
-            last_char = character
-            # This line is skipped in the following cases:
-            #    * comment_depth > 0, i.e. we are in a comment.
-            #    * We have just processed the sequence '' and we don't want
-            #      the sequence ''' to result in ''.
-            #    * We have encountered whitespace that is not properly escaped.
-            last_non_ws_char = character
+            match = _NEWICK_SPECIAL.search(text, pos)
+            stop = match.start() if match else end
+            if stop > pos:
+                # Splitting on structure tokens gives the labels in between:
+                # [label, token, label, token, ..., label]. The first label
+                # continues the current one and the last may be continued.
+                parts = _NEWICK_STRUCTURE.split(text[pos:stop])
+                if parts[0]:
+                    if label_start and last_is_space:
+                        raise NewickFormatError("Newick files cannot have"
+                                                " unescaped whitespace in"
+                                                " their labels.")
+                    metadata_buffer.append(parts[0])
+                    label_start = True
+                    last_is_space = False
+                    last_is_quote = False
+                if len(parts) > 1:
+                    metadata = ''.join(metadata_buffer)
+                    # If the last non-whitespace character closed a literal,
+                    # the label is taken as is.
+                    if last_is_quote or not convert_underscores:
+                        yield metadata
+                    elif metadata:
+                        # Underscores are considered to be spaces when not in
+                        # an escaped literal string.
+                        yield metadata.replace('_', ' ')
+                    yield parts[1]
+                    for i in range(2, len(parts) - 1, 2):
+                        if not convert_underscores:
+                            yield parts[i]
+                        elif parts[i]:
+                            yield parts[i].replace('_', ' ')
+                        yield parts[i + 1]
+                    last = parts[-1]
+                    metadata_buffer = [last] if last else []
+                    label_start = bool(last)
+                    last_is_space = False
+                    last_is_quote = False
+                pos = stop
+                continue
+
+            character = text[pos]
+            if character == "'":
+                not_escaped = False
+                label_start = True
+                last_is_space = False
+                if last_is_quote:
+                    metadata_buffer.append("'")
+                    last_is_quote = False
+                else:
+                    last_is_quote = True
+                pos += 1
+            elif character == '[':
+                comment_depth = 1
+                pos += 1
+            else:
+                last_is_space = True
+                pos = _NEWICK_WHITESPACE.match(text, pos).end()
+
+        if end:
+            last_char = text[-1]
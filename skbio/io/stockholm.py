@@ -0,0 +1,382 @@
+r"""
+Stockholm format (:mod:`skbio.io.stockholm`)
+============================================
+
+.. currentmodule:: skbio.io.stockholm
+
+Stockholm format (``stockholm``) stores a multiple sequence alignment along
+with per-file, per-sequence, per-residue and per-column annotations. It is the
+format used by the Pfam and Rfam databases [1]_ [2]_.
+
+Format Support
+--------------
+**Has Sniffer: Yes**
+
++------+------+---------------------------------------------------------------+
+|Reader|Writer|                          Object Class                         |
++======+======+===============================================================+
+|Yes   |No    |generator of :mod:`skbio.alignment.StockholmAlignment` objects |
++------+------+---------------------------------------------------------------+
+|Yes   |Yes   |:mod:`skbio.alignment.StockholmAlignment`                      |
++------+------+---------------------------------------------------------------+
+
+Format Specification
+--------------------
+A Stockholm file contains one or more records. Each record starts with a
+``# STOCKHOLM 1.0`` header line and ends with a ``//`` line. Between these,
+lines are either:
+
+- sequence lines, containing a sequence identifier followed by the aligned
+  sequence (or a block of it, if the alignment is interleaved)
+- ``#=GF <feature> <text>`` lines, annotating the whole alignment
+- ``#=GS <seqname> <feature> <text>`` lines, annotating a sequence
+- ``#=GR <seqname> <feature> <annotation>`` lines, annotating each residue of
+  a sequence
+- ``#=GC <feature> <annotation>`` lines, annotating each column of the
+  alignment
+- comment lines starting with ``#``, which are ignored
+
+The alignment may be split into blocks, with every sequence appearing once per
+block. Blocks (and ``#=GR``/``#=GC`` annotations) are concatenated in the order
+they appear in the record.
+
+.. note:: Records are parsed incrementally: sequence blocks are copied into a
+   single growable byte matrix as they are read, and the sequences of the
+   resulting alignment are views onto its rows. The matrix is shrunk in place
+   to the size of the alignment once the record has been read. Likewise,
+   records are written line by line rather than being built as a single string
+   first, so neither reading nor writing needs more than one copy of the
+   alignment in memory (plus the spare capacity of the matrix while reading).
+
+Format Parameters
+-----------------
+The following parameters are available to the readers:
+
+- ``constructor`` (``skbio.Sequence`` subclass): the type of sequence to
+  construct from each sequence line. Default is ``skbio.Sequence``.
+- ``strict`` (``bool``): if ``True``, ``#=GR`` and ``#=GC`` annotations must
+  have exactly one character per position in the alignment. Default is
+  ``False``.
+- ``rec_num`` (``int``, ``StockholmAlignment`` reader only): the record to
+  read, starting at 1. Default is 1.
+
+Examples
+--------
+Assume we have a Stockholm file with the following contents::
+
+    # STOCKHOLM 1.0
+    seq1          ACC--G
+    seq2          UCC--G
+
+    seq1          -GGGU
+    seq2          -GGGA
+    #=GC SS_cons  (((.....)))
+    //
+
+We can read it into a ``StockholmAlignment`` of RNA sequences:
+
+>>> from StringIO import StringIO
+>>> from skbio import RNA
+>>> from skbio.alignment import StockholmAlignment
+>>> fh = StringIO('# STOCKHOLM 1.0\n'
+...               'seq1          ACC--G\n'
+...               'seq2          UCC--G\n'
+...               '\n'
+...               'seq1          -GGGU\n'
+...               'seq2          -GGGA\n'
+...               '#=GC SS_cons  (((.....)))\n'
+...               '//\n')
+>>> sto = StockholmAlignment.read(fh, constructor=RNA)
+>>> sto.ids()
+['seq1', 'seq2']
+>>> sto.gc
+{'SS_cons': '(((.....)))'}
+
+and write it back out in a single block:
+
+>>> fh = StringIO()
+>>> sto.write(fh)
+>>> print(fh.getvalue())
+# STOCKHOLM 1.0
+seq1          ACC--G-GGGU
+seq2          UCC--G-GGGA
+#=GC SS_cons  (((.....)))
+//
+<BLANKLINE>
+
+References
+----------
+.. [1] http://sonnhammer.sbc.su.se/Stockholm.html
+.. [2] http://en.wikipedia.org/wiki/Stockholm_format
+
+"""
+
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+from future.builtins import range, zip
+from future.utils import viewitems
+
+import numpy as np
+
+from skbio.io import register_reader, register_writer, register_sniffer
+from skbio.sequence import Sequence
+from skbio.alignment import StockholmAlignment, StockholmParseError
+
+
+@register_sniffer('stockholm')
+def _stockholm_sniffer(fh):
+    for line in fh:
+        if line.strip():
+            return line.startswith('# STOCKHOLM 1.'), {}
+    return False, {}
+
+
+@register_reader('stockholm')
+def _stockholm_to_generator(fh, constructor=Sequence, strict=False):
+    # StockholmParseError is a StockholmFormatError; it is raised here (and by
+    # the StockholmAlignment._parse_* helpers) so that code catching the
+    # former keeps working.
+    record = None
+    for line in fh:
+        line = line.strip()
+        if not line:
+            continue
+
+        if record is None:
+            if not line.startswith('# STOCKHOLM 1.'):
+                raise StockholmParseError("Incorrect header found: %r" % line)
+            record = _StockholmRecord()
+        elif line == '//':
+            yield record.to_alignment(constructor, strict)
+            record = None
+        elif line.startswith('#=GF'):
+            record.gf_lines.append(line)
+        elif line.startswith('#=GS'):
+            record.gs_lines.append(line)
+        elif line.startswith('#=GR'):
+            record.gr_lines.append(line)
+        elif line.startswith('#=GC'):
+            record.gc_lines.append(line)
+        elif line.startswith('#'):
+            # comments and repeated headers
+            continue
+        else:
+            try:
+                id_, chunk = line.split()
+            except ValueError:
+                raise StockholmParseError(
+                    "Expected a sequence identifier followed by sequence "
+                    "characters on line: %r" % line)
+            record.append(id_, chunk)
+
+    if record is not None:
+        raise StockholmParseError("Reached end of file before finding the "
+                                  "'//' line ending the last record.")
+
+
+@register_reader('stockholm', StockholmAlignment)
+def _stockholm_to_stockholm_alignment(fh, constructor=Sequence, strict=False,
+                                      rec_num=1):
+    if rec_num < 1:
+        raise ValueError("Invalid record number (`rec_num`=%r). `rec_num` "
+                         "must be at least 1." % rec_num)
+
+    records = _stockholm_to_generator(fh, constructor=constructor,
+                                      strict=strict)
+    try:
+        for i, alignment in zip(range(1, rec_num + 1), records):
+            if i == rec_num:
+                return alignment
+    finally:
+        records.close()
+    raise StockholmParseError("Reached end of file before finding record %d."
+                              % rec_num)
+
+
+@register_writer('stockholm', StockholmAlignment)
+def _stockholm_alignment_to_stockholm(obj, fh):
+    ids = obj.ids()
+    # 10 comes from the characters for '#=GF ' and the feature after label
+    infolen = max([len(id_) for id_ in ids] or [0]) + 10
+
+    # NOTE: everything must be coerced to str in case an int or float is
+    # passed
+    fh.write('# STOCKHOLM 1.0\n')
+    for feature, value in _format_gf(obj.gf):
+        fh.write('#=GF %s %s\n' % (feature, value))
+
+    for feature, values in viewitems(obj.gs):
+        for seqname, value in viewitems(values):
+            fh.write('#=GS %s %s %s\n' % (seqname, feature, value))
+
+    for id_, seq in zip(ids, obj):
+        fh.write(_pad(id_, infolen))
+        fh.write(str(seq))
+        fh.write('\n')
+        # GR info added for sequence
+        for feature, values in viewitems(obj.gr):
+            if id_ in values:
+                leaderinfo = '#=GR %s %s' % (id_, feature)
+                fh.write(_pad(leaderinfo, infolen))
+                fh.write(str(values[id_]))
+                fh.write('\n')
+
+    for feature, value in viewitems(obj.gc):
+        fh.write(_pad('#=GC %s' % feature, infolen))
+        fh.write(str(value))
+        fh.write('\n')
+    fh.write('//\n')
+
+
+def _pad(leader, width):
+    """Left-justify `leader`, separating it from what follows by a space"""
+    return leader + ' ' * max(width - len(leader), 1)
+
+
+def _format_gf(gf):
+    """Yield (feature, value) pairs for the GF lines of a record
+
+    Tree identifiers (TN) are kept together with their trees (NH), and
+    reference information is kept together in blocks ordered RN, RM, RT, RA,
+    RL, RC. RN lines are generated if they are not provided.
+    """
+    skipfeatures = set(("NH", "RC", "RM", "RN", "RA", "RL"))
+    for feature, value in viewitems(gf):
+        # list of features to skip and parse special later
+        if feature in skipfeatures:
+            continue
+        # list of features to parse special
+        elif feature == "TN":
+            # trees must be in proper order of identifier then tree
+            idents = value if isinstance(value, list) else [value]
+            trees = gf["NH"] if isinstance(gf["NH"], list) else [gf["NH"]]
+            for ident, tree in zip(idents, trees):
+                yield "TN", str(ident)
+                yield "NH", str(tree)
+        elif feature == "RT":
+            # make sure each reference block stays together
+            # set up lists to zip in case some bits are missing
+            default_none = [0] * len(value)
+            rn = gf.get("RN", ["[%i]" % x for x in range(1, len(value) + 1)])
+            rm = gf.get("RM", default_none)
+            ra = gf.get("RA", default_none)
+            rl = gf.get("RL", default_none)
+            rc = gf.get("RC", default_none)
+            for n, m, t, a, l, c in zip(rn, rm, value, ra, rl, rc):
+                yield "RN", n
+                for ref_feature, ref_value in (("RM", m), ("RT", t),
+                                               ("RA", a), ("RL", l),
+                                               ("RC", c)):
+                    if ref_value:
+                        yield ref_feature, str(ref_value)
+        else:
+            # normal addition for everything else
+            if not isinstance(value, list):
+                value = [value]
+            for val in value:
+                yield feature, str(val)
+
+
+class _StockholmRecord(object):
+    """Accumulates the lines of a single Stockholm record as it is read
+
+    Sequence characters are copied into a growable (sequence count x
+    alignment length) byte matrix as blocks are read, so interleaved
+    alignments are assembled without repeatedly concatenating strings.
+    Annotation lines are kept as-is and parsed once the record is complete.
+    """
+
+    def __init__(self):
+        self.gf_lines = []
+        self.gs_lines = []
+        self.gr_lines = []
+        self.gc_lines = []
+
+        self._ids = []
+        self._id_to_index = {}
+        self._lengths = []
+        self._buffer = np.empty((16, 256), dtype=np.uint8)
+
+    def append(self, id_, chunk):
+        """Append a block of sequence characters to a sequence's row"""
+        try:
+            chunk = chunk.encode('ascii')
+        except UnicodeError:
+            raise StockholmParseError(
+                "Sequence %r contains non-ASCII characters." % id_)
+
+        index = self._id_to_index.get(id_)
+        if index is None:
+            index = len(self._ids)
+            self._ids.append(id_)
+            self._id_to_index[id_] = index
+            self._lengths.append(0)
+
+        start = self._lengths[index]
+        end = start + len(chunk)
+        rows, columns = self._buffer.shape
+        if index >= rows or end > columns:
+            self._grow(max(rows, 2 * index), max(columns, 2 * end))
+        self._buffer[index, start:end] = np.frombuffer(chunk, dtype=np.uint8)
+        self._lengths[index] = end
+
+    def to_alignment(self, constructor, strict):
+        """Build a StockholmAlignment from the lines read so far"""
+        matrix = self._matrix()
+        # each sequence is a view onto a row of the matrix, which the
+        # alignment then uses as its own matrix without copying it
+        seqs = [constructor(matrix[i], metadata={'id': id_})
+                for i, id_ in enumerate(self._ids)]
+        seqlen = matrix.shape[1]
+
+        gf = StockholmAlignment._parse_gf_info(self.gf_lines)
+        gs = StockholmAlignment._parse_gs_gr_info(self.gs_lines)
+        gr = StockholmAlignment._parse_gs_gr_info(self.gr_lines, strict,
+                                                  seqlen)
+        gc = StockholmAlignment._parse_gc_info(self.gc_lines, strict, seqlen)
+        return StockholmAlignment(seqs, gf, gs, gr, gc)
+
+    def _matrix(self):
+        count = len(self._ids)
+        if count == 0:
+            return np.empty((0, 0), dtype=np.uint8)
+
+        length = self._lengths[0]
+        for id_, seq_length in zip(self._ids, self._lengths):
+            if seq_length != length:
+                raise StockholmParseError(
+                    "All sequences must be the same length, but sequence %r "
+                    "has length %d and sequence %r has length %d."
+                    % (self._ids[0], length, id_, seq_length))
+
+        if self._buffer.shape != (count, length):
+            self._shrink(count, length)
+        return self._buffer
+
+    def _shrink(self, rows, columns):
+        # move the rows to the front of the buffer one at a time, then
+        # release the rest of it, so the matrix is never copied as a whole
+        buffer, self._buffer = self._buffer, None
+        flat = buffer.reshape(-1)
+        width = buffer.shape[1]
+        for i in range(1, rows):
+            flat[i * columns:(i + 1) * columns] = \
+                flat[i * width:i * width + columns]
+        del flat
+        buffer.resize(rows * columns, refcheck=False)
+        buffer.shape = (rows, columns)
+        self._buffer = buffer
+
+    def _grow(self, rows, columns):
+        buffer = np.empty((rows, columns), dtype=np.uint8)
+        count = min(len(self._ids), self._buffer.shape[0])
+        used = max(self._lengths)
+        buffer[:count, :used] = self._buffer[:count, :used]
+        self._buffer = buffer
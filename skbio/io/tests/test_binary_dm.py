@@ -0,0 +1,218 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import DistanceMatrix
+from skbio.io import BinaryDMFormatError
+from skbio.io.binary_dm import (
+    _binary_dm_to_dissimilarity_matrix, _binary_dm_to_distance_matrix,
+    _dissimilarity_matrix_to_binary_dm, _distance_matrix_to_binary_dm,
+    _binary_dm_sniffer)
+from skbio.stats.distance import DissimilarityMatrix
+
+
+class BinaryDMTestData(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.dm_1x1 = DistanceMatrix([[0.0]], ['a'])
+        self.dm_3x3 = DistanceMatrix([[0.0, 0.01, 4.2],
+                                      [0.01, 0.0, 12.0],
+                                      [4.2, 12.0, 0.0]],
+                                     ['a', 'b', u'\xe9'])
+        self.dm_3x3_f4 = DistanceMatrix(
+            np.array([[0.0, 0.5, 1.5], [0.5, 0.0, 2.0], [1.5, 2.0, 0.0]],
+                     dtype=np.float32), ['x', 'y', 'z'])
+        self.dms = [self.dm_1x1, self.dm_3x3, self.dm_3x3_f4]
+
+        self.dism_2x2_asym = DissimilarityMatrix([[0.0, 1.0], [-2.0, 0.0]],
+                                                 ['a', 'b'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def path(self, name='dm.bin'):
+        return os.path.join(self.tmpdir, name)
+
+    def write_path(self, writer, obj, name='dm.bin', **kwargs):
+        fp = self.path(name)
+        with open(fp, 'wb') as fh:
+            writer(obj, fh, **kwargs)
+        return fp
+
+
+class BinaryDMReaderWriterTests(BinaryDMTestData):
+    def test_roundtrip_file(self):
+        for condensed in True, False:
+            for dm in self.dms:
+                fp = self.write_path(_distance_matrix_to_binary_dm, dm,
+                                     condensed=condensed)
+                with open(fp, 'rb') as fh:
+                    obs = _binary_dm_to_distance_matrix(fh)
+
+                self.assertEqual(obs, dm)
+                self.assertEqual(obs.dtype, dm.dtype)
+                self.assertEqual(obs._condensed, condensed)
+                if len(dm.ids) > 1:
+                    data = obs.condensed_form() if condensed else obs.data
+                    self.assertIsInstance(data, np.memmap)
+
+    def test_roundtrip_filelike(self):
+        for condensed in True, False:
+            for dm in self.dms:
+                fh = io.BytesIO()
+                _distance_matrix_to_binary_dm(dm, fh, condensed=condensed)
+                fh.seek(0)
+                obs = _binary_dm_to_distance_matrix(fh)
+
+                self.assertEqual(obs, dm)
+                self.assertEqual(obs.dtype, dm.dtype)
+                self.assertEqual(obs._condensed, condensed)
+
+    def test_roundtrip_dissimilarity_matrix(self):
+        fp = self.write_path(_dissimilarity_matrix_to_binary_dm,
+                             self.dism_2x2_asym)
+        with open(fp, 'rb') as fh:
+            obs = _binary_dm_to_dissimilarity_matrix(fh)
+        self.assertEqual(obs, self.dism_2x2_asym)
+        self.assertIsInstance(obs.data, np.memmap)
+
+        # A distance matrix in condensed layout can be read into a
+        # dissimilarity matrix.
+        fp = self.write_path(_distance_matrix_to_binary_dm, self.dm_3x3)
+        with open(fp, 'rb') as fh:
+            obs = _binary_dm_to_dissimilarity_matrix(fh)
+        self.assertEqual(obs, DissimilarityMatrix(self.dm_3x3.data,
+                                                  self.dm_3x3.ids))
+
+    def test_read_asymmetric_into_distance_matrix(self):
+        fp = self.write_path(_dissimilarity_matrix_to_binary_dm,
+                             self.dism_2x2_asym)
+        with open(fp, 'rb') as fh:
+            with self.assertRaises(Exception):
+                _binary_dm_to_distance_matrix(fh)
+
+    def test_read_mmap_modes(self):
+        fp = self.write_path(_distance_matrix_to_binary_dm, self.dm_3x3)
+
+        with open(fp, 'rb') as fh:
+            obs = _binary_dm_to_distance_matrix(fh, mmap_mode=None)
+        self.assertEqual(obs, self.dm_3x3)
+        self.assertNotIsInstance(obs.condensed_form(), np.memmap)
+
+        # Copy-on-write mappings don't change the file.
+        with open(fp, 'rb') as fh:
+            obs = _binary_dm_to_distance_matrix(fh, mmap_mode='c')
+        obs.condensed_form()[0] = 42.0
+        with open(fp, 'rb') as fh:
+            self.assertEqual(_binary_dm_to_distance_matrix(fh), self.dm_3x3)
+
+    def test_read_text_mode_file(self):
+        # Files on disk are reopened in binary mode.
+        fp = self.write_path(_distance_matrix_to_binary_dm, self.dm_3x3)
+        with io.open(fp, 'r', encoding='latin-1') as fh:
+            obs = _binary_dm_to_distance_matrix(fh)
+        self.assertEqual(obs, self.dm_3x3)
+
+    def test_header_alignment(self):
+        fh = io.BytesIO()
+        _distance_matrix_to_binary_dm(self.dm_3x3, fh)
+        raw = fh.getvalue()
+
+        self.assertEqual(raw[:8], b'SKBIO-DM')
+        header_size, = struct.unpack('<Q', raw[8:16])
+        self.assertEqual((16 + header_size) % 64, 0)
+        header = json.loads(raw[16:16 + header_size].decode('utf-8'))
+        self.assertEqual(header, {'version': 1, 'layout': 'condensed',
+                                  'dtype': '<f8',
+                                  'ids': ['a', 'b', u'\xe9']})
+        npt.assert_equal(np.frombuffer(raw[16 + header_size:], dtype='<f8'),
+                         self.dm_3x3.condensed_form())
+
+    def test_write_text_mode_file(self):
+        with io.open(self.path(), 'w') as fh:
+            with self.assertRaisesRegexp(BinaryDMFormatError, 'binary mode'):
+                _distance_matrix_to_binary_dm(self.dm_3x3, fh)
+
+
+class BinaryDMInvalidFileTests(BinaryDMTestData):
+    def binary_dm(self, header, data=b'', magic=b'SKBIO-DM'):
+        header = json.dumps(header).encode('utf-8')
+        return io.BytesIO(magic + struct.pack('<Q', len(header)) + header +
+                          data)
+
+    def test_invalid_files(self):
+        valid_header = {'version': 1, 'layout': 'condensed', 'dtype': '<f8',
+                        'ids': ['a', 'b', 'c']}
+        data = np.arange(3, dtype='<f8').tobytes()
+        invalid_fhs = [
+            (io.BytesIO(), 'does not start'),
+            (io.BytesIO(b'SKBIO-DM'), 'ends before its header'),
+            (self.binary_dm(valid_header, data, magic=b'SKBIO-XX'),
+             'does not start'),
+            (self.binary_dm(valid_header, data[:-1]), '3 value\(s\)'),
+            (self.binary_dm(dict(valid_header, version=2), data), 'version'),
+            (self.binary_dm(dict(valid_header, layout='lower'), data),
+             "layout u?'lower'"),
+            (self.binary_dm(dict(valid_header, dtype='<i4'), data),
+             "type u?'<i4'"),
+            (self.binary_dm({'version': 1}, data), 'parse the header'),
+            (io.BytesIO(b'SKBIO-DM' + struct.pack('<Q', 3) + b'{"v'),
+             'parse the header')
+        ]
+        for fh, error_msg_regexp in invalid_fhs:
+            with self.assertRaisesRegexp(BinaryDMFormatError,
+                                         error_msg_regexp):
+                _binary_dm_to_distance_matrix(fh)
+
+    def test_truncated_file(self):
+        fp = self.write_path(_distance_matrix_to_binary_dm, self.dm_3x3)
+        with open(fp, 'rb+') as fh:
+            fh.truncate(os.path.getsize(fp) - 1)
+        with open(fp, 'rb') as fh:
+            with self.assertRaisesRegexp(BinaryDMFormatError, 'too short'):
+                _binary_dm_to_distance_matrix(fh)
+
+    def test_read_text_mode_filelike(self):
+        with self.assertRaisesRegexp(BinaryDMFormatError, 'binary mode'):
+            _binary_dm_to_distance_matrix(io.StringIO(u'SKBIO-DM'))
+
+
+class SnifferTests(BinaryDMTestData):
+    def test_positives(self):
+        fh = io.BytesIO()
+        _distance_matrix_to_binary_dm(self.dm_3x3, fh)
+        fh.seek(0)
+        self.assertEqual(_binary_dm_sniffer(fh), (True, {}))
+
+        fp = self.write_path(_dissimilarity_matrix_to_binary_dm,
+                             self.dism_2x2_asym)
+        with io.open(fp, 'r', encoding='latin-1') as fh:
+            self.assertEqual(_binary_dm_sniffer(fh), (True, {}))
+
+    def test_negatives(self):
+        for fh in (io.BytesIO(), io.BytesIO(b'SKBIO'),
+                   io.BytesIO(b'\ta\tb\na\t0.0\t1.0\nb\t1.0\t0.0\n'),
+                   io.StringIO(u'\ta\tb\na\t0.0\t1.0\nb\t1.0\t0.0\n')):
+            self.assertEqual(_binary_dm_sniffer(fh), (False, {}))
+
+
+if __name__ == '__main__':
+    main()
@@ -11,10 +11,15 @@ from six import StringIO
 
 import unittest
 
+import numpy as np
+import numpy.testing as npt
+
 from skbio import TreeNode
+from skbio.tree import TreeArray
 from skbio.io import NewickFormatError
-from skbio.io.newick import (_newick_to_tree_node, _tree_node_to_newick,
-                             _newick_sniffer)
+from skbio.io.newick import (_newick_to_tree_node, _newick_to_tree_array,
+                             _tree_node_to_newick, _newick_sniffer,
+                             _tokenize_newick)
 
 
 class TestNewick(unittest.TestCase):
@@ -318,6 +323,49 @@ class TestNewick(unittest.TestCase):
                 self.assertIn(frag, str(cm.exception))
             fh.close()
 
+    def test_newick_to_tree_array_valid_files(self):
+        for tree, newicks in self.trees_newick_lists:
+            for newick in newicks:
+                fh = StringIO(newick)
+                read_tree = _newick_to_tree_array(fh)
+
+                self.assertIsInstance(read_tree, TreeArray)
+                self._assert_equal(tree, read_tree.to_tree_node())
+
+                fh.close()
+
+    def test_newick_to_tree_array_invalid_files(self):
+        for invalid, error_fragments in self.invalid_newicks:
+            fh = StringIO(invalid)
+            with self.assertRaises(NewickFormatError) as cm:
+                _newick_to_tree_array(fh)
+            for frag in error_fragments:
+                self.assertIn(frag, str(cm.exception))
+            fh.close()
+
+    def test_newick_to_tree_array_preorder(self):
+        fh = StringIO(u"((a:1,b_b:2)c:3,'d_d',e)root;")
+        obs = _newick_to_tree_array(fh)
+        npt.assert_array_equal(obs.parent, [-1, 0, 1, 1, 0, 0])
+        npt.assert_array_equal(obs.length, [np.nan, 3, 1, 2, np.nan, np.nan])
+        self.assertEqual(obs.name.tolist(),
+                         ['root', 'c', 'a', 'b b', 'd_d', 'e'])
+
+        fh = StringIO(u"(b_b,'d_d');")
+        obs = _newick_to_tree_array(fh, convert_underscores=False)
+        self.assertEqual(obs.name.tolist(), [None, 'b_b', 'd_d'])
+
+    def test_tokenize_newick_across_lines(self):
+        # labels, literals and comments may be split between lines
+        lines = [u"(a", u"b_", u"c:0.", u"5,'x ", u"y''", u"z'[c", u"'", u"]",
+                 u" [d]", u"]e)f", u"[g", u"[h]", u"];\n"]
+        obs = list(_tokenize_newick(iter(lines)))
+        self.assertEqual(obs, ['(', 'ab c', ':', '0.5', ',', "x y'ze", ')',
+                               'f', ';'])
+
+        with self.assertRaises(NewickFormatError):
+            list(_tokenize_newick(iter([u"(a ", u"b);"])))
+
     def test_tree_node_to_newick(self):
         for tree, newicks in self.trees_newick_lists:
             newick = newicks[0]
@@ -0,0 +1,211 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+from six import StringIO
+
+from unittest import TestCase, main
+
+from skbio import DNA, RNA
+from skbio.alignment import StockholmAlignment, StockholmParseError
+from skbio.io import StockholmFormatError
+from skbio.io.stockholm import (_stockholm_sniffer, _stockholm_to_generator,
+                                _stockholm_to_stockholm_alignment,
+                                _stockholm_alignment_to_stockholm)
+
+
+class SnifferTests(TestCase):
+    def test_valid(self):
+        for contents in ['# STOCKHOLM 1.0\nseq1 ACGT\n//\n',
+                         '\n  \n# STOCKHOLM 1.0\n//\n']:
+            self.assertEqual(_stockholm_sniffer(StringIO(contents)),
+                             (True, {}))
+
+    def test_invalid(self):
+        for contents in ['', '\n\n', '>seq1\nACGT\n', 'seq1 ACGT\n//\n',
+                         '#=GF AC RF00360\n# STOCKHOLM 1.0\n']:
+            self.assertEqual(_stockholm_sniffer(StringIO(contents)),
+                             (False, {}))
+
+
+class ReaderTests(TestCase):
+    def setUp(self):
+        self.interleaved = StringIO(
+            "# STOCKHOLM 1.0\n"
+            "#=GF AC RF00360\n"
+            "#=GS seq1 AC 111\n"
+            "#=GS seq2 AC 222\n"
+            "seq1          ACC-G\n"
+            "#=GR seq1 SS  11101\n"
+            "seq2          TCC-G\n"
+            "#=GR seq2 SS  01101\n"
+            "#=GC SS_cons  (((..\n"
+            "\n"
+            "# a comment\n"
+            "seq1          -GGTA\n"
+            "#=GR seq1 SS  01111\n"
+            "seq2          -GGCA\n"
+            "#=GR seq2 SS  01110\n"
+            "#=GC SS_cons  ..)))\n"
+            "//\n")
+
+    def test_interleaved(self):
+        obs = _stockholm_to_stockholm_alignment(self.interleaved,
+                                                constructor=DNA, strict=True)
+
+        self.assertIsInstance(obs, StockholmAlignment)
+        self.assertEqual(obs.ids(), ['seq1', 'seq2'])
+        self.assertEqual(obs[0], DNA('ACC-G-GGTA', metadata={'id': 'seq1'}))
+        self.assertEqual(obs[1], DNA('TCC-G-GGCA', metadata={'id': 'seq2'}))
+        self.assertEqual(obs.gf, {'AC': 'RF00360'})
+        self.assertEqual(obs.gs, {'AC': {'seq1': '111', 'seq2': '222'}})
+        self.assertEqual(obs.gr, {'SS': {'seq1': '1110101111',
+                                         'seq2': '0110101110'}})
+        self.assertEqual(obs.gc, {'SS_cons': '(((....)))'})
+
+    def test_sequences_share_alignment_matrix(self):
+        obs = _stockholm_to_stockholm_alignment(self.interleaved,
+                                                constructor=DNA)
+
+        self.assertEqual(obs._matrix.shape, (2, 10))
+        # the growable buffer is shrunk in place rather than copied
+        self.assertIsNone(obs._matrix.base)
+        for seq in obs:
+            self.assertIs(seq._bytes.base, obs._matrix)
+
+    def test_many_long_sequences(self):
+        # grow the buffer in both dimensions, across several blocks
+        blocks = [''.join('ACGT-'[(i + j) % 5] for j in range(300))
+                  for i in range(3)]
+        lines = ['# STOCKHOLM 1.0']
+        for block in blocks:
+            lines.extend('s%d %s' % (i, block) for i in range(40))
+            lines.append('')
+        lines.append('//')
+
+        obs = _stockholm_to_stockholm_alignment(StringIO('\n'.join(lines)))
+
+        self.assertEqual(obs.sequence_count(), 40)
+        self.assertEqual(obs.sequence_length(), 900)
+        for i, seq in enumerate(obs):
+            self.assertEqual(seq.metadata['id'], 's%d' % i)
+            self.assertEqual(str(seq), ''.join(blocks))
+
+    def test_generator(self):
+        fh = StringIO("# STOCKHOLM 1.0\n"
+                      "seq1 ACGU\n"
+                      "//\n"
+                      "# STOCKHOLM 1.0\n"
+                      "seq2 UGCA\n"
+                      "seq3 UG-A\n"
+                      "//\n")
+
+        obs = list(_stockholm_to_generator(fh, constructor=RNA))
+
+        self.assertEqual(len(obs), 2)
+        self.assertEqual(obs[0].ids(), ['seq1'])
+        self.assertEqual(obs[1].ids(), ['seq2', 'seq3'])
+        self.assertEqual(obs[1][1], RNA('UG-A', metadata={'id': 'seq3'}))
+
+    def test_rec_num(self):
+        fh = StringIO("# STOCKHOLM 1.0\nseq1 ACGT\n//\n"
+                      "# STOCKHOLM 1.0\nseq2 TGCA\n//\n")
+
+        obs = _stockholm_to_stockholm_alignment(fh, rec_num=2)
+        self.assertEqual(obs.ids(), ['seq2'])
+
+        fh.seek(0)
+        with self.assertRaisesRegexp(StockholmFormatError, 'record 3'):
+            _stockholm_to_stockholm_alignment(fh, rec_num=3)
+
+        with self.assertRaises(ValueError):
+            _stockholm_to_stockholm_alignment(fh, rec_num=0)
+
+    def test_no_sequences(self):
+        obs = _stockholm_to_stockholm_alignment(
+            StringIO("# STOCKHOLM 1.0\n#=GF AC RF00360\n//\n"))
+
+        self.assertEqual(obs.sequence_count(), 0)
+        self.assertEqual(obs.gf, {'AC': 'RF00360'})
+
+    def test_invalid_files(self):
+        invalid = [
+            ("seq1 ACGT\n//\n", 'header'),
+            ("# STOCKHOLM 1.0\nseq1 ACGT\n", "'//'"),
+            ("# STOCKHOLM 1.0\nseq1\n//\n", 'sequence identifier'),
+            ("# STOCKHOLM 1.0\nseq1 AC GT\n//\n", 'sequence identifier'),
+            ("# STOCKHOLM 1.0\nseq1 ACGT\nseq2 ACG\n//\n",
+             "same length.*'seq2' has length 3"),
+            ("# STOCKHOLM 1.0\nseq1 ACGT\n#=GC\n//\n", 'GC line'),
+        ]
+        for contents, regexp in invalid:
+            with self.assertRaisesRegexp(StockholmParseError, regexp):
+                list(_stockholm_to_generator(StringIO(contents)))
+
+    def test_strict(self):
+        contents = "# STOCKHOLM 1.0\nseq1 ACGT\n#=GC SS_cons ((.\n//\n"
+
+        obs = _stockholm_to_stockholm_alignment(StringIO(contents))
+        self.assertEqual(obs.gc, {'SS_cons': '((.'})
+
+        with self.assertRaisesRegexp(StockholmFormatError, 'GC'):
+            _stockholm_to_stockholm_alignment(StringIO(contents), strict=True)
+
+
+class WriterTests(TestCase):
+    def test_write(self):
+        seqs = [RNA("ACC--G-GGGU", metadata={'id': "seq1"}),
+                RNA("UCC--G-GGGA", metadata={'id': "seq2"})]
+        gf = {'TN': ['tree1'], 'NH': ['(seq1,seq2);'], 'CC': 'comment'}
+        obj = StockholmAlignment(seqs, gf=gf,
+                                 gr={'SS': {'seq2': '11101110111'}},
+                                 gc={'SS_cons': '(((.....)))'})
+        fh = StringIO()
+
+        _stockholm_alignment_to_stockholm(obj, fh)
+
+        obs = fh.getvalue()
+        self.assertIn('#=GF TN tree1\n#=GF NH (seq1,seq2);\n', obs)
+        self.assertIn('#=GF CC comment\n', obs)
+        self.assertTrue(obs.startswith('# STOCKHOLM 1.0\n'))
+        self.assertTrue(obs.endswith(
+            'seq1          ACC--G-GGGU\n'
+            'seq2          UCC--G-GGGA\n'
+            '#=GR seq2 SS  11101110111\n'
+            '#=GC SS_cons  (((.....)))\n'
+            '//\n'))
+
+    def test_write_empty(self):
+        fh = StringIO()
+        _stockholm_alignment_to_stockholm(StockholmAlignment([]), fh)
+        self.assertEqual(fh.getvalue(), '# STOCKHOLM 1.0\n//\n')
+
+    def test_roundtrip(self):
+        contents = ("# STOCKHOLM 1.0\n"
+                    "#=GF AC RF00360\n"
+                    "#=GS seq1 AC 111\n"
+                    "seq1          ACC-G-GGTA\n"
+                    "#=GR seq1 SS  1110101111\n"
+                    "seq2          TCC-G-GGCA\n"
+                    "#=GC SS_cons  (((....)))\n"
+                    "//\n"
+                    "# STOCKHOLM 1.0\n"
+                    "seq3  AC-G\n"
+                    "//\n")
+
+        fh = StringIO()
+        for obj in _stockholm_to_generator(StringIO(contents),
+                                           constructor=DNA, strict=True):
+            _stockholm_alignment_to_stockholm(obj, fh)
+
+        self.assertEqual(fh.getvalue(), contents.replace('seq3  ',
+                                                         'seq3          '))
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,7 @@ Functions
 
    subsample_counts
    isubsample
+   rarefy
 
 """
 
@@ -42,8 +43,8 @@ Functions
 
 from skbio.util import TestRunner
 
-from ._subsample import subsample_counts, isubsample
+from ._subsample import subsample_counts, isubsample, rarefy
 
-__all__ = ['subsample_counts', 'isubsample']
+__all__ = ['subsample_counts', 'isubsample', 'rarefy']
 
 test = TestRunner(__file__).test
@@ -14,8 +14,10 @@ from warnings import warn
 from heapq import heappush, heappop
 from collections import defaultdict
 from copy import copy
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
+from scipy.sparse import issparse, csr_matrix
 
 from skbio.util import EfficiencyWarning
 try:
@@ -186,6 +188,7 @@ def subsample_counts(counts, n, replace=False):
     See Also
     --------
     isubsample
+    rarefy
     skbio.diversity.alpha
 
     Notes
@@ -264,3 +267,197 @@ def subsample_counts(counts, n, replace=False):
                     result[p] += 1
 
     return result
+
+
+# number of nonzero counts subsampled by each chunk of samples in rarefy
+_BLOCK_SIZE = 2 ** 20
+
+
+def rarefy(counts, depths, iterations=1, n_jobs=1):
+    """Repeatedly subsample every sample of a counts matrix to several depths.
+
+    Parameters
+    ----------
+    counts : 2-D array_like, int, or scipy.sparse matrix
+        Matrix of counts where each row contains the counts of a sample.
+    depths : int or iterable of ints
+        Numbers of items to subsample (without replacement) from each sample.
+    iterations : int, optional
+        Number of times each sample is subsampled to each depth.
+    n_jobs : int, optional
+        Number of threads subsampling chunks of samples.
+
+    Returns
+    -------
+    generator
+        Yields ``(iteration, depth, subsampled)`` for each iteration and each
+        depth (in increasing order), where ``subsampled`` is a
+        ``scipy.sparse.csr_matrix`` of the counts of every sample subsampled
+        to ``depth``. The rows of samples with fewer than ``depth`` counts
+        are all zero.
+
+    Raises
+    ------
+    TypeError
+        If `counts` cannot be safely converted to an integer datatype.
+    ValueError
+        If `counts` is not a 2-D matrix or contains negative values, or if a
+        depth is negative.
+
+    See Also
+    --------
+    subsample_counts
+    skbio.diversity.alpha.rarefaction
+
+    Notes
+    -----
+    Counts are not expanded into one entry per item. The number of items
+    drawn from each half of the nonzero counts of a sample follows a
+    hypergeometric distribution, and each half is split recursively, so a
+    sample is subsampled with a number of vectorized draws that is
+    logarithmic in its number of nonzero counts, for all samples at once.
+
+    In each iteration, the depths of a sample are nested: a sample is
+    subsampled to the largest depth first, and each smaller depth is
+    subsampled from the result of the next larger one, which is a uniform
+    subsample of the original counts.
+
+    Each chunk of samples draws from its own ``numpy.random.RandomState``,
+    seeded from numpy's global random state, so results are reproducible
+    with ``numpy.random.seed`` and do not depend on `n_jobs`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from skbio.stats import rarefy
+    >>> counts = [[4, 5, 0, 2, 1], [0, 3, 0, 1, 0]]
+    >>> for iteration, depth, sub in rarefy(counts, [2, 6], iterations=2):
+    ...     print(iteration, depth, sub.sum(axis=1).T)
+    0 2 [[2 2]]
+    0 6 [[6 0]]
+    1 2 [[2 2]]
+    1 6 [[6 0]]
+
+    """
+    if issparse(counts):
+        counts = csr_matrix(counts, copy=True)
+    else:
+        counts = np.asarray(counts)
+        if counts.ndim != 2:
+            raise ValueError("Only 2-D matrices are supported.")
+        counts = csr_matrix(counts.astype(int, casting='safe', copy=False))
+    counts.data = counts.data.astype(np.int64, casting='safe', copy=False)
+    if (counts.data < 0).any():
+        raise ValueError("Counts matrix cannot contain negative values.")
+    counts.sum_duplicates()
+
+    depths = np.unique(np.atleast_1d(np.asarray(depths, dtype=np.int64)))
+    if len(depths) and depths[0] < 0:
+        raise ValueError("depths cannot be negative.")
+
+    return _rarefy(counts, depths, iterations, n_jobs)
+
+
+def _rarefy(counts, depths, iterations, n_jobs):
+    """Generate the subsampled matrices of `rarefy` from validated input."""
+    # each chunk of rows holds about _BLOCK_SIZE nonzero counts
+    num_rows = counts.shape[0]
+    starts = np.searchsorted(counts.indptr,
+                             np.arange(_BLOCK_SIZE, counts.nnz, _BLOCK_SIZE))
+    bounds = np.unique(np.concatenate([[0], starts, [num_rows]]))
+    chunks = list(zip(bounds[:-1], bounds[1:]))
+
+    for iteration in range(iterations):
+        seeds = np.random.randint(2 ** 31 - 1, size=len(chunks))
+
+        def subsample_chunk(i):
+            start, stop = chunks[i]
+            lo, hi = counts.indptr[start], counts.indptr[stop]
+            return _rarefy_rows(counts.data[lo:hi],
+                                counts.indptr[start:stop + 1] - lo, depths,
+                                np.random.RandomState(seeds[i]))
+
+        if n_jobs == 1 or len(chunks) < 2:
+            results = [subsample_chunk(i) for i in range(len(chunks))]
+        else:
+            pool = ThreadPool(n_jobs)
+            try:
+                results = pool.map(subsample_chunk, range(len(chunks)))
+            finally:
+                pool.close()
+
+        for d, depth in enumerate(depths):
+            data = np.concatenate([np.empty(0, dtype=np.int64)] +
+                                  [result[d] for result in results])
+            subsampled = csr_matrix((data, counts.indices.copy(),
+                                     counts.indptr.copy()),
+                                    shape=counts.shape)
+            subsampled.eliminate_zeros()
+            yield iteration, depth, subsampled
+
+
+def _rarefy_rows(data, indptr, depths, random_state):
+    """Subsample the rows of a CSR matrix to each of the sorted `depths`.
+
+    Returns the data of the subsampled matrix for each depth, with the
+    nonzero structure of the input.
+
+    """
+    sizes = np.diff(indptr)
+    current = data
+    subsampled = []
+    for depth in depths[::-1]:
+        csum = np.zeros(len(current) + 1, dtype=np.int64)
+        np.cumsum(current, out=csum[1:])
+        enough = csum[indptr[1:]] - csum[indptr[:-1]] >= depth
+        drawn = _subsample_segments(current, indptr[:-1][enough],
+                                    indptr[1:][enough], depth, random_state)
+
+        # rows without enough counts for a depth are zero, and keep their
+        # counts for the smaller depths
+        short = np.repeat(~enough, sizes)
+        subsampled.append(np.where(short, 0, drawn))
+        current = np.where(short, current, drawn)
+    return subsampled[::-1]
+
+
+def _subsample_segments(data, starts, stops, size, random_state):
+    """Draw `size` items without replacement from each ``data[start:stop]``.
+
+    Returns the number of items drawn from each entry of `data` (zero
+    outside of the segments). Each segment is split in two halves, the
+    number of items drawn from the first half is drawn from a hypergeometric
+    distribution, and the halves are split in turn.
+
+    """
+    drawn = np.zeros_like(data)
+    csum = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum(data, out=csum[1:])
+    sizes = np.repeat(np.int64(size), len(starts))
+    while len(starts):
+        # segments drawing no items are done, and those of a single entry
+        # draw all of their items from it
+        active = sizes > 0
+        starts, stops, sizes = starts[active], stops[active], sizes[active]
+        single = stops - starts == 1
+        drawn[starts[single]] = sizes[single]
+        starts, stops, sizes = starts[~single], stops[~single], sizes[~single]
+
+        mids = (starts + stops) // 2
+        first = _hypergeometric(csum[mids] - csum[starts],
+                                csum[stops] - csum[mids], sizes, random_state)
+        starts = np.concatenate([starts, mids])
+        stops = np.concatenate([mids, stops])
+        sizes = np.concatenate([first, sizes - first])
+    return drawn
+
+
+def _hypergeometric(ngood, nbad, nsample, random_state):
+    """Draw from hypergeometric distributions, allowing empty parameters."""
+    # numpy versions before 1.14 require all parameters to be positive
+    drawn = np.where(nbad == 0, nsample, 0)
+    both = (ngood > 0) & (nbad > 0) & (nsample > 0)
+    if both.any():
+        drawn[both] = random_state.hypergeometric(ngood[both], nbad[both],
+                                                  nsample[both])
+    return drawn
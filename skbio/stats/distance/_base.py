@@ -61,11 +61,13 @@ class DissimilarityMatrix(SkbioObject):
         (floats), or a structure that can be converted to a ``numpy.ndarray``
         using ``numpy.asarray``. Can instead be a `DissimilarityMatrix` (or
         subclass) instance, in which case the instance's data will be used.
-        Data will be converted to a float ``dtype`` if necessary. A copy will
-        *not* be made if already a ``numpy.ndarray`` with a float ``dtype``.
+        Data will be converted to ``float64`` unless they are ``float32`` or
+        ``float64``. A copy will *not* be made if already a ``numpy.ndarray``
+        (e.g., a ``numpy.memmap``) with one of these ``dtype``\ s.
     ids : sequence of str, optional
         Sequence of strings to be used as object IDs. Must match the number of
-        rows/cols in `data`. If ``None`` (the default), IDs will be
+        rows/cols in `data`. If ``None`` (the default), the IDs of `data` are
+        used if it is a `DissimilarityMatrix`; otherwise, IDs will be
         monotonically-increasing integers cast as strings, with numbering
         starting from zero, e.g., ``('0', '1', '2', '3', ...)``.
 
@@ -90,20 +92,45 @@ class DissimilarityMatrix(SkbioObject):
     _matrix_element_name = 'dissimilarity'
 
     def __init__(self, data, ids=None):
+        # The data of a matrix of the same type (or a subtype) have already
+        # been validated, so only the IDs need to be.
+        validated = isinstance(data, self.__class__)
         if isinstance(data, DissimilarityMatrix):
+            if ids is None:
+                ids = data.ids
             data = data.data
-        data = np.asarray(data, dtype='float')
+        data = _float_array(data)
 
         if ids is None:
             ids = (str(i) for i in range(data.shape[0]))
         ids = tuple(ids)
 
-        self._validate(data, ids)
+        if validated:
+            self._validate_ids(ids, data.shape[0])
+        else:
+            self._validate(data, ids)
 
         self._data = data
         self._ids = ids
         self._id_index = self._index_list(self._ids)
 
+    @classmethod
+    def _new(cls, data, ids, id_index=None):
+        """Construct a matrix from data and IDs that are known to be valid.
+
+        Used to derive new matrices from an already validated one (e.g., by
+        copying or filtering it) without validating the data again. If the IDs
+        are those of an existing matrix, its `id_index` can be shared.
+
+        """
+        obj = cls.__new__(cls)
+        obj._data = data
+        obj._ids = tuple(ids)
+        if id_index is None:
+            id_index = obj._index_list(obj._ids)
+        obj._id_index = id_index
+        return obj
+
     @property
     def data(self):
         """Array of dissimilarities.
@@ -135,14 +162,15 @@ class DissimilarityMatrix(SkbioObject):
     @ids.setter
     def ids(self, ids_):
         ids_ = tuple(ids_)
-        self._validate(self.data, ids_)
+        # the data are unchanged, so there is no need to validate them again
+        self._validate_ids(ids_, self.shape[0])
         self._ids = ids_
         self._id_index = self._index_list(self._ids)
 
     @property
     def dtype(self):
         """Data type of the dissimilarities."""
-        return self.data.dtype
+        return self._data.dtype
 
     @property
     def shape(self):
@@ -154,7 +182,8 @@ class DissimilarityMatrix(SkbioObject):
         entries will always be equal.
 
         """
-        return self.data.shape
+        num_ids = len(self._ids)
+        return num_ids, num_ids
 
     @property
     def size(self):
@@ -165,7 +194,7 @@ class DissimilarityMatrix(SkbioObject):
         Equivalent to ``self.shape[0] * self.shape[1]``.
 
         """
-        return self.data.size
+        return self.shape[0] * self.shape[1]
 
     @property
     def T(self):
@@ -192,7 +221,8 @@ class DissimilarityMatrix(SkbioObject):
             `self`.
 
         """
-        return self.__class__(self.data.T.copy(), deepcopy(self.ids))
+        return self._new(self.data.T.copy(), deepcopy(self.ids),
+                         self._id_index)
 
     def index(self, lookup_id):
         """Return the index of the specified ID.
@@ -218,6 +248,106 @@ class DissimilarityMatrix(SkbioObject):
         else:
             raise MissingIDError(lookup_id)
 
+    def indices(self, lookup_ids):
+        """Return the indices of the specified IDs.
+
+        Parameters
+        ----------
+        lookup_ids : iterable of str
+            IDs whose indices will be returned.
+
+        Returns
+        -------
+        ndarray
+            Row/column indices of `lookup_ids`, in the same order.
+
+        Raises
+        ------
+        MissingIDError
+            If an ID in `lookup_ids` is not in the dissimilarity matrix.
+
+        See Also
+        --------
+        index
+
+        """
+        lookup_ids = list(lookup_ids)
+        try:
+            return np.fromiter(map(self._id_index.__getitem__, lookup_ids),
+                               dtype=np.intp, count=len(lookup_ids))
+        except KeyError as e:
+            raise MissingIDError(e.args[0])
+
+    def lookup(self, from_ids, to_ids):
+        """Return the dissimilarities between pairs of IDs.
+
+        The vectorized equivalent of ``[dm[i, j] for i, j in zip(from_ids,
+        to_ids)]``.
+
+        Parameters
+        ----------
+        from_ids, to_ids : iterable of str
+            IDs of the pairs of objects, which must be of the same length.
+
+        Returns
+        -------
+        ndarray
+            Dissimilarity from each ID in `from_ids` to the ID at the same
+            position in `to_ids`.
+
+        Raises
+        ------
+        MissingIDError
+            If an ID is not in the dissimilarity matrix.
+        ValueError
+            If `from_ids` and `to_ids` are not of the same length.
+
+        See Also
+        --------
+        between
+
+        """
+        from_idxs = self.indices(from_ids)
+        to_idxs = self.indices(to_ids)
+        if len(from_idxs) != len(to_idxs):
+            raise ValueError("There must be as many IDs to look up "
+                             "dissimilarities to (%d) as from (%d)." %
+                             (len(to_idxs), len(from_idxs)))
+        return self._take(from_idxs, to_idxs)
+
+    def between(self, from_ids, to_ids):
+        """Return the block of dissimilarities from some IDs to others.
+
+        Parameters
+        ----------
+        from_ids, to_ids : iterable of str
+            IDs of the rows and of the columns of the block.
+
+        Returns
+        -------
+        ndarray
+            Two-dimensional ``numpy.ndarray`` of the dissimilarities from each
+            ID in `from_ids` (rows) to each ID in `to_ids` (columns).
+
+        Raises
+        ------
+        MissingIDError
+            If an ID is not in the dissimilarity matrix.
+
+        See Also
+        --------
+        filter
+        lookup
+
+        Notes
+        -----
+        Unlike `filter`, the rows and columns may be of different objects, for
+        example to extract the dissimilarities between two groups of objects.
+
+        """
+        return self._take(*np.ix_(self.indices(from_ids),
+                                  self.indices(to_ids)))
+
     def redundant_form(self):
         """Return an array of dissimilarities in redundant format.
 
@@ -255,7 +385,7 @@ class DissimilarityMatrix(SkbioObject):
         """
         # We deepcopy IDs in case the tuple contains mutable objects at some
         # point in the future.
-        return self.__class__(self.data.copy(), deepcopy(self.ids))
+        return self._new(self.data.copy(), deepcopy(self.ids), self._id_index)
 
     def filter(self, ids, strict=True):
         """Filter the dissimilarity matrix by IDs.
@@ -281,23 +411,22 @@ class DissimilarityMatrix(SkbioObject):
         MissingIDError
             If an ID in `ids` is not in the object's list of IDs.
         """
+        idxs, ids = self._filter_indices(ids, strict)
+        self._validate_ids(ids, len(idxs))
+        return self._new(self._data[np.ix_(idxs, idxs)], ids)
+
+    def _filter_indices(self, ids, strict):
+        """Return the indices of `ids`, and the IDs that were found."""
         if strict:
-            idxs = [self.index(id_) for id_ in ids]
+            ids = list(ids)
         else:
-            # get the indices to slice the inner numpy array
-            idxs = []
-            # save the IDs that were found in the distance matrix
-            found_ids = []
-            for id_ in ids:
-                try:
-                    idxs.append(self.index(id_))
-                    found_ids.append(id_)
-                except MissingIDError:
-                    pass
-            ids = found_ids
-
-        filtered_data = self._data[idxs][:, idxs]
-        return self.__class__(filtered_data, ids)
+            # keep only the IDs that are in the distance matrix
+            ids = [id_ for id_ in ids if id_ in self._id_index]
+        return self.indices(ids), ids
+
+    def _take(self, from_idxs, to_idxs):
+        """Return the dissimilarities between (broadcast) pairs of indices."""
+        return self._data[from_idxs, to_idxs]
 
     def plot(self, cmap=None, title=""):
         """Creates a heatmap of the dissimilarity matrix
@@ -555,6 +684,11 @@ class DissimilarityMatrix(SkbioObject):
         exception is caught and handled.
 
         """
+        self._validate_data(data)
+        self._validate_ids(ids, data.shape[0])
+
+    def _validate_data(self, data):
+        """Validate the data array, without the IDs (see `_validate`)."""
         if 0 in data.shape:
             raise DissimilarityMatrixError("Data must be at least 1x1 in "
                                            "size.")
@@ -565,23 +699,28 @@ class DissimilarityMatrix(SkbioObject):
             raise DissimilarityMatrixError("Data must be square (i.e., have "
                                            "the same number of rows and "
                                            "columns).")
-        if data.dtype != np.double:
+        if data.dtype not in (np.float32, np.float64):
             raise DissimilarityMatrixError("Data must contain only floating "
                                            "point values.")
         if np.trace(data) != 0:
             raise DissimilarityMatrixError("Data must be hollow (i.e., the "
                                            "diagonal can only contain zeros).")
+
+    def _validate_ids(self, ids, num_ids):
+        """Validate the IDs of `num_ids` rows/columns of valid data."""
+        if num_ids == 0:
+            raise DissimilarityMatrixError("Data must be at least 1x1 in "
+                                           "size.")
         duplicates = find_duplicates(ids)
         if duplicates:
             formatted_duplicates = ', '.join(repr(e) for e in duplicates)
             raise DissimilarityMatrixError("IDs must be unique. Found the "
                                            "following duplicate IDs: %s" %
                                            formatted_duplicates)
-        if len(ids) != data.shape[0]:
+        if len(ids) != num_ids:
             raise DissimilarityMatrixError("The number of IDs (%d) must match "
                                            "the number of rows/columns in the "
-                                           "data (%d)." %
-                                           (len(ids), data.shape[0]))
+                                           "data (%d)." % (len(ids), num_ids))
 
     def _index_list(self, list_):
         return {id_: idx for idx, id_ in enumerate(list_)}
@@ -603,12 +742,43 @@ class DistanceMatrix(DissimilarityMatrix):
     --------
     DissimilarityMatrix
 
+    Parameters
+    ----------
+    data : array_like or DissimilarityMatrix
+        Square, hollow, symmetric two-dimensional ``numpy.ndarray`` of
+        distances (floats), or a structure that can be converted to a
+        ``numpy.ndarray`` using ``numpy.asarray``. Can instead be a
+        `DissimilarityMatrix` (or subclass) instance, in which case the
+        instance's data will be used. If `condensed` is ``True``, `data` may
+        also be a one-dimensional vector of distances in condensed format.
+    ids : sequence of str, optional
+        Sequence of strings to be used as object IDs. Must match the number of
+        rows/cols in `data`. If ``None`` (the default), the IDs of `data` are
+        used if it is a `DissimilarityMatrix`; otherwise, IDs will be
+        monotonically-increasing integers cast as strings, with numbering
+        starting from zero, e.g., ``('0', '1', '2', '3', ...)``.
+    condensed : bool, optional
+        If ``True``, store only the distances in condensed format. As in
+        redundant format, single precision (``float32``) distances are kept in
+        single precision; other data are converted to ``float64``.
+
+    See Also
+    --------
+    DissimilarityMatrix
+
     Notes
     -----
-    The distances are stored in redundant (square-form) format [1]_. To
-    facilitate use with other scientific Python routines (e.g., scipy), the
-    distances can be retrieved in condensed (vector-form) format using
-    `condensed_form`.
+    By default, the distances are stored in redundant (square-form) format
+    [1]_. To facilitate use with other scientific Python routines (e.g.,
+    scipy), the distances can be retrieved in condensed (vector-form) format
+    using `condensed_form`.
+
+    With ``condensed=True``, only the ``n * (n - 1) / 2`` distances in
+    condensed format are stored, which halves the memory used (or quarters it,
+    with ``float32`` distances). `condensed_form`, `filter`, `permute`,
+    `copy` and lookups by ID or pair of IDs work on the condensed distances
+    directly. `data` and `redundant_form` build a new array in redundant
+    format on each access, as does any other indexing of the matrix.
 
     `DistanceMatrix` only requires that the distances it stores are symmetric.
     Checks are *not* performed to ensure the other three metric properties
@@ -625,6 +795,120 @@ class DistanceMatrix(DissimilarityMatrix):
 
     # Override here, used in superclass __str__
     _matrix_element_name = 'distance'
+    # Whether only the condensed distances are stored in _data
+    _condensed = False
+
+    def __init__(self, data, ids=None, condensed=False):
+        if not condensed:
+            super(DistanceMatrix, self).__init__(data, ids)
+            return
+
+        if isinstance(data, DissimilarityMatrix):
+            if ids is None:
+                ids = data.ids
+            if isinstance(data, DistanceMatrix):
+                data = data.condensed_form()
+            else:
+                data = data.data
+        data = _float_array(data)
+
+        if data.ndim != 1:
+            if ids is None:
+                ids = (str(i) for i in range(data.shape[0]))
+            ids = tuple(ids)
+            # check the redundant form before discarding half of it
+            self._validate(data, ids)
+            data = squareform(data, force='tovector', checks=False)
+        elif ids is None:
+            ids = (str(i) for i in range(_num_condensed_ids(data.shape[0])))
+        ids = tuple(ids)
+
+        self._condensed = True
+        self._validate(data, ids)
+
+        self._data = data
+        self._ids = ids
+        self._id_index = self._index_list(self._ids)
+
+    @classmethod
+    def _new(cls, data, ids, id_index=None, condensed=False):
+        """Construct a matrix from data and IDs that are known to be valid.
+
+        Overrides the superclass `_new`. If `condensed` is ``True``, `data`
+        are the condensed distances.
+
+        """
+        obj = super(DistanceMatrix, cls)._new(data, ids, id_index)
+        if condensed:
+            obj._condensed = True
+        return obj
+
+    @property
+    def data(self):
+        """Array of distances.
+
+        A square, hollow, symmetric two-dimensional ``numpy.ndarray`` of
+        distances (floats). A copy is *not* returned, unless the distances are
+        stored in condensed format, in which case a new array is built on each
+        access.
+
+        Notes
+        -----
+        This property is not writeable.
+
+        """
+        if self._condensed:
+            return squareform(self._data, force='tomatrix', checks=False)
+        return self._data
+
+    def copy(self):
+        """Return a deep copy of the distance matrix.
+
+        Returns
+        -------
+        DistanceMatrix
+            Deep copy of the distance matrix, stored in the same format as
+            `self`. Will be the same type as `self`.
+
+        """
+        if self._condensed:
+            return self._new(self._data.copy(), deepcopy(self.ids),
+                             self._id_index, condensed=True)
+        return super(DistanceMatrix, self).copy()
+
+    def transpose(self):
+        """Return the transpose of the distance matrix.
+
+        Notes
+        -----
+        A deep copy is returned. As a distance matrix is symmetric, this is the
+        same as `copy`.
+
+        Returns
+        -------
+        DistanceMatrix
+            Transpose of the distance matrix. Will be the same type as `self`.
+
+        """
+        if self._condensed:
+            return self.copy()
+        return super(DistanceMatrix, self).transpose()
+
+    def filter(self, ids, strict=True):
+        """Filter the distance matrix by IDs.
+
+        Overrides the superclass `filter`. The filtered distance matrix is
+        stored in the same format as `self`; if that is condensed format, the
+        distances are taken from the condensed distances without building the
+        redundant form.
+
+        """
+        if not self._condensed:
+            return super(DistanceMatrix, self).filter(ids, strict=strict)
+        idxs, ids = self._filter_indices(ids, strict)
+        self._validate_ids(ids, len(idxs))
+        return self._new(_condensed_submatrix(self._data, self.shape[0], idxs),
+                         ids, condensed=True)
 
     def condensed_form(self):
         """Return an array of distances in condensed format.
@@ -639,15 +923,61 @@ class DistanceMatrix(DissimilarityMatrix):
         Condensed format is described in [1]_.
 
         The conversion is not a constant-time operation, though it should be
-        relatively quick to perform.
+        relatively quick to perform. If the distances are stored in condensed
+        format, no conversion is needed and they are returned without a copy.
 
         References
         ----------
         .. [1] http://docs.scipy.org/doc/scipy/reference/spatial.distance.html
 
         """
+        if self._condensed:
+            return self._data
         return squareform(self._data, force='tovector', checks=False)
 
+    def within_groups(self, grouping):
+        """Return which distances are between objects of the same group.
+
+        Parameters
+        ----------
+        grouping : 1-D array_like
+            Group label of each object, in the same order as the IDs.
+
+        Returns
+        -------
+        ndarray
+            Boolean vector in condensed format (see `condensed_form`), which is
+            ``True`` for the distances within groups and ``False`` for the
+            distances between groups.
+
+        Raises
+        ------
+        ValueError
+            If `grouping` does not have one label per ID.
+
+        Examples
+        --------
+        >>> from skbio import DistanceMatrix
+        >>> dm = DistanceMatrix([[0, 1, 2], [1, 0, 3], [2, 3, 0]],
+        ...                     ['a', 'b', 'c'])
+        >>> within = dm.within_groups(['x', 'y', 'x'])
+        >>> within
+        array([False,  True, False], dtype=bool)
+        >>> dm.condensed_form()[~within]
+        array([ 1.,  3.])
+
+        """
+        num_ids = self.shape[0]
+        if len(grouping) != num_ids:
+            raise ValueError("The grouping must have one label per ID (%d), "
+                             "not %d." % (num_ids, len(grouping)))
+        grouping = np.unique(grouping, return_inverse=True)[1]
+
+        within = np.empty(num_ids * (num_ids - 1) // 2, dtype=bool)
+        for rows, cols, start, stop in _condensed_row_blocks(num_ids):
+            within[start:stop] = grouping[rows] == grouping[cols]
+        return within
+
     def permute(self, condensed=False):
         """Randomly permute both rows and columns in the matrix.
 
@@ -681,25 +1011,260 @@ class DistanceMatrix(DissimilarityMatrix):
 
         """
         order = np.random.permutation(self.shape[0])
-        permuted = self._data[order][:, order]
+        if self._condensed:
+            permuted = _condensed_submatrix(self._data, self.shape[0], order)
+            if condensed:
+                return permuted
+            return self._new(permuted, self.ids, self._id_index,
+                             condensed=True)
+
+        permuted = self._data[np.ix_(order, order)]
 
         if condensed:
             return squareform(permuted, force='tovector', checks=False)
         else:
-            return self.__class__(permuted, self.ids)
+            return self._new(permuted, self.ids, self._id_index)
+
+    def __eq__(self, other):
+        """Compare this distance matrix to another for equality.
+
+        Overrides the superclass `__eq__`. Distance matrices with the same IDs
+        and distances are equal, regardless of the format they are stored in.
+
+        """
+        if not (self._condensed or getattr(other, '_condensed', False)) or \
+                not isinstance(other, DistanceMatrix):
+            return super(DistanceMatrix, self).__eq__(other)
+        return (self.shape == other.shape and self.ids == other.ids and
+                np.array_equal(self.condensed_form(), other.condensed_form()))
+
+    def __getitem__(self, index):
+        """Slice into distance data by object ID or numpy indexing.
+
+        Overrides the superclass `__getitem__`. If the distances are stored in
+        condensed format, lookups by ID or pair of IDs are answered from the
+        condensed distances, and any other index is applied to a new array in
+        redundant format.
+
+        """
+        if not self._condensed:
+            return super(DistanceMatrix, self).__getitem__(index)
+
+        num_ids = self.shape[0]
+        if isinstance(index, string_types):
+            return _condensed_row(self._data, num_ids, self.index(index))
+        elif self._is_id_pair(index):
+            i, j = self.index(index[0]), self.index(index[1])
+            if i == j:
+                return self._data.dtype.type(0)
+            i, j = min(i, j), max(i, j)
+            return self._data[_condensed_index(i, j, num_ids)]
+        else:
+            return self.data.__getitem__(index)
+
+    def _take(self, from_idxs, to_idxs):
+        """Return the distances between (broadcast) pairs of indices.
+
+        Overrides the superclass `_take` to look up condensed distances
+        directly.
+
+        """
+        if not self._condensed:
+            return super(DistanceMatrix, self)._take(from_idxs, to_idxs)
+        from_idxs, to_idxs = np.broadcast_arrays(from_idxs, to_idxs)
+        distances = np.zeros(from_idxs.shape, dtype=self._data.dtype)
+        off_diagonal = from_idxs != to_idxs
+        i = np.minimum(from_idxs, to_idxs)[off_diagonal]
+        j = np.maximum(from_idxs, to_idxs)[off_diagonal]
+        distances[off_diagonal] = self._data[_condensed_index(i, j,
+                                                              self.shape[0])]
+        return distances
 
     def _validate(self, data, ids):
         """Validate the data array and IDs.
 
         Overrides the superclass `_validate`. Performs a check for symmetry in
-        addition to the checks performed in the superclass.
+        addition to the checks performed in the superclass. If the distances
+        are stored in condensed format, `data` is checked to be a vector of
+        floats with one distance per pair of IDs instead.
 
         """
-        super(DistanceMatrix, self)._validate(data, ids)
+        if self._condensed:
+            self._validate_condensed(data, ids)
+        else:
+            super(DistanceMatrix, self)._validate(data, ids)
 
-        if (data.T != data).any():
+    def _validate_data(self, data):
+        """Validate the data array, including its symmetry."""
+        super(DistanceMatrix, self)._validate_data(data)
+        if not _is_symmetric(data):
             raise DistanceMatrixError("Data must be symmetric.")
 
+    def _validate_condensed(self, data, ids):
+        """Validate condensed distances and IDs."""
+        if data.ndim != 1:
+            raise DistanceMatrixError("Condensed data must have exactly one "
+                                      "dimension.")
+        if data.dtype != np.double and data.dtype != np.float32:
+            raise DistanceMatrixError("Data must contain only floating point "
+                                      "values.")
+        self._validate_condensed_ids(ids)
+        num_ids = len(ids)
+        if num_ids * (num_ids - 1) // 2 != data.shape[0]:
+            raise DistanceMatrixError("The number of IDs (%d) does not match "
+                                      "the number of condensed distances "
+                                      "(%d)." % (num_ids, data.shape[0]))
+
+    def _validate_ids(self, ids, num_ids):
+        """Validate the IDs of `num_ids` rows/columns of valid data.
+
+        Overrides the superclass `_validate_ids` so that invalid IDs of
+        condensed distances raise `DistanceMatrixError`, as they do when
+        constructing the matrix.
+
+        """
+        if not self._condensed:
+            super(DistanceMatrix, self)._validate_ids(ids, num_ids)
+            return
+
+        self._validate_condensed_ids(ids)
+        if len(ids) != num_ids:
+            raise DistanceMatrixError("The number of IDs (%d) must match the "
+                                      "number of objects in the data (%d)." %
+                                      (len(ids), num_ids))
+
+    def _validate_condensed_ids(self, ids):
+        """Check that there are IDs and that they are unique."""
+        if not ids:
+            raise DistanceMatrixError("Data must be at least 1x1 in size.")
+        duplicates = find_duplicates(ids)
+        if duplicates:
+            formatted_duplicates = ', '.join(repr(e) for e in duplicates)
+            raise DistanceMatrixError("IDs must be unique. Found the "
+                                      "following duplicate IDs: %s" %
+                                      formatted_duplicates)
+
+
+def _float_array(data):
+    """Return `data` as an array of floats.
+
+    Single-precision data and memory-mapped arrays (e.g., read from a
+    ``binary_dm`` file) are kept as they are, so that they are neither
+    upcast nor loaded into memory; anything else is converted to ``float64``.
+
+    """
+    data = np.asanyarray(data)
+    if data.dtype not in (np.float32, np.float64) or \
+            isinstance(data, np.matrix):
+        data = np.asarray(data, dtype='float')
+    return data
+
+
+def _is_symmetric(data, block_size=2 ** 20):
+    """Return whether the square array `data` is symmetric.
+
+    Compares the upper triangle with the lower one a block of rows at a time,
+    so that no temporary array of more than about `block_size` elements is
+    created.
+
+    """
+    num_rows = data.shape[0]
+    rows_per_block = max(1, block_size // num_rows)
+    for start in range(0, num_rows, rows_per_block):
+        stop = min(start + rows_per_block, num_rows)
+        if (data[start:stop, start:] != data[start:, start:stop].T).any():
+            return False
+    return True
+
+
+def _num_condensed_ids(num_distances):
+    """Return the number of IDs with `num_distances` condensed distances."""
+    num_ids = int(round((1 + np.sqrt(1 + 8 * num_distances)) / 2))
+    if num_ids * (num_ids - 1) // 2 != num_distances:
+        raise DistanceMatrixError("The number of condensed distances (%d) is "
+                                  "not n * (n - 1) / 2 for any number of IDs "
+                                  "n." % num_distances)
+    return num_ids
+
+
+def _condensed_index(i, j, num_ids):
+    """Return the position of the distance between `i` < `j` when condensed.
+
+    Works elementwise on arrays of indices.
+
+    """
+    return num_ids * i - i * (i + 1) // 2 + j - i - 1
+
+
+def _condensed_row(data, num_ids, i):
+    """Return the row of distances of `i` from condensed distances."""
+    others = np.arange(num_ids)
+    others = others[others != i]
+    row = np.zeros(num_ids, dtype=data.dtype)
+    row[others] = data[_condensed_index(np.minimum(others, i),
+                                        np.maximum(others, i), num_ids)]
+    return row
+
+
+def _condensed_row_ranges(num_ids, block_size=2 ** 20):
+    """Split condensed distances into ranges of whole rows.
+
+    Yields ``(row, stop_row, start, stop)`` for ranges of about `block_size`
+    distances: the condensed distances ``start:stop`` are those from the
+    objects ``row:stop_row`` to the objects that follow them.
+
+    """
+    row_starts = np.arange(num_ids)
+    row_starts = _condensed_index(row_starts, row_starts + 1, num_ids)
+    row = 0
+    while row < num_ids - 1:
+        stop_row = np.searchsorted(row_starts, row_starts[row] + block_size,
+                                   side='right') - 1
+        stop_row = min(max(stop_row, row + 1), num_ids - 1)
+        yield row, stop_row, row_starts[row], row_starts[stop_row]
+        row = stop_row
+
+
+def _condensed_row_blocks(num_ids, block_size=2 ** 20):
+    """Split condensed distances into blocks of whole rows.
+
+    Yields ``(rows, cols, start, stop)`` for blocks of about `block_size`
+    distances: the condensed distances ``start:stop`` are those between the
+    objects at the indices ``rows`` and ``cols``, where ``rows < cols``.
+
+    """
+    for row, stop_row, start, stop in _condensed_row_ranges(num_ids,
+                                                            block_size):
+        block_rows = np.arange(row, stop_row)
+        lengths = num_ids - 1 - block_rows
+        # within a row, the columns follow the row and are consecutive
+        row_starts = _condensed_index(block_rows, block_rows + 1, num_ids)
+        cols = np.arange(stop - start) + np.repeat(
+            block_rows + 1 - (row_starts - start), lengths)
+        yield np.repeat(block_rows, lengths), cols, start, stop
+
+
+def _condensed_submatrix(data, num_ids, idxs):
+    """Return the condensed distances between `idxs`, in that order.
+
+    The distances are gathered a row at a time, so no more than
+    ``len(idxs)`` indices are computed at once.
+
+    """
+    idxs = np.asarray(idxs, dtype=np.intp)
+    num_idxs = len(idxs)
+    result = np.empty(num_idxs * (num_idxs - 1) // 2, dtype=data.dtype)
+    start = 0
+    for row in range(num_idxs - 1):
+        i = idxs[row]
+        others = idxs[row + 1:]
+        lo = np.minimum(others, i)
+        hi = np.maximum(others, i)
+        result[start:start + len(others)] = \
+            data[_condensed_index(lo, hi, num_ids)]
+        start += len(others)
+    return result
+
 
 def randdm(num_objects, ids=None, constructor=None, random_fn=None):
     """Generate a distance matrix populated with random distances.
@@ -763,11 +1328,28 @@ def _preprocess_input(distance_matrix, grouping, column):
 
     These intermediate results can be computed a single time for efficiency,
     regardless of grouping vector permutations (i.e., when calculating the
-    p-value). These intermediate results are used by both ANOSIM and PERMANOVA.
+    p-value). These intermediate results are used by ANOSIM.
 
     Also validates and normalizes input (e.g., converting ``DataFrame`` column
     into grouping vector).
 
+    """
+    sample_size, num_groups, grouping = _preprocess_grouping(
+        distance_matrix, grouping, column)
+
+    tri_idxs = np.triu_indices(sample_size, k=1)
+    distances = distance_matrix.condensed_form()
+
+    return sample_size, num_groups, grouping, tri_idxs, distances
+
+
+def _preprocess_grouping(distance_matrix, grouping, column):
+    """Validate and normalize the grouping of the objects into groups.
+
+    Returns the sample size, the number of groups and the grouping as an
+    integer vector. Used by PERMANOVA, which works on the condensed distances
+    a block at a time instead of indexing them with the upper triangle.
+
     """
     if not isinstance(distance_matrix, DistanceMatrix):
         raise TypeError("Input must be a DistanceMatrix.")
@@ -806,10 +1388,7 @@ def _preprocess_input(distance_matrix, grouping, column):
             "objects (e.g., there are no 'between' distances because there is "
             "only a single group).")
 
-    tri_idxs = np.triu_indices(sample_size, k=1)
-    distances = distance_matrix.condensed_form()
-
-    return sample_size, num_groups, grouping, tri_idxs, distances
+    return sample_size, num_groups, grouping
 
 
 def _df_to_vector(distance_matrix, df, column):
@@ -7,13 +7,13 @@
 # ----------------------------------------------------------------------------
 
 from __future__ import absolute_import, division, print_function
-from future.builtins import range
 
 from functools import partial
 
 import numpy as np
 
-from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results)
+from ._base import (_preprocess_grouping, _condensed_row_blocks,
+                    _run_monte_carlo_stats, _build_results)
 
 
 def permanova(distance_matrix, grouping, column=None, permutations=999):
@@ -90,15 +90,17 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
     provide similar interfaces).
 
     """
-    sample_size, num_groups, grouping, tri_idxs, distances = _preprocess_input(
+    sample_size, num_groups, grouping = _preprocess_grouping(
         distance_matrix, grouping, column)
+    distances = distance_matrix.condensed_form()
 
     # Calculate number of objects in each group.
     group_sizes = np.bincount(grouping)
-    s_T = (distances ** 2).sum() / sample_size
+    s_T = sum(np.dot(block, block) for block in
+              _distance_blocks(distances, sample_size)) / sample_size
 
     test_stat_function = partial(_compute_f_stat, sample_size, num_groups,
-                                 tri_idxs, distances, group_sizes, s_T)
+                                 distances, group_sizes, s_T)
     stat, p_value = _run_monte_carlo_stats(test_stat_function, grouping,
                                            permutations)
 
@@ -106,31 +108,25 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
                           stat, p_value, permutations)
 
 
-def _compute_f_stat(sample_size, num_groups, tri_idxs, distances, group_sizes,
-                    s_T, grouping):
+def _compute_f_stat(sample_size, num_groups, distances, group_sizes, s_T,
+                    grouping):
     """Compute PERMANOVA pseudo-F statistic."""
-    # Create a matrix where objects in the same group are marked with the group
-    # index (e.g. 0, 1, 2, etc.). objects that are not in the same group are
-    # marked with -1.
-    grouping_matrix = -1 * np.ones((sample_size, sample_size), dtype=int)
-    for group_idx in range(num_groups):
-        within_indices = _index_combinations(
-            np.where(grouping == group_idx)[0])
-        grouping_matrix[within_indices] = group_idx
-
-    # Extract upper triangle (in same order as distances were extracted
-    # from full distance matrix).
-    grouping_tri = grouping_matrix[tri_idxs]
-
-    # Calculate s_W for each group, accounting for different group sizes.
+    # Calculate s_W, the sum of the squared distances within each group
+    # divided by the size of the group. The condensed distances are visited a
+    # block of rows at a time, so that neither a matrix of the grouping nor
+    # the indices of the upper triangle are needed at full size.
     s_W = 0
-    for i in range(num_groups):
-        s_W += (distances[grouping_tri == i] ** 2).sum() / group_sizes[i]
+    for rows, cols, start, stop in _condensed_row_blocks(sample_size):
+        groups = grouping[rows]
+        within = groups == grouping[cols]
+        block = np.asarray(distances[start:stop][within], dtype=np.float64)
+        s_W += (block ** 2 / group_sizes[groups[within]]).sum()
 
     s_A = s_T - s_W
     return (s_A / (num_groups - 1)) / (s_W / (sample_size - num_groups))
 
 
-def _index_combinations(indices):
-    # Modified from http://stackoverflow.com/a/11144716
-    return np.tile(indices, len(indices)), np.repeat(indices, len(indices))
+def _distance_blocks(distances, sample_size):
+    """Yield the condensed distances a block at a time, as doubles."""
+    for _, _, start, stop in _condensed_row_blocks(sample_size):
+        yield np.asarray(distances[start:stop], dtype=np.float64)
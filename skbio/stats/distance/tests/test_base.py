@@ -23,7 +23,8 @@ from skbio.stats.distance import (
     DissimilarityMatrixError, DistanceMatrixError, MissingIDError,
     DissimilarityMatrix, randdm)
 from skbio.stats.distance._base import (_preprocess_input,
-                                        _run_monte_carlo_stats)
+                                        _run_monte_carlo_stats,
+                                        _condensed_row_blocks, _is_symmetric)
 
 
 class DissimilarityMatrixTestData(TestCase):
@@ -74,6 +75,10 @@ class DissimilarityMatrixTests(DissimilarityMatrixTestData):
             DistanceMatrix(self.dm_3x3_data, ('a', 'b', 'c')), ids)
         self.assertEqual(obs, exp)
 
+        # IDs are taken from the matrix if they are not given
+        obs = DissimilarityMatrix(DistanceMatrix(self.dm_3x3_data, ids))
+        self.assertEqual(obs, exp)
+
         # DissimilarityMatrix -> DistanceMatrix
         with self.assertRaises(DistanceMatrixError):
             DistanceMatrix(self.dm_2x2_asym, ['foo', 'bar'])
@@ -144,6 +149,8 @@ class DissimilarityMatrixTests(DissimilarityMatrixTestData):
     def test_ids_invalid_input(self):
         with self.assertRaises(DissimilarityMatrixError):
             self.dm_3x3.ids = ['foo', 'bar']
+        with self.assertRaises(DissimilarityMatrixError):
+            self.dm_3x3.ids = ['foo', 'bar', 'foo']
         # Make sure that we can still use the dissimilarity matrix after trying
         # to be evil.
         obs = self.dm_3x3.ids
@@ -153,6 +160,15 @@ class DissimilarityMatrixTests(DissimilarityMatrixTestData):
         for dm in self.dms:
             self.assertEqual(dm.dtype, np.float64)
 
+        # single precision is kept, other data are converted to float64
+        data = np.array([[0, 1], [1, 0]])
+        for cls in DissimilarityMatrix, DistanceMatrix:
+            obs = cls(data.astype(np.float32), ['a', 'b'])
+            self.assertEqual(obs.dtype, np.float32)
+            self.assertEqual(cls(data, ['a', 'b']).dtype, np.float64)
+            obs = cls(np.matrix(data, dtype=float), ['a', 'b'])
+            self.assertEqual(type(obs.data), np.ndarray)
+
     def test_shape(self):
         for dm, shape in zip(self.dms, self.dm_shapes):
             self.assertEqual(dm.shape, shape)
@@ -180,6 +196,38 @@ class DissimilarityMatrixTests(DissimilarityMatrixTestData):
         with self.assertRaises(MissingIDError):
             self.dm_3x3.index(1)
 
+    def test_indices(self):
+        npt.assert_equal(self.dm_3x3.indices(['c', 'a', 'c']), [2, 0, 2])
+        npt.assert_equal(self.dm_3x3.indices(np.asarray(['b'])), [1])
+        npt.assert_equal(self.dm_3x3.indices([]), [])
+
+        with self.assertRaises(MissingIDError):
+            self.dm_3x3.indices(['a', 'd'])
+
+    def test_lookup(self):
+        obs = self.dm_3x3.lookup(['a', 'c', 'b', 'b'], ['b', 'b', 'c', 'b'])
+        npt.assert_equal(obs, [0.01, 12.0, 12.0, 0.0])
+
+        obs = self.dm_2x2_asym.lookup(['a', 'b'], ['b', 'a'])
+        npt.assert_equal(obs, [1.0, -2.0])
+
+        with self.assertRaises(MissingIDError):
+            self.dm_3x3.lookup(['a'], ['d'])
+        with self.assertRaises(ValueError):
+            self.dm_3x3.lookup(['a', 'b'], ['c'])
+
+    def test_between(self):
+        obs = self.dm_3x3.between(['c', 'a'], ['b'])
+        npt.assert_equal(obs, [[12.0], [0.01]])
+
+        obs = self.dm_2x2_asym.between(['b'], ['a', 'b'])
+        npt.assert_equal(obs, [[-2.0, 0.0]])
+
+        self.assertEqual(self.dm_3x3.between([], ['a']).shape, (0, 1))
+
+        with self.assertRaises(MissingIDError):
+            self.dm_3x3.between(['a'], ['d'])
+
     def test_redundant_form(self):
         for dm, redundant in zip(self.dms, self.dm_redundant_forms):
             obs = dm.redundant_form()
@@ -519,6 +567,165 @@ class DistanceMatrixTests(DissimilarityMatrixTestData):
         self.assertTrue(self.dm_3x3 == eq_dm)
         self.assertTrue(eq_dm == self.dm_3x3)
 
+    def test_init_condensed(self):
+        for dm, condensed in zip(self.dms, self.dm_condensed_forms):
+            obs = DistanceMatrix(condensed, dm.ids, condensed=True)
+            self.assertEqual(obs, dm)
+            self.assertEqual(dm, obs)
+            self.assertEqual(obs.shape, dm.shape)
+            self.assertEqual(obs.size, dm.size)
+            npt.assert_array_equal(obs.condensed_form(), condensed)
+            npt.assert_array_equal(obs.data, dm.data)
+            npt.assert_array_equal(obs.redundant_form(), dm.data)
+
+        # From redundant data or another distance matrix.
+        obs = DistanceMatrix(self.dm_3x3_data, ['a', 'b', 'c'],
+                             condensed=True)
+        self.assertEqual(obs, self.dm_3x3)
+        self.assertEqual(obs.condensed_form().shape, (3,))
+        obs = DistanceMatrix(self.dm_3x3, condensed=True)
+        self.assertEqual(obs, self.dm_3x3)
+        self.assertEqual(DistanceMatrix(obs), self.dm_3x3)
+
+        # Single precision is kept, and IDs are inferred.
+        obs = DistanceMatrix(np.array([1, 2, 3], dtype=np.float32),
+                             condensed=True)
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertEqual(obs.data.dtype, np.float32)
+        self.assertEqual(obs.ids, ('0', '1', '2'))
+
+    def test_init_condensed_invalid_input(self):
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([1.0, 2.0], condensed=True)
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([1.0, 2.0, 3.0], ['a', 'b'], condensed=True)
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([1.0, 2.0, 3.0], ['a', 'b', 'a'], condensed=True)
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([], [], condensed=True)
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([[0.0, 2.0], [1.0, 0.0]], ['a', 'b'],
+                           condensed=True)
+
+        dm = DistanceMatrix([1.0, 2.0, 3.0], ['a', 'b', 'c'], condensed=True)
+        dm.ids = ['x', 'y', 'z']
+        self.assertEqual(dm.ids, ('x', 'y', 'z'))
+        with self.assertRaises(DistanceMatrixError):
+            dm.ids = ['x', 'y']
+        with self.assertRaises(DistanceMatrixError):
+            dm.ids = ['x', 'y', 'x']
+        with self.assertRaises(DistanceMatrixError):
+            dm.filter(['x', 'y', 'x'])
+
+    def test_getitem_condensed(self):
+        dm = DistanceMatrix(self.dm_condensed_forms[2], ['a', 'b', 'c'],
+                            condensed=True)
+        npt.assert_array_equal(dm['b'], [0.01, 0.0, 12.0])
+        npt.assert_array_equal(dm['c'], [4.2, 12.0, 0.0])
+        self.assertEqual(dm['a', 'c'], 4.2)
+        self.assertEqual(dm['c', 'a'], 4.2)
+        self.assertEqual(dm['b', 'b'], 0.0)
+        npt.assert_array_equal(dm[1], self.dm_3x3[1])
+        npt.assert_array_equal(dm[:, 2], self.dm_3x3[:, 2])
+
+        with self.assertRaises(MissingIDError):
+            dm['x']
+        with self.assertRaises(MissingIDError):
+            dm['a', 'x']
+
+    def test_filter_copy_condensed(self):
+        dm = DistanceMatrix(self.dm_condensed_forms[2], ['a', 'b', 'c'],
+                            condensed=True)
+
+        obs = dm.filter(['c', 'a', 'b'])
+        self.assertEqual(obs, self.dm_3x3.filter(['c', 'a', 'b']))
+        npt.assert_array_equal(obs.condensed_form(), [4.2, 12.0, 0.01])
+
+        obs = dm.filter(['c', 'x', 'a'], strict=False)
+        self.assertEqual(obs.ids, ('c', 'a'))
+        npt.assert_array_equal(obs.condensed_form(), [4.2])
+
+        with self.assertRaises(MissingIDError):
+            dm.filter(['c', 'x'])
+
+        for obs in dm.copy(), dm.T:
+            self.assertEqual(obs, dm)
+            self.assertFalse(obs.condensed_form() is dm.condensed_form())
+
+    def test_permute_condensed_storage(self):
+        dm = DistanceMatrix(self.dm_condensed_forms[2], ['a', 'b', 'c'],
+                            condensed=True)
+        np.random.seed(0)
+
+        obs = dm.permute(condensed=True)
+        npt.assert_equal(obs, np.array([12.0, 4.2, 0.01]))
+
+        exp = DistanceMatrix([[0, 4.2, 12],
+                              [4.2, 0, 0.01],
+                              [12, 0.01, 0]], dm.ids)
+        obs = dm.permute()
+        self.assertEqual(obs, exp)
+        npt.assert_equal(dm.condensed_form(), self.dm_condensed_forms[2])
+
+    def test_init_from_validated_dm(self):
+        obs = DistanceMatrix(self.dm_3x3, ['x', 'y', 'z'])
+        self.assertEqual(obs.ids, ('x', 'y', 'z'))
+        self.assertTrue(obs.data is self.dm_3x3.data)
+
+        # The IDs are still validated.
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix(self.dm_3x3, ['x', 'y', 'x'])
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix(self.dm_3x3, ['x', 'y'])
+
+    def test_derived_matrices_are_valid(self):
+        for obs in (self.dm_3x3.copy(), self.dm_3x3.T,
+                    self.dm_3x3.filter(['c', 'a']), self.dm_3x3.permute()):
+            self.assertEqual(type(obs), DistanceMatrix)
+            self.assertEqual(DistanceMatrix(obs.data, obs.ids), obs)
+            self.assertEqual(obs.index(obs.ids[-1]), len(obs.ids) - 1)
+
+    def test_lookup_between_condensed(self):
+        dm = DistanceMatrix(self.dm_condensed_forms[2], ['a', 'b', 'c'],
+                            condensed=True)
+        from_ids, to_ids = ['a', 'c', 'b', 'b'], ['b', 'b', 'c', 'b']
+        npt.assert_equal(dm.lookup(from_ids, to_ids),
+                         self.dm_3x3.lookup(from_ids, to_ids))
+
+        obs = dm.between(['c', 'a'], ['a', 'b', 'c'])
+        npt.assert_equal(obs, [[4.2, 12.0, 0.0], [0.0, 0.01, 4.2]])
+        self.assertEqual(obs.dtype, np.float64)
+
+    def test_within_groups(self):
+        data = [[0, 1, 2, 3], [1, 0, 4, 5], [2, 4, 0, 6], [3, 5, 6, 0]]
+        for condensed in False, True:
+            dm = DistanceMatrix(data, condensed=condensed)
+            npt.assert_equal(dm.within_groups(['x', 'y', 'x', 'y']),
+                             [False, True, False, False, True, False])
+            npt.assert_equal(dm.within_groups([1, 1, 1, 1]), [True] * 6)
+
+        npt.assert_equal(self.dm_1x1.within_groups(['x']), [])
+
+        with self.assertRaises(ValueError):
+            self.dm_3x3.within_groups(['x', 'y'])
+
+    def test_is_symmetric(self):
+        data = np.arange(49, dtype=float).reshape(7, 7)
+        symmetric = data + data.T
+        for block_size in 1, 6, 7, 20, 2 ** 20:
+            self.assertTrue(_is_symmetric(symmetric, block_size))
+            self.assertFalse(_is_symmetric(data, block_size))
+
+            asymmetric = symmetric.copy()
+            asymmetric[6, 5] = 0.0
+            self.assertFalse(_is_symmetric(asymmetric, block_size))
+
+            asymmetric = symmetric.copy()
+            asymmetric[3, 3] = np.nan
+            self.assertFalse(_is_symmetric(asymmetric, block_size))
+
+        self.assertTrue(_is_symmetric(np.zeros((1, 1))))
+
 
 class RandomDistanceMatrixTests(TestCase):
     def test_default_usage(self):
@@ -640,6 +847,19 @@ class CategoricalStatsHelperFunctionTests(TestCase):
         with self.assertRaises(ValueError):
             _preprocess_input(self.dm, [1, 1, 1], None)
 
+    def test_condensed_row_blocks(self):
+        tri_idxs = np.triu_indices(7, k=1)
+        for block_size in 1, 4, 6, 11, 21, 100:
+            blocks = list(_condensed_row_blocks(7, block_size))
+            rows, cols, starts, stops = zip(*blocks)
+            npt.assert_equal(np.hstack(rows), tri_idxs[0])
+            npt.assert_equal(np.hstack(cols), tri_idxs[1])
+            self.assertEqual(starts, (0,) + stops[:-1])
+            self.assertEqual(stops[-1], 21)
+
+        self.assertEqual(list(_condensed_row_blocks(1)), [])
+        self.assertEqual(list(_condensed_row_blocks(0)), [])
+
     def test_run_monte_carlo_stats_with_permutations(self):
         obs = _run_monte_carlo_stats(lambda e: 42, self.grouping, 50)
         npt.assert_equal(obs, (42, 1.0))
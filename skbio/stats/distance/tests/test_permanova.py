@@ -112,6 +112,17 @@ class TestPERMANOVA(TestCase):
         obs = permanova(self.dm_unequal, self.grouping_unequal_relabeled)
         self.assert_series_equal(obs, exp)
 
+    def test_call_condensed_storage(self):
+        exp = pd.Series(index=self.exp_index,
+                        data=['PERMANOVA', 'pseudo-F', 6, 3, 0.578848, 0.645,
+                              999])
+        dm = DistanceMatrix(self.dm_unequal.condensed_form(),
+                            self.dm_unequal.ids, condensed=True)
+
+        np.random.seed(0)
+        obs = permanova(dm, self.grouping_unequal)
+        self.assert_series_equal(obs, exp)
+
 
 if __name__ == '__main__':
     main()
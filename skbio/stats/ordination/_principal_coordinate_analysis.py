@@ -13,6 +13,7 @@ from warnings import warn
 import numpy as np
 
 from skbio.stats.distance import DistanceMatrix
+from skbio.stats.distance._base import _condensed_row_blocks
 from ._base import Ordination, OrdinationResults
 
 # - In cogent, after computing eigenvalues/vectors, the imaginary part
@@ -67,20 +68,28 @@ class PCoA(Ordination):
     long_method_name = 'Principal Coordinate Analysis'
 
     def __init__(self, distance_matrix):
-        if isinstance(distance_matrix, DistanceMatrix):
-            self.dm = np.asarray(distance_matrix.data, dtype=np.float64)
-            self.ids = distance_matrix.ids
-        else:
+        if not isinstance(distance_matrix, DistanceMatrix):
             raise TypeError("Input must be a DistanceMatrix.")
-        self._pcoa()
+        self.ids = distance_matrix.ids
+        if distance_matrix._condensed:
+            # The distances (which may be memory-mapped) are centred a
+            # block at a time, without building the redundant distance
+            # matrix or the E matrix.
+            self.dm = None
+            self._pcoa(self._condensed_F_matrix(
+                distance_matrix.condensed_form(), len(self.ids)))
+        else:
+            self.dm = np.asarray(distance_matrix.data, dtype=np.float64)
+            self._pcoa()
 
-    def _pcoa(self):
-        E_matrix = self._E_matrix(self.dm)
+    def _pcoa(self, F_matrix=None):
+        if F_matrix is None:
+            E_matrix = self._E_matrix(self.dm)
 
-        # If the used distance was euclidean, pairwise distances
-        # needn't be computed from the data table Y because F_matrix =
-        # Y.dot(Y.T) (if Y has been centred).
-        F_matrix = self._F_matrix(E_matrix)
+            # If the used distance was euclidean, pairwise distances
+            # needn't be computed from the data table Y because F_matrix =
+            # Y.dot(Y.T) (if Y has been centred).
+            F_matrix = self._F_matrix(E_matrix)
 
         # If the eigendecomposition ever became a bottleneck, it could
         # be replaced with an iterative version that computes the
@@ -169,3 +178,36 @@ class PCoA(Ordination):
         col_means = E_matrix.mean(axis=0, keepdims=True)
         matrix_mean = E_matrix.mean()
         return E_matrix - row_means - col_means + matrix_mean
+
+    @staticmethod
+    def _condensed_F_matrix(distances, num_ids):
+        """Compute F matrix from condensed distances.
+
+        Same as ``_F_matrix(_E_matrix(squareform(distances)))``, but
+        reads the distances a block at a time.
+        """
+        # The row means of the E matrix (which is symmetric, so these
+        # are also its column means).
+        row_means = np.zeros(num_ids)
+        for rows, cols, start, stop in _condensed_row_blocks(num_ids):
+            E_block = _condensed_E_block(distances, start, stop)
+            row_means += np.bincount(rows, E_block, minlength=num_ids)
+            row_means += np.bincount(cols, E_block, minlength=num_ids)
+        row_means /= num_ids
+        matrix_mean = row_means.mean()
+
+        F_matrix = np.empty((num_ids, num_ids))
+        diag = np.arange(num_ids)
+        F_matrix[diag, diag] = matrix_mean - 2 * row_means
+        for rows, cols, start, stop in _condensed_row_blocks(num_ids):
+            F_block = (_condensed_E_block(distances, start, stop) -
+                       row_means[rows] - row_means[cols] + matrix_mean)
+            F_matrix[rows, cols] = F_block
+            F_matrix[cols, rows] = F_block
+        return F_matrix
+
+
+def _condensed_E_block(distances, start, stop):
+    """Compute a block of the E matrix from condensed distances."""
+    block = np.asarray(distances[start:stop], dtype=np.float64)
+    return block * block / -2
@@ -19,7 +19,7 @@ import numpy.testing as npt
 import pandas as pd
 from IPython.core.display import Image, SVG
 from nose.tools import assert_is_instance, assert_raises_regexp, assert_true
-from scipy.spatial.distance import pdist
+from scipy.spatial.distance import pdist, squareform
 
 from skbio import DistanceMatrix
 from skbio.stats.ordination import (
@@ -533,8 +533,8 @@ class TestPCoAResultsExtensive(object):
     def setup(self):
         matrix = np.loadtxt(get_data_path('PCoA_sample_data_2'))
         self.ids = [str(i) for i in range(matrix.shape[0])]
-        dist_matrix = DistanceMatrix(matrix, self.ids)
-        self.ordination = PCoA(dist_matrix)
+        self.dist_matrix = DistanceMatrix(matrix, self.ids)
+        self.ordination = PCoA(self.dist_matrix)
 
     def test_values(self):
         results = self.ordination.scores()
@@ -565,6 +565,18 @@ class TestPCoAResultsExtensive(object):
 
         npt.assert_equal(results.site_ids, self.ids)
 
+    def test_values_condensed_storage(self):
+        dist_matrix = DistanceMatrix(self.dist_matrix.condensed_form(),
+                                     self.ids, condensed=True)
+        results = PCoA(dist_matrix).scores()
+        expected = self.ordination.scores()
+
+        npt.assert_almost_equal(*normalize_signs(expected.site, results.site))
+        npt.assert_almost_equal(results.eigvals, expected.eigvals)
+        npt.assert_almost_equal(results.proportion_explained,
+                                expected.proportion_explained)
+        npt.assert_equal(results.site_ids, self.ids)
+
 
 class TestPCoAEigenResults(object):
     def setup(self):
@@ -612,6 +624,12 @@ class TestPCoAPrivateMethods(object):
         # Note that `test_make_F_matrix` in cogent is wrong
         npt.assert_almost_equal(F, expected_F)
 
+    def test_condensed_F_matrix(self):
+        distances = np.array([1., 2., 3., 4., 5., 6.])
+        F = PCoA._condensed_F_matrix(distances, 4)
+        expected_F = PCoA._F_matrix(PCoA._E_matrix(squareform(distances)))
+        npt.assert_almost_equal(F, expected_F)
+
 
 class TestPCoAErrors(object):
     def test_input(self):
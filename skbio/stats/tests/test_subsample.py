@@ -18,6 +18,7 @@ import warnings
 
 import numpy as np
 import numpy.testing as npt
+from scipy.sparse import csr_matrix
 
 from skbio.stats import isubsample
 
@@ -239,6 +240,75 @@ class ISubsampleTests(unittest.TestCase):
         self.assertEqual(list(obs), exp)
 
 
+class RarefyTests(unittest.TestCase):
+    def setUp(self):
+        self.counts = np.array([[4, 5, 0, 2, 1, 0, 30],
+                                [0, 3, 0, 1, 0, 0, 0],
+                                [0, 0, 0, 0, 0, 0, 0],
+                                [1, 1, 1, 1, 1, 1, 1],
+                                [0, 0, 0, 0, 0, 250, 0]])
+
+    def rarefy(self, *args, **kwargs):
+        return [(iteration, depth, sub.toarray()) for iteration, depth, sub
+                in py_subsample.rarefy(*args, **kwargs)]
+
+    def test_rarefy(self):
+        totals = self.counts.sum(axis=1)
+        depths = [0, 2, 7, 40, 250]
+        obs = self.rarefy(csr_matrix(self.counts), depths[::-1],
+                          iterations=3)
+        self.assertEqual([(iteration, depth) for iteration, depth, _ in obs],
+                         [(i, d) for i in range(3) for d in depths])
+
+        previous = None
+        for iteration, depth, sub in obs:
+            enough = totals >= depth
+            npt.assert_equal(sub.sum(axis=1), np.where(enough, depth, 0))
+            self.assertTrue((sub <= self.counts).all())
+            equal = totals == depth
+            npt.assert_equal(sub[equal], self.counts[equal])
+            if depth and previous is not None:
+                # depths are nested within an iteration
+                both = (previous.sum(axis=1) > 0) & (sub.sum(axis=1) > 0)
+                self.assertTrue((previous[both] <= sub[both]).all())
+            previous = sub
+
+    def test_rarefy_distribution(self):
+        a = np.array([[2, 0, 1], [50, 30, 20]])
+        draws = self.rarefy(a, [2, 10], iterations=2000)
+        self.assertEqual(set(tuple(sub[0]) for _, depth, sub in draws
+                             if depth == 2), {(1, 0, 1), (2, 0, 0)})
+        means = np.mean([sub[1] for _, depth, sub in draws if depth == 10],
+                        axis=0)
+        npt.assert_allclose(means, [5, 3, 2], rtol=0.1)
+
+    def test_rarefy_reproducible(self):
+        block_size = py_subsample._BLOCK_SIZE
+        try:
+            for py_subsample._BLOCK_SIZE in block_size, 3:
+                np.random.seed(0)
+                exp = self.rarefy(self.counts, [3, 9], iterations=4)
+                # the same draws are made by any number of threads
+                for n_jobs in 1, 3:
+                    np.random.seed(0)
+                    obs = self.rarefy(self.counts, [3, 9], iterations=4,
+                                      n_jobs=n_jobs)
+                    for (_, _, o), (_, _, e) in zip(obs, exp):
+                        npt.assert_equal(o, e)
+        finally:
+            py_subsample._BLOCK_SIZE = block_size
+
+    def test_rarefy_invalid_input(self):
+        with self.assertRaises(TypeError):
+            py_subsample.rarefy([[1, 2.5]], 1)
+        with self.assertRaises(ValueError):
+            py_subsample.rarefy([1, 2], 1)
+        with self.assertRaises(ValueError):
+            py_subsample.rarefy(csr_matrix([[1, -2]]), 1)
+        with self.assertRaises(ValueError):
+            py_subsample.rarefy([[1, 2]], [1, -1])
+
+
 if __name__ == '__main__':
     import nose
     nose.runmodule()
@@ -17,6 +17,8 @@ Classes
    :toctree: generated/
 
     TreeNode
+    TreeArray
+    LCAIndex
     CompressedTrie
 
 Phylogenetic Reconstruction
@@ -36,6 +38,15 @@ Utility Functions
     fasta_to_pairlist
     majority_rule
 
+Tree Comparison
+---------------
+
+.. autosummary::
+   :toctree: generated/
+
+    rf_dists
+    wrf_dists
+
 Exceptions
 ----------
 
@@ -249,14 +260,17 @@ Create a new trie with a list of sequences
 from skbio.util import TestRunner
 
 from ._tree import TreeNode
+from ._array import TreeArray, LCAIndex
 from ._trie import CompressedTrie, fasta_to_pairlist
 from ._nj import nj
 from ._majority_rule import majority_rule
+from ._compare import rf_dists, wrf_dists
 from ._exception import (TreeError, NoLengthError, DuplicateNodeError,
                          MissingNodeError, NoParentError)
 
-__all__ = ['TreeNode', 'CompressedTrie', 'fasta_to_pairlist', 'nj',
-           'majority_rule', 'TreeError', 'NoLengthError', 'DuplicateNodeError',
+__all__ = ['TreeNode', 'TreeArray', 'LCAIndex', 'CompressedTrie',
+           'fasta_to_pairlist', 'nj', 'majority_rule', 'rf_dists',
+           'wrf_dists', 'TreeError', 'NoLengthError', 'DuplicateNodeError',
            'MissingNodeError', 'NoParentError']
 
 test = TestRunner(__file__).test
@@ -0,0 +1,880 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from skbio._base import SkbioObject
+from ._tree import TreeNode
+from ._exception import NoLengthError, MissingNodeError, TreeError
+
+# number of matrix entries computed at a time by TreeArray.tip_distances
+_BLOCK_SIZE = 2 ** 20
+
+
+class TreeArray(SkbioObject):
+    r"""Immutable array representation of a tree
+
+    A `TreeArray` stores the topology of a tree as a parent index array, with
+    per-node branch lengths and names in parallel arrays. The children of each
+    node are available in compressed sparse row form, and preorder and
+    postorder traversals are precomputed as permutations of the node indices.
+    Bulk operations (tip counts, depths, subtree sums, distances) are computed
+    with vectorized passes over these arrays instead of walking linked
+    `TreeNode` objects.
+
+    Parameters
+    ----------
+    parent : 1-D array_like of int
+        Index of the parent of each node. The root is the only node whose
+        parent is ``-1``. Children of a node are ordered by their index.
+    length : 1-D array_like of float, optional
+        Branch length of each node to its parent, ``nan`` where a node has no
+        length. If not provided, no node has a length.
+    name : 1-D array_like, optional
+        Name of each node. If not provided, all names are ``None``.
+
+    Attributes
+    ----------
+    parent
+    length
+    name
+    child_ptr
+    child_index
+    preorder
+    postorder
+    root
+
+    Raises
+    ------
+    TreeError
+        If `parent` does not describe a single rooted tree, or if `length` or
+        `name` do not have one entry per node.
+
+    See Also
+    --------
+    TreeNode
+
+    Notes
+    -----
+    The children of node ``i`` are
+    ``child_index[child_ptr[i]:child_ptr[i + 1]]``, in the same layout as
+    the ``indptr`` and ``indices`` arrays of a ``scipy.sparse.csr_matrix``.
+
+    All arrays are read-only; a `TreeArray` cannot be modified after it is
+    created. Convert it to a `TreeNode` with `to_tree_node` to edit the tree.
+
+    A `TreeArray` can be read from a newick file with ``TreeArray.read``,
+    which does not create any `TreeNode` objects.
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import TreeArray
+    >>> tree = TreeNode.read(StringIO(u"((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+    >>> arr = TreeArray.from_tree_node(tree)
+    >>> arr.name
+    array(['a', 'b', 'd', 'e', 'c', 'f', 'root'], dtype=object)
+    >>> arr.parent
+    array([ 4,  4,  5,  5,  6,  6, -1])
+    >>> arr.count_tips()
+    array([1, 1, 1, 1, 2, 2, 4])
+    >>> arr.root_distances()
+    array([  4.,   5.,  10.,  11.,   3.,   6.,   0.])
+    >>> arr.distance(arr.find('a'), arr.find('e'))
+    15.0
+
+    """
+
+    def __init__(self, parent, length=None, name=None):
+        parent = np.asarray(parent)
+        if parent.ndim != 1 or not np.issubdtype(parent.dtype, np.integer):
+            raise TreeError("parent must be a 1-D array of integers.")
+        parent = parent.astype(np.intp)
+        n = len(parent)
+
+        roots = np.flatnonzero(parent == -1)
+        if len(roots) != 1:
+            raise TreeError("A tree must have exactly one root (a node whose "
+                            "parent is -1), found %d." % len(roots))
+        if ((parent < -1) | (parent >= n)).any():
+            raise TreeError("parent contains indices outside of the tree.")
+
+        if length is None:
+            length = np.full(n, np.nan)
+        else:
+            length = np.asarray(length, dtype=float)
+        if name is None:
+            name = np.full(n, None, dtype=object)
+        else:
+            name = np.asarray(name, dtype=object)
+        for attr, arr in ('length', length), ('name', name):
+            if arr.shape != (n,):
+                raise TreeError("%s must have one entry per node (%d), not "
+                                "shape %r." % (attr, n, arr.shape))
+
+        root = roots[0]
+        child_index = np.argsort(parent, kind='mergesort')[1:]
+        child_ptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(parent[child_index], minlength=n),
+                  out=child_ptr[1:])
+
+        preorder, postorder, depth = _traverse(root, child_ptr, child_index)
+        if len(preorder) != n:
+            raise TreeError("parent does not describe a tree: %d node(s) are "
+                            "not connected to the root." % (n - len(preorder)))
+
+        pre_pos = np.empty(n, dtype=np.intp)
+        pre_pos[preorder] = np.arange(n)
+        post_pos = np.empty(n, dtype=np.intp)
+        post_pos[postorder] = np.arange(n)
+
+        self._parent = parent
+        self._length = length
+        self._name = name
+        self._child_ptr = child_ptr
+        self._child_index = child_index
+        self._preorder = preorder
+        self._postorder = postorder
+        self._root = root
+        self._depth = depth
+        self._pre_pos = pre_pos
+        # in a depth-first traversal, a node's postorder position is its
+        # preorder position, less its ancestors, plus its descendants
+        self._size = post_pos - pre_pos + depth + 1
+        self._lca_index = None
+
+        for arr in (self._parent, self._length, self._name, self._child_ptr,
+                    self._child_index, self._preorder, self._postorder,
+                    self._depth, self._pre_pos, self._size):
+            arr.flags.writeable = False
+
+    @classmethod
+    def from_tree_node(cls, tree):
+        r"""Create a `TreeArray` from a `TreeNode`
+
+        Parameters
+        ----------
+        tree : TreeNode
+            The tree to convert. If `tree` is not a root, the subtree below
+            it is converted.
+
+        Returns
+        -------
+        TreeArray
+            Array representation of `tree`. Node ``i`` corresponds to the
+            node that `TreeNode.assign_ids` gives the id ``i``, so the root
+            is the last node and siblings have consecutive indices.
+
+        Notes
+        -----
+        `tree` is not modified; in particular, node ids are not assigned.
+
+        """
+        nodes = []
+        for node in tree.postorder():
+            nodes.extend(node.children)
+        nodes.append(tree)
+
+        index = {id(node): i for i, node in enumerate(nodes)}
+        parent = [index[id(node.parent)] for node in nodes[:-1]]
+        parent.append(-1)
+        length = [np.nan if node.length is None else node.length
+                  for node in nodes]
+        name = np.empty(len(nodes), dtype=object)
+        name[:] = [node.name for node in nodes]
+
+        return cls(parent, length, name)
+
+    def to_tree_node(self):
+        r"""Create a `TreeNode` from this `TreeArray`
+
+        Returns
+        -------
+        TreeNode
+            The root of a new tree with the same topology, names and branch
+            lengths. Lengths of ``nan`` become ``None``.
+
+        """
+        nodes = [TreeNode(name=name, length=None if length != length
+                          else length)
+                 for name, length in zip(self._name.tolist(),
+                                         self._length.tolist())]
+
+        child_ptr = self._child_ptr.tolist()
+        child_index = self._child_index.tolist()
+        for i, node in enumerate(nodes):
+            children = [nodes[c] for c in
+                        child_index[child_ptr[i]:child_ptr[i + 1]]]
+            for child in children:
+                child.parent = node
+            node.children = children
+
+        return nodes[self._root]
+
+    @property
+    def parent(self):
+        """Index of the parent of each node, ``-1`` for the root."""
+        return self._parent
+
+    @property
+    def length(self):
+        """Branch length of each node, ``nan`` where there is no length."""
+        return self._length
+
+    @property
+    def name(self):
+        """Name of each node."""
+        return self._name
+
+    @property
+    def child_ptr(self):
+        """Offsets of each node's children in `child_index`."""
+        return self._child_ptr
+
+    @property
+    def child_index(self):
+        """Indices of the children of all nodes, grouped by parent."""
+        return self._child_index
+
+    @property
+    def preorder(self):
+        """Node indices in preorder (each node before its descendants)."""
+        return self._preorder
+
+    @property
+    def postorder(self):
+        """Node indices in postorder (each node after its descendants)."""
+        return self._postorder
+
+    @property
+    def root(self):
+        """Index of the root node."""
+        return self._root
+
+    def __len__(self):
+        return len(self._parent)
+
+    def __str__(self):
+        return "TreeArray with %d nodes (%d tips)" % (len(self),
+                                                      len(self.tips()))
+
+    def children(self, node):
+        r"""Return the indices of the children of a node
+
+        Parameters
+        ----------
+        node : int
+            Index of the node.
+
+        Returns
+        -------
+        np.ndarray of int
+            Indices of the children of `node`, empty if `node` is a tip.
+
+        """
+        return self._child_index[self._child_ptr[node]:
+                                 self._child_ptr[node + 1]]
+
+    def is_tip(self):
+        r"""Return whether each node is a tip
+
+        Returns
+        -------
+        np.ndarray of bool
+            ``True`` for nodes without children.
+
+        """
+        return self._child_ptr[1:] == self._child_ptr[:-1]
+
+    def tips(self):
+        r"""Return the indices of the tips in postorder
+
+        Returns
+        -------
+        np.ndarray of int
+            Tip indices, in the order `TreeNode.tips` yields them.
+
+        """
+        postorder = self._postorder
+        return postorder[self.is_tip()[postorder]]
+
+    def find(self, name):
+        r"""Return the index of the first node with a given name
+
+        Parameters
+        ----------
+        name : str
+            The name to look up.
+
+        Returns
+        -------
+        int
+            Index of the node, preferring tips over internal nodes as
+            `TreeNode.find` does.
+
+        Raises
+        ------
+        MissingNodeError
+            If no node has the name `name`.
+
+        """
+        matches = np.flatnonzero(self._name == name)
+        if not len(matches):
+            raise MissingNodeError("Node %s is not in self" % name)
+        tips = matches[self.is_tip()[matches]]
+        return (tips if len(tips) else matches)[0]
+
+    def subtree_sum(self, values):
+        r"""Sum per-node values over the subtree of every node
+
+        Parameters
+        ----------
+        values : array_like
+            One value per node, or, for arrays of more than one dimension,
+            one row of values per node.
+
+        Returns
+        -------
+        np.ndarray
+            For each node, the sum of `values` over that node and all of its
+            descendants, with the same shape as `values`.
+
+        Notes
+        -----
+        In preorder, the subtree of a node is a contiguous run of nodes, so
+        all subtree sums are differences of a single cumulative sum.
+
+        """
+        values = np.asarray(values)
+        if values.ndim < 1 or values.shape[0] != len(self):
+            raise ValueError("values must have one entry per node (%d), not "
+                             "shape %r." % (len(self), values.shape))
+        csum = np.zeros((len(self) + 1,) + values.shape[1:],
+                        dtype=np.result_type(values, np.intp))
+        np.cumsum(values[self._preorder], axis=0, out=csum[1:])
+        start = self._pre_pos
+        return csum[start + self._size] - csum[start]
+
+    def count_tips(self):
+        r"""Count the tips descending from every node
+
+        Returns
+        -------
+        np.ndarray of int
+            For each node, the number of tips in its subtree; ``1`` for
+            tips.
+
+        """
+        return self.subtree_sum(self.is_tip().astype(np.intp))
+
+    def subtree_size(self):
+        r"""Count the nodes in the subtree of every node
+
+        Returns
+        -------
+        np.ndarray of int
+            For each node, the number of nodes in its subtree, including
+            itself.
+
+        """
+        return self._size
+
+    def depths(self):
+        r"""Return the number of edges between every node and the root
+
+        Returns
+        -------
+        np.ndarray of int
+            Depth of each node; the root has depth ``0``.
+
+        """
+        return self._depth
+
+    def root_distances(self):
+        r"""Return the distance from every node to the root
+
+        Returns
+        -------
+        np.ndarray of float
+            Sum of the branch lengths on the path from each node to the
+            root. The length of the root itself is ignored.
+
+        Raises
+        ------
+        NoLengthError
+            If a node other than the root has no length.
+
+        Notes
+        -----
+        Distances are accumulated by pointer jumping: each pass adds the
+        distance already summed by a node's current ancestor and then skips
+        to that ancestor's ancestor, so ``log2(height)`` vectorized passes
+        are needed.
+
+        """
+        length = self._nonroot_lengths()
+        return _accumulate_to_root(self._parent, length)
+
+    def lca_index(self):
+        r"""Return an index answering LCA and distance queries on this tree
+
+        Returns
+        -------
+        LCAIndex
+            The index is built on the first call and reused afterwards.
+
+        """
+        if self._lca_index is None:
+            self._lca_index = LCAIndex(self)
+        return self._lca_index
+
+    def distance(self, a, b):
+        r"""Return the path length between pairs of nodes
+
+        Parameters
+        ----------
+        a, b : int or array_like of int
+            Node indices. Broadcast against each other.
+
+        Returns
+        -------
+        float or np.ndarray of float
+            Sum of the branch lengths on the path between each pair of
+            nodes.
+
+        Raises
+        ------
+        NoLengthError
+            If a node other than the root has no length.
+
+        See Also
+        --------
+        LCAIndex.distance
+
+        """
+        return self.lca_index().distance(a, b)
+
+    def lowest_common_ancestor(self, a, b):
+        r"""Return the lowest common ancestor of pairs of nodes
+
+        Parameters
+        ----------
+        a, b : int or array_like of int
+            Node indices. Broadcast against each other.
+
+        Returns
+        -------
+        int or np.ndarray of int
+            Index of the deepest node that is an ancestor of (or equal to)
+            both nodes of each pair.
+
+        See Also
+        --------
+        LCAIndex.lowest_common_ancestor
+
+        """
+        return self.lca_index().lowest_common_ancestor(a, b)
+
+    def tip_distances(self, tips=None, condensed=False, dtype=np.float64,
+                      out=None, n_jobs=1):
+        r"""Return the path lengths between all pairs of tips
+
+        Parameters
+        ----------
+        tips : 1-D array_like of int, optional
+            Indices of the tips to compute distances between, in the order
+            of the rows of the result. Defaults to all tips in postorder, as
+            returned by `tips`.
+        condensed : bool, optional
+            If ``True``, return only the upper triangle of the matrix, in the
+            condensed form used by ``scipy.spatial.distance``.
+        dtype : np.dtype, optional
+            Floating point type of the result. Distances are computed in
+            double precision and rounded when stored.
+        out : np.ndarray, optional
+            Array to store the result in, for example a ``np.memmap`` to
+            write a matrix larger than memory to disk. It must have the shape
+            of the result; its dtype takes precedence over `dtype`.
+        n_jobs : int, optional
+            Number of threads computing blocks of rows in parallel.
+
+        Returns
+        -------
+        np.ndarray
+            A ``(k, k)`` array, or a ``(k * (k - 1) // 2,)`` array if
+            `condensed`, where ``k`` is the number of tips.
+
+        Raises
+        ------
+        ValueError
+            If any of `tips` is not a tip, or if `out` has the wrong shape.
+        NoLengthError
+            If a node other than the root has no length.
+
+        See Also
+        --------
+        LCAIndex
+        TreeNode.tip_tip_distances
+
+        Notes
+        -----
+        The distance between two tips is the sum of their distances to the
+        root, less twice the distance of their lowest common ancestor to the
+        root. It is computed for a block of rows at a time with an `LCAIndex`,
+        so memory use beyond the result is bounded regardless of the number
+        of tips.
+
+        """
+        if tips is None:
+            tips = self.tips()
+        else:
+            tips = np.asarray(tips, dtype=np.intp)
+            not_tip = ~self.is_tip()[tips]
+            if not_tip.any():
+                raise ValueError("Node with name '%s' is not a tip." %
+                                 self._name[tips[not_tip][0]])
+
+        k = len(tips)
+        shape = (k * (k - 1) // 2,) if condensed else (k, k)
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape:
+            raise ValueError("out must have shape %r, not %r." %
+                             (shape, out.shape))
+
+        index = self.lca_index()
+        dist = index._distances()
+        # distance to the root of the parent of the node of each rank
+        lca_dist = np.append(dist[index._lca_by_rank[:-1]], 0)
+
+        # compute on the distinct tips in preorder, where the LCA of a run
+        # of tips is the shallowest LCA of two consecutive tips in the run
+        positions, inverse = np.unique(self._pre_pos[tips],
+                                       return_inverse=True)
+        ordered = len(positions) == k and (inverse == np.arange(k)).all()
+        tip_dist = dist[self._preorder[positions]]
+        gaps = index._min_rank(positions[:-1], positions[1:])
+        no_rank = len(self)
+        before = np.append(gaps, no_rank)
+        after = np.append(no_rank, gaps)
+        columns = np.arange(len(positions))
+
+        # with tips in preorder, only the upper triangle of a square result
+        # is computed, and then mirrored
+        mirror = ordered and not condensed
+
+        def fill(rows):
+            start, stop = rows
+            r = inverse[start:stop, None]
+            if ordered:
+                cols = columns[start + 1:]
+                ranks = np.where(cols > r, after[start + 1:], no_rank)
+                np.minimum.accumulate(ranks, axis=1, out=ranks)
+            else:
+                cols = columns
+                # ranks to the right of each row's tip accumulate forwards,
+                # ranks to the left accumulate backwards
+                ranks = np.where(cols > r, after, no_rank)
+                np.minimum.accumulate(ranks, axis=1, out=ranks)
+                left = np.where(cols < r, before, no_rank)[:, ::-1]
+                np.minimum.accumulate(left, axis=1, out=left)
+                np.minimum(ranks, left[:, ::-1], out=ranks)
+
+            # the tip distances are added first, as addition commutes
+            # exactly, so that the distances of (u, v) and (v, u) round alike
+            block = tip_dist[r] + tip_dist[cols]
+            block -= 2 * lca_dist[ranks]
+            block[cols == r] = 0
+
+            if not ordered:
+                block = block[:, inverse]
+            if mirror:
+                out[start:stop, start + 1:] = block
+            elif condensed:
+                first = start + 1 if ordered else 0
+                upper = (np.arange(first, k) >
+                         np.arange(start, stop)[:, None])
+                out[_row_offset(start, k):_row_offset(stop, k)] = block[upper]
+            else:
+                out[start:stop] = block
+
+        def fill_lower(rows):
+            start, stop = rows
+            # transpose square tiles, which is much faster than transposing
+            # a whole strip of the matrix at once
+            for tile in range(0, start, stop - start):
+                end = min(tile + stop - start, start)
+                out[start:stop, tile:end] = out[tile:end, start:stop].T
+            square = out[start:stop, start:stop]
+            lower = np.tril_indices(stop - start, -1)
+            square[lower] = square.T[lower]
+            square[np.diag_indices(stop - start)] = 0
+
+        step = max(1, _BLOCK_SIZE // max(k, 1))
+        blocks = [(start, min(start + step, k)) for start in range(0, k, step)]
+        passes = [fill, fill_lower] if mirror else [fill]
+        if n_jobs == 1 or len(blocks) == 1:
+            for func in passes:
+                for rows in blocks:
+                    func(rows)
+        else:
+            pool = ThreadPool(n_jobs)
+            try:
+                for func in passes:
+                    pool.map(func, blocks)
+            finally:
+                pool.close()
+        return out
+
+    def _nonroot_lengths(self):
+        length = self._length.copy()
+        length[self._root] = 0.0
+        missing = np.isnan(length)
+        if missing.any():
+            raise NoLengthError("Node %s has no length." %
+                                self._name[np.flatnonzero(missing)[0]])
+        return length
+
+
+class LCAIndex(SkbioObject):
+    r"""Constant-time lowest common ancestor and distance queries on a tree
+
+    The index is built once per tree in ``O(n log n)`` time and memory, after
+    which each lowest common ancestor (LCA) or node-to-node distance query
+    takes constant time. Queries are answered for whole arrays of node pairs
+    at once.
+
+    Parameters
+    ----------
+    tree : TreeArray or TreeNode
+        The tree to index. A `TreeNode` is converted with
+        `TreeArray.from_tree_node` after calling `TreeNode.assign_ids` on it,
+        so that node ``id`` attributes can be used in queries.
+
+    See Also
+    --------
+    TreeArray.lca_index
+    TreeNode.lowest_common_ancestor
+    TreeNode.distance
+
+    Notes
+    -----
+    This is the reduction of LCA to range minimum queries (RMQ) of [1]_,
+    applied to the preorder of the tree rather than its Euler tour, which
+    halves the size of the table. For nodes ``u != v`` with ``u`` earlier in
+    preorder, every shallowest node strictly after ``u`` and up to ``v`` in
+    preorder is a child of their LCA. Nodes are ranked by depth, and a sparse
+    table stores the minimum rank over every run of ``2 ** k`` preorder
+    positions, so the minimum over any range is the smaller of two
+    overlapping table entries, and the LCA is the parent of the node with
+    that rank.
+
+    Distances are ``d(u) + d(v) - 2 * d(lca(u, v))``, where ``d`` is the
+    distance from a node to the root.
+
+    References
+    ----------
+    .. [1] Bender, M. A., & Farach-Colton, M. (2000). The LCA problem
+       revisited. In LATIN 2000: Theoretical Informatics (pp. 88-94).
+       Springer Berlin Heidelberg.
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import LCAIndex
+    >>> tree = TreeNode.read(StringIO(u"((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+    >>> index = LCAIndex(tree)
+    >>> a, b, e = tree.find('a').id, tree.find('b').id, tree.find('e').id
+    >>> index.lowest_common_ancestor([a, a], [b, e]) == [tree.find('c').id,
+    ...                                                  tree.id]
+    array([ True,  True], dtype=bool)
+    >>> index.distance([a, a], [b, e])
+    array([  3.,  15.])
+
+    """
+
+    def __init__(self, tree):
+        if isinstance(tree, TreeNode):
+            tree.assign_ids()
+            tree = TreeArray.from_tree_node(tree)
+        self._tree = tree
+        self._root_distances = None
+
+        n = len(tree)
+        preorder = tree.preorder
+        self._pre_pos = tree._pre_pos
+
+        # the root has the lowest rank and is never inside a query range, so
+        # its preorder position (0) and a padding column after the last
+        # position hold a rank above all others
+        by_rank = np.argsort(tree.depths(), kind='mergesort')
+        dtype = np.int32 if n < 2 ** 31 else np.int64
+        rank = np.empty(n, dtype=dtype)
+        rank[by_rank] = np.arange(n)
+        self._lca_by_rank = np.append(tree.parent[by_rank], -1)
+
+        levels = max(1, n.bit_length())
+        table = np.empty((levels, n + 1), dtype=dtype)
+        table[0, :n] = rank[preorder]
+        table[0, 0] = table[0, n] = n
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            np.minimum(table[k - 1, :n + 1 - half], table[k - 1, half:],
+                       out=table[k, :n + 1 - half])
+            table[k, n + 1 - half:] = table[k - 1, n + 1 - half:]
+        self._table = table.ravel()
+        self._stride = n + 1
+
+        # floor(log2(span)) for every possible query range length
+        log2 = np.zeros(n + 1, dtype=np.intp)
+        for k in range(1, levels):
+            log2[1 << k:] += 1
+        self._log2 = log2
+        self._n = n
+
+    def __str__(self):
+        return "LCAIndex over a tree with %d nodes" % self._n
+
+    @property
+    def tree(self):
+        """The indexed `TreeArray`."""
+        return self._tree
+
+    def lowest_common_ancestor(self, a, b):
+        r"""Return the lowest common ancestor of pairs of nodes
+
+        Parameters
+        ----------
+        a, b : int or array_like of int
+            Node indices (or `TreeNode` ids). Broadcast against each other.
+
+        Returns
+        -------
+        int or np.ndarray of int
+            Index of the deepest node that is an ancestor of (or equal to)
+            both nodes of each pair.
+
+        """
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=np.intp),
+                                   np.asarray(b, dtype=np.intp))
+        shape = a.shape
+        a, b = a.ravel(), b.ravel()
+
+        result = self._lca_by_rank[self._min_rank(self._pre_pos[a],
+                                                  self._pre_pos[b])]
+        same = a == b
+        result[same] = a[same]
+
+        return result[0] if shape == () else result.reshape(shape)
+
+    def _min_rank(self, pa, pb):
+        """Lowest depth rank strictly after pa and up to pb in preorder
+
+        Pairs of equal positions give an arbitrary rank.
+        """
+        lo = np.minimum(pa, pb)
+        hi = np.maximum(pa, pb)
+        lo += 1
+        hi += 1
+        k = self._log2[hi - lo]
+        offset = k * self._stride
+        hi -= 1 << k
+        lo += offset
+        hi += offset
+        return np.minimum(self._table[lo], self._table[hi])
+
+    def distance(self, a, b):
+        r"""Return the path length between pairs of nodes
+
+        Parameters
+        ----------
+        a, b : int or array_like of int
+            Node indices (or `TreeNode` ids). Broadcast against each other.
+
+        Returns
+        -------
+        float or np.ndarray of float
+            Sum of the branch lengths on the path between each pair of
+            nodes.
+
+        Raises
+        ------
+        NoLengthError
+            If a node other than the root has no length.
+
+        """
+        dist = self._distances()
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=np.intp),
+                                   np.asarray(b, dtype=np.intp))
+        lca = self.lowest_common_ancestor(a, b)
+        result = dist[a] + dist[b] - 2 * dist[lca]
+        return result[()] if result.ndim == 0 else result
+
+    def _distances(self):
+        if self._root_distances is None:
+            self._root_distances = self._tree.root_distances()
+        return self._root_distances
+
+
+def _row_offset(row, n):
+    """Position of the first entry of a row in a condensed matrix"""
+    return row * n - row * (row + 1) // 2
+
+
+def _traverse(root, child_ptr, child_index):
+    """Return preorder, postorder and depths of the nodes below root"""
+    child_ptr = child_ptr.tolist()
+    child_index = child_index.tolist()
+    n = len(child_ptr) - 1
+    depth = [0] * n
+
+    preorder = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        preorder.append(node)
+        children = child_index[child_ptr[node]:child_ptr[node + 1]]
+        node_depth = depth[node] + 1
+        for child in children:
+            depth[child] = node_depth
+        stack.extend(reversed(children))
+
+    # a preorder that visits children right to left is the reverse of a
+    # postorder that visits them left to right
+    reverse_postorder = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        reverse_postorder.append(node)
+        stack.extend(child_index[child_ptr[node]:child_ptr[node + 1]])
+
+    return (np.array(preorder, dtype=np.intp),
+            np.array(reverse_postorder[::-1], dtype=np.intp),
+            np.array(depth, dtype=np.intp))
+
+
+def _accumulate_to_root(parent, values):
+    """Sum values over the path from every node to the root by doubling"""
+    n = len(parent)
+    # a sentinel node n is its own ancestor and contributes nothing
+    anc = np.append(parent, n)
+    anc[anc == -1] = n
+    total = np.append(values, 0)
+    active = np.flatnonzero(anc[:n] != n)
+    while len(active):
+        step = anc[active]
+        total[active] += total[step]
+        anc[active] = anc[step]
+        active = active[anc[active] != n]
+    return total[:n]
@@ -0,0 +1,301 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from skbio.stats.distance import DistanceMatrix
+from ._exception import NoLengthError
+from ._majority_rule import (_tip_index, _tree_clades, _reduce_clades,
+                             _clade_sizes)
+
+# the arguments of _encode_tree shared by the worker processes
+_worker_args = None
+
+
+def _init_worker(*args):
+    """Store the arguments shared by the chunks encoded in a worker"""
+    global _worker_args
+    _worker_args = args
+
+
+def _encode_chunk(bounds):
+    """Encode a chunk of the trees given to the worker"""
+    start, stop = bounds
+    trees, tip_index, n_words, rooted, weighted = _worker_args
+    return [_encode_tree(tree, tip_index, n_words, rooted, weighted)
+            for tree in trees[start:stop]]
+
+
+def _encode_tree(tree, tip_index, n_words, rooted, weighted):
+    """Compute the distinct clades (or splits) of a tree as bitsets
+
+    Returns
+    -------
+    np.array of np.uint64
+        The clades of the non-root nodes of `tree`, one per row. If `rooted`
+        is ``False``, each clade is replaced by the side of its split that
+        does not contain the first tip. Clades of single tips and splits
+        separating single tips are only kept if `weighted` is ``True``.
+    np.array of float
+        The total length of the branches leading to each clade.
+
+    """
+    n_tips = len(tip_index)
+    clades, lengths = _tree_clades(tree, tip_index, n_words)
+    if _clade_sizes(clades[-1:])[0] != n_tips:
+        raise ValueError("All trees must have the same tips.")
+    clades, lengths = clades[:-1], lengths[:-1]
+
+    if not rooted:
+        full = np.zeros(n_words, dtype=np.uint64)
+        full[:] = np.iinfo(np.uint64).max
+        if n_tips % 64:
+            full[-1] = np.uint64(2 ** (n_tips % 64) - 1)
+        flip = (clades[:, 0] & np.uint64(1)).astype(bool)
+        clades[flip] = ~clades[flip] & full
+
+    sizes = _clade_sizes(clades)
+    if weighted:
+        keep = sizes > 0
+        if np.isnan(lengths[keep]).any():
+            raise NoLengthError("All non-root nodes must have a length.")
+    elif rooted:
+        keep = sizes > 1
+    else:
+        keep = (sizes > 1) & (sizes < n_tips - 1)
+
+    clades, _, lengths = _reduce_clades(clades[keep], np.ones(keep.sum()),
+                                        lengths[keep])
+    return clades, lengths
+
+
+def _encode_trees(trees, rooted, weighted, n_jobs):
+    """Encode all of the trees as a sparse tree-by-clade matrix"""
+    trees = list(trees)
+    tip_index = _tip_index(trees)
+    n_words = max(1, (len(tip_index) + 63) // 64)
+
+    n_jobs = max(1, min(n_jobs, len(trees)))
+    if n_jobs == 1:
+        encoded = [_encode_tree(tree, tip_index, n_words, rooted, weighted)
+                   for tree in trees]
+    else:
+        # as in majority_rule, the trees are handed to the workers as they
+        # start, and each one encodes a chunk
+        bounds = np.linspace(0, len(trees), n_jobs + 1).astype(int)
+        pool = Pool(n_jobs, initializer=_init_worker,
+                    initargs=(trees, tip_index, n_words, rooted, weighted))
+        try:
+            chunks = pool.map(_encode_chunk,
+                              list(zip(bounds[:-1], bounds[1:])))
+        finally:
+            pool.close()
+        encoded = [item for chunk in chunks for item in chunk]
+
+    rows = np.repeat(np.arange(len(trees)),
+                     [len(clades) for clades, _ in encoded])
+    clades = np.concatenate([np.empty((0, n_words), dtype=np.uint64)] +
+                            [clades for clades, _ in encoded])
+    lengths = np.concatenate([np.empty(0)] +
+                             [lengths for _, lengths in encoded])
+
+    # number the distinct clades of all of the trees
+    keys = clades.view(np.dtype((np.void, 8 * n_words))).ravel()
+    _, columns = np.unique(keys, return_inverse=True)
+    n_clades = columns.max() + 1 if len(columns) else 0
+    return csr_matrix((lengths, (rows, columns.ravel())),
+                      shape=(len(trees), n_clades))
+
+
+def rf_dists(trees, ids=None, proportion=False, rooted=True, n_jobs=1):
+    r"""Compute the Robinson-Foulds distances between all pairs of trees
+
+    Parameters
+    ----------
+    trees : list of TreeNode
+        The trees to compare. All trees must have the same tip names, which
+        must be unique within each tree.
+    ids : list of str, optional
+        IDs of the trees in the resulting distance matrix. If omitted, the
+        trees are numbered from ``'0'``.
+    proportion : bool, optional
+        Divide each distance by the total number of clades (or splits) of
+        both trees.
+    rooted : bool, optional
+        If ``True``, compare the trees' clades as `TreeNode.compare_rfd`
+        does: the sets of tips descending from each non-root node, ignoring
+        single tips. If ``False``, compare the bipartitions of the tips
+        induced by the trees' branches, ignoring those separating single
+        tips, which treats the trees as unrooted.
+    n_jobs : int, optional
+        Number of worker processes encoding the trees.
+
+    Returns
+    -------
+    DistanceMatrix
+        The number of clades (or splits) found in only one of each pair of
+        trees.
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips.
+
+    See Also
+    --------
+    wrf_dists
+    TreeNode.compare_rfd
+
+    Notes
+    -----
+    Each tree is encoded once, representing each of its clades as a bitset of
+    the tips in it, stored in 64-bit words. The distinct clades of all of the
+    trees are numbered, and the number of clades shared by every pair of trees
+    is computed at once as a product of the sparse tree-by-clade incidence
+    matrix with its transpose. The Robinson-Foulds distance is described in
+    [1]_.
+
+    References
+    ----------
+    .. [1] Comparison of phylogenetic trees. Robinson and Foulds.
+       Mathematical Biosciences. 1981. 53:131-141
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import rf_dists
+    >>> trees = [TreeNode.read(StringIO(u"((a,b),(c,d));")),
+    ...          TreeNode.read(StringIO(u"(((a,b),c),d);")),
+    ...          TreeNode.read(StringIO(u"(((a,c),b),d);"))]
+    >>> dm = rf_dists(trees, ids=['t1', 't2', 't3'])
+    >>> print(dm.data)
+    [[ 0.  2.  4.]
+     [ 2.  0.  2.]
+     [ 4.  2.  0.]]
+
+    The trees have the same split of the tips if they are unrooted:
+
+    >>> print(rf_dists(trees, rooted=False).data)
+    [[ 0.  0.  2.]
+     [ 0.  0.  2.]
+     [ 2.  2.  0.]]
+
+    """
+    incidence = _encode_trees(trees, rooted, False, n_jobs)
+    incidence.data[:] = 1
+
+    shared = (incidence * incidence.T).toarray()
+    counts = np.diag(shared).astype(float)
+    totals = counts[:, None] + counts
+    dists = totals - 2 * shared
+
+    if proportion:
+        with np.errstate(invalid='ignore'):
+            dists = np.where(totals > 0, dists / totals, 0.0)
+
+    return DistanceMatrix(dists, ids)
+
+
+def wrf_dists(trees, ids=None, rooted=True, n_jobs=1):
+    r"""Compute the weighted Robinson-Foulds distances between pairs of trees
+
+    Parameters
+    ----------
+    trees : list of TreeNode
+        The trees to compare. All trees must have the same tip names, which
+        must be unique within each tree, and all non-root nodes must have a
+        length.
+    ids : list of str, optional
+        IDs of the trees in the resulting distance matrix. If omitted, the
+        trees are numbered from ``'0'``.
+    rooted : bool, optional
+        If ``True``, compare the lengths of the branches leading to each
+        clade. If ``False``, compare the lengths of the branches inducing each
+        bipartition of the tips, which treats the trees as unrooted (the two
+        branches below the root induce the same bipartition).
+    n_jobs : int, optional
+        Number of worker processes encoding the trees, and of threads
+        computing rows of the distance matrix.
+
+    Returns
+    -------
+    DistanceMatrix
+        The sum over all clades (or splits) of the absolute difference
+        between their branch lengths in each pair of trees, a branch length
+        being zero in trees where the clade is absent. Tip branches are
+        included.
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips.
+    NoLengthError
+        If a non-root node does not have a length.
+
+    See Also
+    --------
+    rf_dists
+
+    Notes
+    -----
+    The weighted Robinson-Foulds distance is described in [1]_.
+
+    References
+    ----------
+    .. [1] Robinson, D. F., and Foulds, L. R. (1979) Comparison of weighted
+       labelled trees. In Combinatorial Mathematics VI, pp. 119-126.
+
+    Examples
+    --------
+    >>> from six import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import wrf_dists
+    >>> trees = [TreeNode.read(StringIO(u"((a:1,b:2):1,c:1);")),
+    ...          TreeNode.read(StringIO(u"((a:1,b:2):3,c:1);")),
+    ...          TreeNode.read(StringIO(u"((a:1,c:1):1,b:2);"))]
+    >>> print(wrf_dists(trees).data)
+    [[ 0.  2.  2.]
+     [ 2.  0.  4.]
+     [ 2.  4.  0.]]
+
+    """
+    by_tree = _encode_trees(trees, rooted, True, n_jobs)
+    by_clade = by_tree.tocsc()
+    n_trees = by_tree.shape[0]
+    totals = np.asarray(abs(by_tree).sum(axis=1)).ravel()
+    dists = np.zeros((n_trees, n_trees))
+
+    def fill_row(row):
+        # only the clades of the tree in row change the distance from the
+        # total length of each other tree
+        start, stop = by_tree.indptr[row:row + 2]
+        clades = by_tree.indices[start:stop]
+        values = by_tree.data[start:stop]
+        others = by_clade[row + 1:, clades].toarray()
+        dists[row, row + 1:] = (totals[row + 1:] - abs(others).sum(axis=1) +
+                                abs(others - values).sum(axis=1))
+
+    if n_jobs == 1 or n_trees < 2:
+        for row in range(n_trees):
+            fill_row(row)
+    else:
+        pool = ThreadPool(n_jobs)
+        try:
+            pool.map(fill_row, range(n_trees))
+        finally:
+            pool.close()
+
+    dists += dists.T
+    return DistanceMatrix(dists, ids)
@@ -8,15 +8,133 @@
 
 from __future__ import absolute_import, division, print_function
 
-from collections import defaultdict
+from multiprocessing import Pool
 from future.builtins import zip
 
 import numpy as np
 
 from skbio.tree import TreeNode
 
+# number of clade rows gathered from trees before they are reduced to counts
+_BATCH_ROWS = 2 ** 16
 
-def _walk_clades(trees, weights):
+# number of bits set in each byte value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.intp)
+
+
+def _tip_index(trees):
+    """Assign an integer index to each tip name, in order of appearance"""
+    tip_index = {}
+    for tree in trees:
+        for tip in tree.tips(include_self=True):
+            tip_index.setdefault(tip.name, len(tip_index))
+    return tip_index
+
+
+def _tree_clades(tree, tip_index, n_words):
+    """Compute the clade of each node of a tree as a bitset
+
+    Returns
+    -------
+    np.array of np.uint64
+        Row ``i`` holds the bits, in `n_words` words, of the indices of the
+        tips descending from the ``i``-th node of ``tree.postorder()``.
+    np.array of float
+        The length of each node, ``nan`` where there is no length.
+
+    """
+    # tips are visited in the same order by postorder and preorder, so the
+    # tips below each node are a contiguous run of the visited tips
+    tips = []
+    starts = []
+    ends = []
+    lengths = []
+    stack = []
+    for node in tree.postorder():
+        n_children = len(node.children)
+        if n_children:
+            start = stack[-n_children]
+            del stack[-n_children:]
+        else:
+            start = len(tips)
+            tips.append(tip_index[node.name])
+        stack.append(start)
+        starts.append(start)
+        ends.append(len(tips))
+        lengths.append(np.nan if node.length is None else node.length)
+
+    tips = np.asarray(tips)
+    if len(np.unique(tips)) != len(tips):
+        raise ValueError("Tip names must be unique within each tree.")
+
+    # as the runs of tips are disjoint, the clade of a node is the xor of two
+    # prefixes of the tip bits
+    prefix = np.zeros((len(tips) + 1, n_words), dtype=np.uint64)
+    prefix[np.arange(1, len(tips) + 1), tips >> 6] = \
+        np.left_shift(np.uint64(1), (tips & 63).astype(np.uint64))
+    np.bitwise_xor.accumulate(prefix, axis=0, out=prefix)
+    clades = prefix[ends] ^ prefix[starts]
+
+    return clades, np.asarray(lengths, dtype=float)
+
+
+def _reduce_clades(clades, counts, lengths):
+    """Sum the counts and lengths of identical clades"""
+    n_words = clades.shape[1]
+    keys = np.ascontiguousarray(clades).view(
+        np.dtype((np.void, 8 * n_words))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True,
+                                  return_inverse=True)
+    return (clades[first],
+            np.bincount(inverse, weights=counts, minlength=len(first)),
+            np.bincount(inverse, weights=lengths, minlength=len(first)))
+
+
+# the arguments of _count_clades shared by the worker processes
+_worker_args = None
+
+
+def _init_worker(*args):
+    """Store the arguments shared by the chunks counted in a worker"""
+    global _worker_args
+    _worker_args = args
+
+
+def _count_chunk(bounds):
+    """Count the clades of a chunk of the trees given to the worker"""
+    start, stop = bounds
+    trees, weights, total, tip_index, n_words = _worker_args
+    return _count_clades(trees[start:stop], weights[start:stop], total,
+                         tip_index, n_words)
+
+
+def _count_clades(trees, weights, total, tip_index, n_words):
+    """Count the weighted clades of trees, as reduced bitsets"""
+    result = (np.empty((0, n_words), dtype=np.uint64), np.empty(0),
+              np.empty(0))
+    pending = []
+    n_pending = 0
+    for tree, weight in zip(trees, weights):
+        clades, lengths = _tree_clades(tree, tip_index, n_words)
+        pending.append((clades, np.repeat(weight, len(clades)),
+                        lengths * weight / total))
+        n_pending += len(clades)
+
+        # reduce once the pending rows outnumber the clades seen so far, so
+        # that each row is only sorted a few times
+        if n_pending >= max(_BATCH_ROWS, len(result[0])):
+            result = _reduce_clades(*[np.concatenate(parts) for parts in
+                                      zip(result, *pending)])
+            pending = []
+            n_pending = 0
+
+    if pending:
+        result = _reduce_clades(*[np.concatenate(parts) for parts in
+                                  zip(result, *pending)])
+    return result
+
+
+def _walk_clades(trees, weights, n_jobs=1):
     """Walk all the clades of all the trees
 
     Parameters
@@ -25,159 +143,181 @@ def _walk_clades(trees, weights):
         The trees to walk
     weights : np.array
         Tree weights
+    n_jobs : int, optional
+        Number of worker processes counting the clades of chunks of `trees`.
 
     Returns
     -------
-    list of tuple
-        The clades and support values sorted by support value such that the
-        most supported clade is index 0. The tuples are of the form:
-        (frozenset, float).
-    defaultdict(float)
-        The edge lengths, keyed by frozenset of the clade, and valued by the
-        weighted average length of the clade by the trees the clade was
-        observed in.
+    list
+        The tip names, in the order of their bits in the clades.
+    np.array of np.uint64
+        The clades observed, one per row, as bitsets of the tips in them. The
+        clades are sorted by decreasing number of tips.
+    np.array of float
+        The support of each clade, the sum of the weights of the trees in
+        which the clade was observed.
+    np.array of float
+        The weighted average length of each clade over all of the trees,
+        ``nan`` if the clade had no length in any of the trees it was observed
+        in.
 
     """
-    clade_counts = defaultdict(float)
-    edge_lengths = defaultdict(float)
+    tip_index = _tip_index(trees)
+    n_words = max(1, (len(tip_index) + 63) // 64)
     total = weights.sum()
 
-    # get clade counts
-    def tipnames_f(n):
-        return [n.name] if n.is_tip() else []
-
-    for tree, weight in zip(trees, weights):
-        tree.cache_attr(tipnames_f, 'tip_names', frozenset)
-
-        for node in tree.postorder():
-            tip_names = node.tip_names
-
-            # if node.length is not None, fetch it and weight it
-            length = node.length * weight if node.length is not None else None
-
-            clade_counts[tip_names] += weight
-
-            if length is None:
-                edge_lengths[tip_names] = None
-            else:
-                edge_lengths[tip_names] += length / total
-
-    # sort clades by number times observed
-    clade_counts = sorted(clade_counts.items(), key=lambda x: len(x[0]),
-                          reverse=True)
-
-    return clade_counts, edge_lengths
-
-
-def _filter_clades(clade_counts, cutoff_threshold):
+    n_jobs = max(1, min(n_jobs, len(trees)))
+    if n_jobs == 1:
+        clades, support, lengths = _count_clades(trees, weights, total,
+                                                 tip_index, n_words)
+    else:
+        # the trees are handed to the workers as they start (without being
+        # pickled where processes are forked), and each one counts a chunk
+        bounds = np.linspace(0, len(trees), n_jobs + 1).astype(int)
+        pool = Pool(n_jobs, initializer=_init_worker,
+                    initargs=(list(trees), weights, total, tip_index,
+                              n_words))
+        try:
+            parts = pool.map(_count_chunk, list(zip(bounds[:-1], bounds[1:])))
+        finally:
+            pool.close()
+        clades, support, lengths = _reduce_clades(
+            *[np.concatenate(part) for part in zip(*parts)])
+
+    order = np.argsort(-_clade_sizes(clades), kind='mergesort')
+    tip_names = sorted(tip_index, key=tip_index.get)
+    return tip_names, clades[order], support[order], lengths[order]
+
+
+def _clade_sizes(clades):
+    """Count the tips in each clade"""
+    bytes_per_clade = clades.dtype.itemsize * clades.shape[1]
+    return _POPCOUNT[clades.view(np.uint8)].reshape(
+        len(clades), bytes_per_clade).sum(1)
+
+
+def _filter_clades(clades, support, cutoff_threshold, total):
     """Filter clades that not well supported or are contradicted
 
     Parameters
     ----------
-    clade_counts : list of tuple
-        Where the first element in each tuple is the frozenset of the clade,
-        and the second element is the support value. It is expected that this
-        list is sorted by descending order by support.
+    clades : np.array of np.uint64
+        The clades as bitsets, one per row, in the order in which they are
+        considered.
+    support : np.array of float
+        The support of each clade.
     cutoff_threshold : float
         The minimum weighted observation count that a clade must have to be
         considered supported.
+    total : float
+        The total weight of the trees the clades were observed in.
 
     Returns
     -------
-    dict
-        A dict of the accepted clades, keyed by the frozenset of the clade and
-        valued by the support value.
+    np.array of int
+        The indices of the accepted clades.
+
     """
-    accepted_clades = {}
+    supported = np.flatnonzero(support > cutoff_threshold)
 
-    for clade, count in clade_counts:
-        conflict = False
+    # clades observed in more than half of the (weighted) trees are observed
+    # together in at least one tree, so they cannot conflict
+    if 2 * cutoff_threshold >= total:
+        return supported
 
-        if count <= cutoff_threshold:
-            continue
+    sizes = _clade_sizes(clades)
+    accepted = np.empty((len(supported), clades.shape[1]), dtype=np.uint64)
+    n_accepted = 0
+    keep = []
+    for i in supported:
+        clade = clades[i]
 
-        if len(clade) > 1:
+        if sizes[i] > 1 and n_accepted:
             # check the current clade against all the accepted clades to see if
             # it conflicts. A conflict is defined as:
             # 1. the clades are not disjoint
             # 2. neither clade is a subset of the other
-            for accepted_clade in accepted_clades:
-                intersect = clade.intersection(accepted_clade)
-                subset = clade.issubset(accepted_clade)
-                superset = clade.issuperset(accepted_clade)
-
-                if intersect and not (subset or superset):
-                    conflict = True
+            others = accepted[:n_accepted]
+            intersect = others & clade
+            subset = (intersect == clade).all(axis=1)
+            superset = (intersect == others).all(axis=1)
+            if (intersect.any(axis=1) & ~(subset | superset)).any():
+                continue
 
-        if conflict is False:
-            accepted_clades[clade] = count
+        accepted[n_accepted] = clade
+        n_accepted += 1
+        keep.append(i)
 
-    return accepted_clades
+    return np.asarray(keep, dtype=int)
 
 
-def _build_trees(clade_counts, edge_lengths, support_attr):
+def _build_trees(tip_names, clades, support, lengths, support_attr):
     """Construct the trees with support
 
     Parameters
     ----------
-    clade_counts : dict
-        Keyed by the frozenset of the clade and valued by the support
-    edge_lengths : dict
-        Keyed by the frozenset of the clade and valued by the weighted length
+    tip_names : list
+        The tip names, in the order of their bits in the clades.
+    clades : np.array of np.uint64
+        The compatible clades as bitsets, one per row.
+    support : np.array of float
+        The support of each clade.
+    lengths : np.array of float
+        The length of each clade, ``nan`` for no length.
     support_attr : str
         The name of the attribute to hold the support value
 
     Returns
     -------
     list of TreeNode
-        A list of the constructed trees
+        A list of the constructed trees. Trees, and the children of each node,
+        are ordered by the first of their tips in `tip_names`.
     """
-    nodes = {}
-    queue = [(len(clade), clade) for clade in clade_counts]
-    while queue:
-        # The values within the queue are updated on each iteration, so it
-        # doesn't look like an insertion sort will make sense unfortunately
-        queue.sort()
-        (clade_size, clade) = queue.pop(0)
-        new_queue = []
-
-        # search for ancestors of clade
-        for (_, ancestor) in queue:
-            if clade.issubset(ancestor):
-                # update ancestor such that, in the following example:
-                # ancestor == {1, 2, 3, 4}
-                # clade == {2, 3}
-                # new_ancestor == {1, {2, 3}, 4}
-                new_ancestor = (ancestor - clade) | frozenset([clade])
-
-                # update references for counts and lengths
-                clade_counts[new_ancestor] = clade_counts.pop(ancestor)
-                edge_lengths[new_ancestor] = edge_lengths.pop(ancestor)
-
-                ancestor = new_ancestor
-
-            new_queue.append((len(ancestor), ancestor))
-
+    n_tips = len(tip_names)
+    tip_words = np.arange(n_tips) >> 6
+    tip_bits = np.left_shift(np.uint64(1),
+                             (np.arange(n_tips) & 63).astype(np.uint64))
+
+    # the clades are nested, so the parent of a clade is the smallest clade
+    # containing it: visiting them from the largest, that is the clade
+    # visited last containing any of its tips
+    sizes = _clade_sizes(clades)
+    owner = np.full(n_tips, -1, dtype=int)
+    parent = np.empty(len(clades), dtype=int)
+    first_tip = np.empty(len(clades), dtype=int)
+    for i in np.argsort(-sizes, kind='mergesort'):
+        members = np.flatnonzero(clades[i, tip_words] & tip_bits)
+        parent[i] = owner[members[0]]
+        first_tip[i] = members[0]
+        owner[members] = i
+
+    nodes = []
+    for i in range(len(clades)):
         # if the clade is a tip, then we have a name
-        if clade_size == 1:
-            name = list(clade)[0]
+        if sizes[i] == 1:
+            name = tip_names[first_tip[i]]
         else:
             name = None
+        length = None if np.isnan(lengths[i]) else float(lengths[i])
 
-        # the clade will not be in nodes if it is a tip
-        children = [nodes.pop(c) for c in clade if c in nodes]
-        length = edge_lengths[clade]
-
-        node = TreeNode(children=children, length=length, name=name)
-        setattr(node, support_attr, clade_counts[clade])
-        nodes[clade] = node
+        node = TreeNode(length=length, name=name)
+        setattr(node, support_attr, float(support[i]))
+        nodes.append(node)
 
-        queue = new_queue
+    roots = []
+    for i in np.argsort(first_tip, kind='mergesort'):
+        if parent[i] == -1:
+            roots.append(nodes[i])
+        else:
+            node = nodes[parent[i]]
+            nodes[i].parent = node
+            node.children.append(nodes[i])
 
-    return list(nodes.values())
+    return roots
 
 
-def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support'):
+def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support',
+                  n_jobs=1):
     r"""Determines consensus trees from a list of rooted trees
 
     Parameters
@@ -195,6 +335,10 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support'):
     support_attr : str
         The attribute to be decorated onto the resulting trees that contain the
         consensus support.
+    n_jobs : int, optional
+        Number of worker processes counting the clades of the trees. The trees
+        are split into `n_jobs` chunks which are sent to the workers, and the
+        counts of the chunks are then merged.
 
     Returns
     -------
@@ -214,6 +358,13 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support'):
     clade was observed in. For instance, if {A, B, C} was observed in 5 trees
     all with a weight of 1, its support would then be 5.
 
+    Tip names are mapped to integer indices once, in order of appearance in
+    `trees`, and each clade is represented as a bitset of the indices of its
+    tips, stored in 64-bit words, so that the clades of all of the trees can
+    be counted with vectorized operations. Tip names must be unique within
+    each tree. In the resulting trees, trees and the children of each node
+    are ordered by the first appearance of their tips.
+
     References
     ----------
     .. [1] Margush T, McMorris FR. (1981) "Consensus n-trees." Bulletin for
@@ -240,35 +391,35 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support'):
     ... TreeNode.read(StringIO(u"(A,(B,(E,((G,(F,I)),(((J,H),D),C)))));"))]
     >>> consensus = majority_rule(trees, cutoff=0.5)[0]
     >>> print(consensus.ascii_art())
-                                  /-E
-                                 |
-                                 |          /-G
-                        /--------|         |
-                       |         |         |          /-F
-                       |         |         |---------|
-                       |          \--------|          \-I
-                       |                   |
-                       |                   |          /-C
-              /--------|                   |         |
-             |         |                    \--------|          /-D
-             |         |                             |         |
-             |         |                              \--------|--J
-    ---------|         |                                       |
-             |         |                                        \-H
-             |         |
-             |          \-B
+              /-A
              |
-              \-A
+             |          /-B
+             |         |
+    ---------|         |                                        /-H
+             |         |                                       |
+             |         |                              /--------|--D
+             |         |                             |         |
+              \--------|                    /--------|          \-J
+                       |                   |         |
+                       |                   |          \-C
+                       |          /--------|
+                       |         |         |--G
+                       |         |         |
+                        \--------|         |          /-F
+                                 |          \--------|
+                                 |                    \-I
+                                 |
+                                  \-E
     >>> for node in consensus.non_tips():
     ...     support_value = node.support
     ...     names = ' '.join([n.name for n in node.tips()])
     ...     print("Tips: %s, support: %s" % (names, support_value))
+    Tips: H D J, support: 6.0
+    Tips: H D J C, support: 6.0
     Tips: F I, support: 9.0
-    Tips: D J H, support: 6.0
-    Tips: C D J H, support: 6.0
-    Tips: G F I C D J H, support: 6.0
-    Tips: E G F I C D J H, support: 9.0
-    Tips: E G F I C D J H B, support: 9.0
+    Tips: H D J C G F I, support: 6.0
+    Tips: H D J C G F I E, support: 9.0
+    Tips: B H D J C G F I E, support: 9.0
 
     In the next example, multiple trees will be returned which can happen if
     clades are not well supported across the trees. In addition, this can arise
@@ -284,14 +435,14 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support'):
     4
     >>> for tree in consensus_trees:
     ...     print(tree.ascii_art())
-    --b
     --a
-              /-f
+    --b
+              /-c
     ---------|
-              \-e
-              /-d
+              \-d
+              /-e
     ---------|
-              \-c
+              \-f
 
     """
     if weights is None:
@@ -301,10 +452,13 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support'):
         if len(weights) != len(trees):
             raise ValueError("Number of weights and trees differ!")
 
-    cutoff_threshold = cutoff * weights.sum()
+    total = weights.sum()
+    cutoff_threshold = cutoff * total
 
-    clade_counts, edge_lengths = _walk_clades(trees, weights)
-    clade_counts = _filter_clades(clade_counts, cutoff_threshold)
-    trees = _build_trees(clade_counts, edge_lengths, support_attr)
+    tip_names, clades, support, lengths = _walk_clades(trees, weights,
+                                                       n_jobs=n_jobs)
+    accepted = _filter_clades(clades, support, cutoff_threshold, total)
+    trees = _build_trees(tip_names, clades[accepted], support[accepted],
+                         lengths[accepted], support_attr)
 
     return trees
@@ -9,9 +9,7 @@
 from __future__ import absolute_import, division, print_function
 
 import numpy as np
-from six import StringIO
 
-from skbio.stats.distance import DistanceMatrix
 from skbio.tree import TreeNode
 
 
@@ -30,8 +28,9 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
     result_constructor : function, optional
         Function to apply to construct the result object. This must take a
         newick-formatted string as input. The result of applying this function
-        to a newick-formatted string will be returned from this function. This
-        defaults to ``lambda x: TreeNode.read(StringIO(x), format='newick')``.
+        to a newick-formatted string will be returned from this function. If
+        not provided, the `TreeNode` is built directly, without going through
+        a newick-formatted string.
 
     Returns
     -------
@@ -54,6 +53,15 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
     rooting the resulting trees is midpoint rooting, which is accessible as
     ``TreeNode.root_at_midpoint``.
 
+    This implementation updates a single copy of the distance matrix (and the
+    vector of its row sums) in place as nodes are joined, and builds the
+    resulting `TreeNode` as it goes. As in RapidNJ [4]_, a lower bound on the
+    Q values of each row (derived from the row's smallest distance and the
+    largest row sum) is used to skip rows that cannot contain the pair to
+    join, so that Q values are usually only computed for a small fraction of
+    the matrix in each iteration. The pair that is joined is the same as if
+    the full Q matrix had been computed.
+
     References
     ----------
     .. [1] Saitou N, and Nei M. (1987) "The neighbor-joining method: a new
@@ -61,6 +69,9 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
        Evolution. PMID: 3447015.
     .. [2] http://en.wikipedia.org/wiki/Neighbour_joining
     .. [3] http://evolution.genetics.washington.edu/phylip/doc/neighbor.html
+    .. [4] Simonsen M, Mailund T, and Pedersen CNS. (2008) "Rapid
+       Neighbour-Joining." Algorithms in Bioinformatics, Lecture Notes in
+       Computer Science 5251: 113-122.
 
     Examples
     --------
@@ -108,136 +119,168 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
             "Distance matrix must be at least 3x3 to "
             "generate a neighbor joining tree.")
 
-    if result_constructor is None:
-        def result_constructor(x):
-            return TreeNode.read(StringIO(x), format='newick')
-
-    # initialize variables
-    node_definition = None
-
-    # while there are still more than three distances in the distance matrix,
-    # join neighboring nodes.
-    while(dm.shape[0] > 3):
-        # compute the Q matrix
-        q = _compute_q(dm)
-
-        # identify the pair of nodes that have the lowest Q value. if multiple
-        # pairs have equally low Q values, the first pair identified (closest
-        # to the top-left of the matrix) will be chosen. these will be joined
-        # in the current node.
-        idx1, idx2 = _lowest_index(q)
-        pair_member_1 = dm.ids[idx1]
-        pair_member_2 = dm.ids[idx2]
-        # determine the distance of each node to the new node connecting them.
-        pair_member_1_len, pair_member_2_len = _pair_members_to_new_node(
-            dm, idx1, idx2, disallow_negative_branch_length)
-        # define the new node in newick style
-        node_definition = "(%s:%f, %s:%f)" % (pair_member_1,
-                                              pair_member_1_len,
-                                              pair_member_2,
-                                              pair_member_2_len)
-        # compute the new distance matrix, which will contain distances of all
-        # other nodes to this new node
-        dm = _compute_collapsed_dm(
-            dm, pair_member_1, pair_member_2,
-            disallow_negative_branch_length=disallow_negative_branch_length,
-            new_node_id=node_definition)
-
-    # When there are three distances left in the distance matrix, we have a
-    # fully defined tree. The last node is internal, and its distances are
-    # defined by these last three values.
-    # First determine the distance between the last two nodes to be joined in
-    # a pair...
-    pair_member_1 = dm.ids[1]
-    pair_member_2 = dm.ids[2]
-    pair_member_1_len, pair_member_2_len = \
-        _pair_members_to_new_node(dm, pair_member_1, pair_member_2,
-                                  disallow_negative_branch_length)
-    # ...then determine their distance to the other remaining node, but first
-    # handle the trival case where the input dm was only 3 x 3
-    node_definition = node_definition or dm.ids[0]
-    internal_len = _otu_to_new_node(
-        dm, pair_member_1, pair_member_2, node_definition,
-        disallow_negative_branch_length=disallow_negative_branch_length)
-    # ...and finally create the newick string describing the whole tree.
-    newick = "(%s:%f, %s:%f, %s:%f);" % (pair_member_1, pair_member_1_len,
-                                         node_definition, internal_len,
-                                         pair_member_2, pair_member_2_len)
+    tree = _nj(dm, disallow_negative_branch_length)
 
     # package the result as requested by the user and return it.
-    return result_constructor(newick)
-
-
-def _compute_q(dm):
-    """Compute Q matrix, used to identify the next pair of nodes to join.
+    if result_constructor is None:
+        return tree
+    return result_constructor(_to_newick(tree))
 
-    """
-    q = np.zeros(dm.shape)
-    n = dm.shape[0]
-    for i in range(n):
-        for j in range(i):
-            q[i, j] = q[j, i] = \
-                ((n - 2) * dm[i, j]) - dm[i].sum() - dm[j].sum()
-    return DistanceMatrix(q, dm.ids)
 
+def _nj(dm, disallow_negative_branch_length):
+    """Build the neighbor joining tree for a distance matrix.
 
-def _compute_collapsed_dm(dm, i, j, disallow_negative_branch_length,
-                          new_node_id):
-    """Return the distance matrix resulting from joining ids i and j in a node.
+    The rows and columns of a working copy of the distance matrix are
+    "slots", each holding a node that is still to be joined. Joining the
+    nodes in two slots puts the new node in the first of them and moves the
+    last active slot into the second, so active slots are always the leading
+    ``m x m`` block of the matrix.
 
-    If the input distance matrix has shape ``(n, n)``, the result will have
-    shape ``(n-1, n-1)`` as the ids `i` and `j` are collapsed to a single new
-    ids.
+    Nodes are ordered as in the original (copying) implementation, where the
+    most recently created node was placed first and all other nodes kept
+    their order. This order determines which pair is joined when Q values
+    are tied, and the order of the children of each node. It is tracked with
+    a key per slot: ids keep their index in `dm`, and the node created in
+    iteration ``t`` gets key ``-t - 1``.
 
     """
-    in_n = dm.shape[0]
-    out_n = in_n - 1
-    out_ids = [new_node_id]
-    out_ids.extend([e for e in dm.ids if e not in (i, j)])
-    result = np.zeros((out_n, out_n))
-    for idx1, out_id1 in enumerate(out_ids[1:]):
-        result[0, idx1 + 1] = result[idx1 + 1, 0] = _otu_to_new_node(
-            dm, i, j, out_id1, disallow_negative_branch_length)
-        for idx2, out_id2 in enumerate(out_ids[1:idx1+1]):
-            result[idx1+1, idx2+1] = result[idx2+1, idx1+1] = \
-                dm[out_id1, out_id2]
-    return DistanceMatrix(result, out_ids)
-
-
-def _lowest_index(dm):
-    """Return the index of the lowest value in the input distance matrix.
-
-    If there are ties for the lowest value, the index of top-left most
-    occurrence of that value will be returned.
-
-    This should be ultimately be replaced with a new DistanceMatrix object
-    method (#228).
+    n = dm.shape[0]
+    d = dm.data.copy()
+    row_sums = d.sum(axis=1)
+    # the diagonal is never a candidate for joining
+    np.fill_diagonal(d, np.inf)
+    # smallest distance in each row and the slot it is in, used to bound the
+    # Q values of each row
+    row_mins = d.min(axis=1)
+    row_min_slots = d.argmin(axis=1)
+    keys = np.arange(n)
+    nodes = [TreeNode(name=id_) for id_ in dm.ids]
+
+    m = n
+    iteration = 0
+    while m > 3:
+        if m == 4:
+            # With four nodes, the Q values of complementary pairs are equal,
+            # so which pair is joined is decided by rounding error. Recompute
+            # the row sums from scratch, in node order, to make the same
+            # choice as the original implementation.
+            order = np.argsort(keys[:m])
+            block = d[np.ix_(order, order)]
+            np.fill_diagonal(block, 0)
+            row_sums[order] = block.sum(axis=1)
+        i, j = _lowest_q_index(d, row_sums, row_mins, keys, m)
+        d_ij = d[i, j]
+        i_to_u, j_to_u = _pair_members_to_new_node(
+            d_ij, row_sums[i], row_sums[j], m,
+            disallow_negative_branch_length)
+        nodes[i].length = i_to_u
+        nodes[j].length = j_to_u
+        node = TreeNode(children=[nodes[i], nodes[j]])
+
+        # the new node u replaces whichever of i and j comes first, so that
+        # it is not moved below
+        u, removed = min(i, j), max(i, j)
+        d_u = _otu_to_new_node(d[i, :m], d[j, :m], d_ij,
+                               disallow_negative_branch_length)
+        d_u[i] = d_u[j] = 0
+        row_sums[:m] += d_u - d[i, :m] - d[j, :m]
+        row_sums[u] = d_u.sum()
+        d_u[u] = np.inf
+        d[u, :m] = d_u
+        d[:m, u] = d_u
+        keys[u] = -iteration - 1
+        nodes[u] = node
+        stale = (row_min_slots[:m] == i) | (row_min_slots[:m] == j)
+
+        # move the last active slot into the removed one
+        last = m - 1
+        if removed != last:
+            d[removed, :m] = d[last, :m]
+            d[:m, removed] = d[:m, last]
+            for values in row_sums, row_mins, row_min_slots, keys, stale:
+                values[removed] = values[last]
+            nodes[removed] = nodes[last]
+            row_min_slots[:m][row_min_slots[:m] == last] = removed
+        m = last
+        iteration += 1
+
+        # update the smallest distance in each row
+        d_u = d[u, :m]
+        closer = d_u < row_mins[:m]
+        row_mins[:m][closer] = d_u[closer]
+        row_min_slots[:m][closer] = u
+        stale[u] = True
+        stale = np.flatnonzero(stale[:m])
+        row_mins[stale] = d[stale, :m].min(axis=1)
+        row_min_slots[stale] = d[stale, :m].argmin(axis=1)
+
+    # When there are three nodes left, we have a fully defined tree. The last
+    # node is internal, and its distances are defined by these last three
+    # values.
+    k, i, j = np.argsort(keys[:3])
+    d_ij = d[i, j]
+    i_to_u, j_to_u = _pair_members_to_new_node(
+        d_ij, d[i, k] + d_ij, d[j, k] + d_ij, 3,
+        disallow_negative_branch_length)
+    nodes[i].length = i_to_u
+    nodes[j].length = j_to_u
+    nodes[k].length = _otu_to_new_node(d[i, k], d[j, k], d_ij,
+                                       disallow_negative_branch_length)
+    return TreeNode(children=[nodes[i], nodes[k], nodes[j]])
+
+
+def _lowest_q_index(d, row_sums, row_mins, keys, m, block_size=2**20):
+    """Return the slots of the pair of nodes with the lowest Q value.
+
+    Only the rows whose Q values may be as low as the lowest Q value of the
+    row with the lowest bound are computed. If multiple pairs have equally
+    low Q values, the pair that comes first in the original implementation's
+    order (i.e., closest to the top-left of the matrix) is returned. The
+    first slot returned is the one with the larger key.
 
     """
-    lowest_value = np.inf
-    for i in range(dm.shape[0]):
-        for j in range(i):
-            curr_index = i, j
-            curr_value = dm[curr_index]
-            if curr_value < lowest_value:
-                lowest_value = curr_value
-                result = curr_index
-    return result
-
-
-def _otu_to_new_node(dm, i, j, k, disallow_negative_branch_length):
-    """Return the distance between a new node and some other node.
+    row_sums = row_sums[:m]
+    scale = m - 2
+    bounds = scale * row_mins[:m] - row_sums - row_sums.max()
+
+    first = bounds.argmin()
+    lowest = (scale * d[first, :m] - row_sums[first] - row_sums).min()
+    # allow for rounding error in the bounds
+    tolerance = 1e-9 * max(abs(lowest), 1.0)
+    rows = np.flatnonzero(bounds <= lowest + tolerance)
+
+    ties = []
+    step = max(1, block_size // m)
+    for start in range(0, len(rows), step):
+        block = rows[start:start + step]
+        q = scale * d[block, :m] - row_sums[block, np.newaxis] - row_sums
+        block_lowest = q.min()
+        if block_lowest < lowest:
+            lowest = block_lowest
+            ties = []
+        if block_lowest == lowest:
+            a, b = np.nonzero(q == lowest)
+            ties.append((block[a], b))
+
+    a = np.concatenate([a for a, _ in ties])
+    b = np.concatenate([b for _, b in ties])
+    swap = keys[a] < keys[b]
+    a[swap], b[swap] = b[swap], a[swap]
+    first = np.lexsort((keys[b], keys[a]))[0]
+    return a[first], b[first]
+
+
+def _otu_to_new_node(d_ik, d_jk, d_ij, disallow_negative_branch_length):
+    """Return the distance between a new node and some other node(s).
 
     Parameters
     ----------
-    dm : skbio.DistanceMatrix
-        The input distance matrix.
-    i, j : str
-        Identifiers of entries in the distance matrix to be collapsed. These
-        get collapsed to a new node, internally represented as `u`.
-    k : str
-        Identifier of the entry in the distance matrix for which distance to
-        `u` will be computed.
+    d_ik, d_jk : float or np.ndarray
+        Distances from the nodes ``i`` and ``j`` to be collapsed to node(s)
+        ``k``. ``i`` and ``j`` get collapsed to a new node, internally
+        represented as ``u``.
+    d_ij : float
+        Distance between ``i`` and ``j``.
     disallow_negative_branch_length : bool
         Neighbor joining can result in negative branch lengths, which don't
         make sense in an evolutionary context. If `True`, negative branch
@@ -245,25 +288,28 @@ def _otu_to_new_node(dm, i, j, k, disallow_negative_branch_length):
         issue that was proposed by the original developers of the algorithm.
 
     """
-    k_to_u = 0.5 * (dm[i, k] + dm[j, k] - dm[i, j])
+    k_to_u = 0.5 * (d_ik + d_jk - d_ij)
 
-    if disallow_negative_branch_length and k_to_u < 0:
-        k_to_u = 0
+    if disallow_negative_branch_length:
+        k_to_u = np.maximum(k_to_u, 0)
 
     return k_to_u
 
 
-def _pair_members_to_new_node(dm, i, j, disallow_negative_branch_length):
+def _pair_members_to_new_node(d_ij, r_i, r_j, n,
+                              disallow_negative_branch_length):
     """Return the distance between a new node and decendants of that new node.
 
     Parameters
     ----------
-    dm : skbio.DistanceMatrix
-        The input distance matrix.
-    i, j : str
-        Identifiers of entries in the distance matrix to be collapsed (i.e.,
-        the descendents of the new node, which is internally represented as
-        `u`).
+    d_ij : float
+        Distance between the nodes ``i`` and ``j`` to be collapsed (i.e., the
+        descendents of the new node, which is internally represented as
+        ``u``).
+    r_i, r_j : float
+        Sums of the distances from ``i`` and ``j`` to all other nodes.
+    n : int
+        Number of nodes that are still to be joined.
     disallow_negative_branch_length : bool
         Neighbor joining can result in negative branch lengths, which don't
         make sense in an evolutionary context. If `True`, negative branch
@@ -271,16 +317,28 @@ def _pair_members_to_new_node(dm, i, j, disallow_negative_branch_length):
         issue that was proposed by the original developers of the algorithm.
 
     """
-    n = dm.shape[0]
-    i_to_j = dm[i, j]
-    i_to_u = (0.5 * i_to_j) + ((dm[i].sum() - dm[j].sum()) / (2 * (n - 2)))
+    i_to_u = (0.5 * d_ij) + ((r_i - r_j) / (2 * (n - 2)))
 
     if disallow_negative_branch_length and i_to_u < 0:
         i_to_u = 0
 
-    j_to_u = i_to_j - i_to_u
+    j_to_u = d_ij - i_to_u
 
     if disallow_negative_branch_length and j_to_u < 0:
         j_to_u = 0
 
     return i_to_u, j_to_u
+
+
+def _to_newick(tree):
+    """Format a neighbor joining tree as a newick string."""
+    labels = {}
+    for node in tree.postorder():
+        if node.is_tip():
+            label = "%s" % node.name
+        else:
+            label = "(%s)" % ", ".join(
+                "%s:%f" % (labels.pop(id(child)), child.length)
+                for child in node.children)
+        labels[id(node)] = label
+    return labels[id(tree)] + ";"
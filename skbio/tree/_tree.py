@@ -8,22 +8,49 @@
 
 from __future__ import absolute_import, division, print_function
 
-from operator import or_
+from operator import attrgetter, or_
 from copy import deepcopy
-from itertools import combinations
+from itertools import islice
 from functools import reduce
-from collections import defaultdict
+from collections import defaultdict, deque
 
 import numpy as np
 from scipy.stats import pearsonr
 from future.builtins import zip
-from six import StringIO
+from six import StringIO, string_types, text_type, binary_type
 
 from skbio._base import SkbioObject
 from skbio.stats.distance import DistanceMatrix
 from ._exception import (NoLengthError, DuplicateNodeError, NoParentError,
                          MissingNodeError, TreeError)
 
+_ATOMIC_TYPES = frozenset([type(None), bool, int, float, complex, text_type,
+                           binary_type])
+
+
+def _slot_names(cls):
+    r"""Return the names of the attributes stored in the slots of `cls`"""
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, string_types):
+            slots = (slots,)
+        names.extend(name for name in slots
+                     if name not in ('__dict__', '__weakref__'))
+    return names
+
+
+def _node_attrs(node, slots):
+    r"""Yield the (name, value) pairs of the attributes set on `node`"""
+    for name in slots:
+        try:
+            yield name, getattr(node, name)
+        except AttributeError:
+            pass
+
+    for item in getattr(node, '__dict__', {}).items():
+        yield item
+
 
 def distance_from_r(m1, m2):
     r"""Estimates distance as (1-r)/2: neg correl = max distance
@@ -44,6 +71,43 @@ def distance_from_r(m1, m2):
     return (1-pearsonr(m1.data.flat, m2.data.flat)[0])/2
 
 
+class _ChildList(list):
+    r"""The children of a node, as a list that reports changes to the node
+
+    Changing the list directly (e.g., sorting it or popping a child from it)
+    invalidates the traversal orders cached on the root of the tree, as
+    `TreeNode.append` and `TreeNode.remove` do.
+    """
+    __slots__ = ('_node',)
+
+    def __init__(self, node, children=()):
+        list.__init__(self, children)
+        self._node = node
+
+
+def _child_list_modifier(name):
+    method = getattr(list, name)
+
+    def modify(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        # the node is not set yet while a pickled list is being restored
+        node = getattr(self, '_node', None)
+        if node is not None and node._cache_root is not None:
+            node._children_changed()
+        return result
+
+    modify.__name__ = name
+    return modify
+
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'sort',
+              'reverse', 'clear', '__setitem__', '__delitem__', '__iadd__',
+              '__imul__', '__setslice__', '__delslice__'):
+    if hasattr(list, _name):
+        setattr(_ChildList, _name, _child_list_modifier(_name))
+del _name
+
+
 class TreeNode(SkbioObject):
     r"""Representation of a node within a tree
 
@@ -76,25 +140,66 @@ class TreeNode(SkbioObject):
     children
     id
 
+    Notes
+    -----
+    The attributes above, and the lookup caches of the tree, are stored in
+    ``__slots__``. Any other attribute set on a node (e.g., a ``support``
+    value, or an attribute cached by `cache_attr`) is stored in the node's
+    ``__dict__``, which is only created when first used, so that trees with
+    millions of nodes stay compact.
+
     """
+    __slots__ = ('name', 'length', 'parent', '_children', 'id', '_tip_cache',
+                 '_non_tip_cache', '_order_cache', '_cache_root',
+                 '_registered_caches', '__dict__', '__weakref__')
+
     default_write_format = 'newick'
-    _exclude_from_copy = set(['parent', 'children', '_tip_cache',
-                              '_non_tip_cache'])
+    _exclude_from_copy = set(['parent', '_children', '_tip_cache',
+                              '_non_tip_cache', '_order_cache', '_cache_root'])
 
     def __init__(self, name=None, length=None, parent=None, children=None):
         self.name = name
         self.length = length
         self.parent = parent
-        self._tip_cache = {}
-        self._non_tip_cache = {}
-        self._registered_caches = set()
-
-        self.children = []
+        # the lookup caches are only built on the root of a tree, and
+        # registered caches only on nodes passed to cache_attr
+        self._tip_cache = None
+        self._non_tip_cache = None
+        self._order_cache = None
+        # the root whose cached traversal orders include this node
+        self._cache_root = None
+        self._registered_caches = None
+
+        # a new node is in no cached order, so there is nothing to drop
+        self._children = _ChildList(self)
         self.id = None
 
         if children is not None:
             self.extend(children)
 
+    def _set_children(self, children):
+        self._children = _ChildList(self, children)
+        self._children_changed()
+
+    # the getter is a C function, as children are read on every step of a
+    # traversal
+    children = property(
+        attrgetter('_children'), _set_children,
+        doc=r"""List of the children of the node.
+
+        The list can be modified in place or replaced, which invalidates the
+        traversal orders cached on the root of the tree. Prefer `append`,
+        `extend`, `remove` and `pop`, which also set the parents of the
+        children.
+
+        """)
+
+    def _children_changed(self):
+        r"""Drop the cached traversal orders that include self"""
+        if self._cache_root is not None:
+            self._cache_root._clear_lookup_caches()
+            self._cache_root = None
+
     def __repr__(self):
         r"""Returns summary of the tree
 
@@ -171,6 +276,8 @@ class TreeNode(SkbioObject):
         self.invalidate_caches()
         if node.parent is not None:
             node.parent.remove(node)
+        else:
+            node._clear_lookup_caches()
         node.parent = self
         return node
 
@@ -272,6 +379,7 @@ class TreeNode(SkbioObject):
         self.invalidate_caches()
         node = self.children.pop(idx)
         node.parent = None
+        node._clear_lookup_caches()
         return node
 
     def remove(self, node):
@@ -414,11 +522,20 @@ class TreeNode(SkbioObject):
 
         See Also
         --------
+        shear_many
         prune
         remove
         pop
         remove_deleted
 
+        Notes
+        -----
+        Only the nodes retained in the result are copied. The nodes that have
+        any of the tips in `names` below them are found with a few array
+        passes over an index of the tree, whose topology is cached on the root
+        until it changes. Internal nodes left with a single
+        child are then collapsed as `prune` does.
+
         Examples
         --------
         >>> from six import StringIO
@@ -430,21 +547,159 @@ class TreeNode(SkbioObject):
         <BLANKLINE>
 
         """
-        tcopy = self.deepcopy()
-        all_tips = {n.name for n in tcopy.tips()}
-        ids = set(names)
+        return self._shear(self._shear_index(), names)
+
+    def shear_many(self, names_list):
+        """Shear the tree to each of several sets of tip names
 
-        if not ids.issubset(all_tips):
+        Parameters
+        ----------
+        names_list : Iterable of Iterable of str
+            The sets of tip names on the tree to keep.
+
+        Returns
+        -------
+        generator of TreeNode
+            For each set of names, the tree that `shear` returns.
+
+        Raises
+        ------
+        ValueError
+            If the names do not exist in the tree
+
+        See Also
+        --------
+        shear
+
+        Notes
+        -----
+        The tree is indexed once, and only the nodes retained in each result
+        are copied, so that many subtrees can be extracted from a large tree
+        without copying all of it for each one.
+
+        Examples
+        --------
+        >>> from six import StringIO
+        >>> from skbio import TreeNode
+        >>> t = TreeNode.read(StringIO('((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        >>> for sheared in t.shear_many([['G', 'M'], ['H', 'G', 'R']]):
+        ...     print(sheared)
+        (G:3.0,M:3.7);
+        <BLANKLINE>
+        ((H:1.0,G:1.0):2.0,R:3.5);
+        <BLANKLINE>
+
+        """
+        index = self._shear_index()
+        for names in names_list:
+            yield self._shear(index, names)
+
+    def _shear_index(self):
+        r"""Index the nodes and tips of the tree below self for shearing"""
+        if self.parent is None and self._order_cache is not None and \
+                'shear' in self._order_cache:
+            nodes, tree, tip_positions = self._order_cache['shear']
+        else:
+            from ._array import TreeArray
+
+            # nodes are numbered as by TreeArray.from_tree_node
+            nodes = []
+            for node in self.postorder():
+                nodes.extend(node.children)
+            nodes.append(self)
+
+            position = {id(node): i for i, node in enumerate(nodes)}
+            parent = [position[id(node.parent)] for node in nodes[:-1]]
+            parent.append(-1)
+            tree = TreeArray(parent)
+            tip_positions = np.flatnonzero(tree.is_tip()).tolist()
+
+            # only the topology is cached, as names can change without
+            # invalidating the caches
+            if self.parent is None:
+                if self._order_cache is None:
+                    self._order_cache = {}
+                self._order_cache['shear'] = (nodes, tree, tip_positions)
+
+        tips = defaultdict(list)
+        for i in tip_positions:
+            tips[nodes[i].name].append(i)
+        return nodes, tree, dict(tips)
+
+    def _shear(self, index, names):
+        r"""Build the tree sheared to `names` from a `_shear_index`"""
+        nodes, tree, tips = index
+        names = set(names)
+        if not names.issubset(tips):
             raise ValueError("ids are not a subset of the tree!")
 
-        while len(list(tcopy.tips())) != len(ids):
-            for n in list(tcopy.tips()):
-                if n.name not in ids:
-                    n.parent.remove(n)
+        keep = np.zeros(len(nodes), dtype=np.intp)
+        for name in names:
+            keep[tips[name]] = 1
+
+        # a node is kept if any of the kept tips descends from it, and is
+        # collapsed into its child if only one of its children is kept
+        kept = tree.subtree_sum(keep) > 0
+        root = tree.root
+        kept[root] = True
+        n_kept = np.bincount(tree.parent[kept & (tree.parent >= 0)],
+                             minlength=len(nodes))
+        collapsed = kept & (n_kept == 1)
+        collapsed[root] = False
+
+        slots = _slot_names(self.__class__)
+        parent = tree.parent
+        preorder = tree.preorder
+        copies = {}
+        # children of each copy, with the children reached through collapsed
+        # nodes last, which is where prune leaves them
+        children = {}
+        collapsed_children = {}
+        # for collapsed nodes, the copy their descendants are attached to and
+        # the length to add to them
+        targets = {}
+        carried = {}
+        for i in preorder[kept[preorder]].tolist():
+            node = nodes[i]
+            if i == root:
+                copies[i] = self._copy_node(node, slots)
+                children[i] = []
+                collapsed_children[i] = []
+                continue
+
+            j = parent[i]
+            if collapsed[j]:
+                target = targets[j]
+                length = node.length
+                # as in prune, the child's length and properties take over
+                if length is None or carried[j] is None:
+                    length = length or carried[j]
+                else:
+                    length += carried[j]
+            else:
+                target = j
+
+            if collapsed[i]:
+                targets[i] = target
+                carried[i] = length if collapsed[j] else node.length
+                continue
+
+            new = self._copy_node(node, slots)
+            copies[i] = new
+            children[i] = []
+            collapsed_children[i] = []
+            if collapsed[j]:
+                new.length = length
+                collapsed_children[target].append(new)
+            else:
+                children[target].append(new)
 
-        tcopy.prune()
+        for i, new in copies.items():
+            new.children = children[i] + collapsed_children[i]
+            for child in new.children:
+                child.parent = new
 
-        return tcopy
+        return copies[root]
 
     def copy(self):
         r"""Returns a copy of self using an iterative approach
@@ -475,20 +730,8 @@ class TreeNode(SkbioObject):
         0
 
         """
-        def __copy_node(node_to_copy):
-            r"""Helper method to copy a node"""
-            # this is _possibly_ dangerous, we're assuming the node to copy is
-            # of the same class as self, and has the same exclusion criteria.
-            # however, it is potentially dangerous to mix TreeNode subclasses
-            # within a tree, so...
-            result = self.__class__()
-            efc = self._exclude_from_copy
-            for key in node_to_copy.__dict__:
-                if key not in efc:
-                    result.__dict__[key] = deepcopy(node_to_copy.__dict__[key])
-            return result
-
-        root = __copy_node(self)
+        slots = _slot_names(self.__class__)
+        root = self._copy_node(self, slots)
         nodes_stack = [[root, self, len(self.children)]]
 
         while nodes_stack:
@@ -499,8 +742,11 @@ class TreeNode(SkbioObject):
             if unvisited_children:
                 top[2] -= 1
                 old_child = old_top_node.children[-unvisited_children]
-                new_child = __copy_node(old_child)
-                new_top_node.append(new_child)
+                new_child = self._copy_node(old_child, slots)
+                # the copy is not shared yet, so there are no caches to
+                # invalidate as append would
+                new_child.parent = new_top_node
+                new_top_node.children.append(new_child)
                 nodes_stack.append([new_child, old_child,
                                     len(old_child.children)])
             else:  # no unvisited children
@@ -510,6 +756,34 @@ class TreeNode(SkbioObject):
     __copy__ = copy
     __deepcopy__ = deepcopy = copy
 
+    def _copy_node(self, node_to_copy, slots):
+        r"""Copy the attributes of a node, but not its parent or children
+
+        `slots` are the names returned by ``_slot_names(self.__class__)``.
+
+        """
+        # this is _possibly_ dangerous, we're assuming the node to copy is
+        # of the same class as self, and has the same exclusion criteria.
+        # however, it is potentially dangerous to mix TreeNode subclasses
+        # within a tree, so...
+        result = self.__class__()
+        efc = self._exclude_from_copy
+        for key, value in _node_attrs(node_to_copy, slots):
+            if key in efc:
+                continue
+            # names, lengths and ids are immutable and the registered
+            # caches are a set of names, so skip deepcopy's dispatch for
+            # them
+            if type(value) in _ATOMIC_TYPES:
+                pass
+            elif type(value) is set and \
+                    all(type(v) in _ATOMIC_TYPES for v in value):
+                value = set(value)
+            else:
+                value = deepcopy(value)
+            setattr(result, key, value)
+        return result
+
     def unrooted_deepcopy(self, parent=None):
         r"""Walks the tree unrooted-style and returns a new copy
 
@@ -517,7 +791,7 @@ class TreeNode(SkbioObject):
         unrooted copy. This is useful for defining new roots of the tree as
         the `TreeNode`.
 
-        This method calls `TreeNode.unrooted_copy` which is recursive.
+        This method calls `TreeNode.unrooted_copy`.
 
         Parameters
         ----------
@@ -562,8 +836,6 @@ class TreeNode(SkbioObject):
         unrooted copy. This is useful for defining new roots of the tree as
         the `TreeNode`.
 
-        This method is recursive.
-
         Warning, this is _NOT_ a deepcopy
 
         Parameters
@@ -593,26 +865,43 @@ class TreeNode(SkbioObject):
         <BLANKLINE>
 
         """
-        neighbors = self.neighbors(ignore=parent)
-        children = [c.unrooted_copy(parent=self) for c in neighbors]
-
-        # we might be walking UP the tree, so:
-        if parent is None:
-            # base edge
-            edgename = None
-            length = None
-        elif parent.parent is self:
-            # self's parent is becoming self's child
-            edgename = parent.name
-            length = parent.length
-        else:
-            assert parent is self.parent
-            edgename = self.name
-            length = self.length
-
-        result = self.__class__(name=edgename, children=children,
-                                length=length)
+        # walk the tree depth first from self, treating it as unrooted, and
+        # copy each node once the copies of its new children are made
+        copies = {}
+        stack = [(self, parent, None)]
+        while stack:
+            node, came_from, neighbors = stack.pop()
+            if neighbors is None:
+                neighbors = node.neighbors(ignore=came_from)
+                stack.append((node, came_from, neighbors))
+                stack.extend((n, node, None) for n in reversed(neighbors))
+                continue
 
+            children = [copies.pop(id(n)) for n in neighbors]
+
+            # we might be walking UP the tree, so:
+            if came_from is None:
+                # base edge
+                edgename = None
+                length = None
+            elif came_from.parent is node:
+                # node's parent is becoming node's child
+                edgename = came_from.name
+                length = came_from.length
+            else:
+                assert came_from is node.parent
+                edgename = node.name
+                length = node.length
+
+            # the copies are not shared yet, so link them directly rather
+            # than through extend
+            result = self.__class__(name=edgename, length=length)
+            result.children = children
+            for child in children:
+                child.parent = result
+            copies[id(node)] = result
+
+        result = copies.pop(id(self))
         if parent is None:
             result.name = "root"
 
@@ -979,6 +1268,10 @@ class TreeNode(SkbioObject):
     def preorder(self, include_self=True):
         r"""Performs preorder iteration over tree
 
+        When called on the root of a tree, the order is cached on the root
+        until the topology of the tree changes, including direct changes to
+        the `children` of a node.
+
         Parameters
         ----------
         include_self : bool
@@ -1011,6 +1304,11 @@ class TreeNode(SkbioObject):
         b
 
         """
+        if self.parent is None:
+            return self._cached_order('preorder', include_self)
+        return self._preorder(include_self)
+
+    def _preorder(self, include_self=True):
         stack = [self]
         while stack:
             curr = stack.pop()
@@ -1026,6 +1324,11 @@ class TreeNode(SkbioObject):
         on the stack, but is 30% faster in the average case and 3x faster in
         the worst case (for a comb tree).
 
+        When called on the root of a tree, the order is cached on the root
+        until the topology of the tree changes, as is the order of `preorder`.
+        Changing the `children` of a node directly (e.g., sorting them) also
+        drops the cached order.
+
         Parameters
         ----------
         include_self : bool
@@ -1058,6 +1361,11 @@ class TreeNode(SkbioObject):
         None
 
         """
+        if self.parent is None:
+            return self._cached_order('postorder', include_self)
+        return self._postorder(include_self)
+
+    def _postorder(self, include_self=True):
         child_index_stack = [0]
         curr = self
         curr_children = self.children
@@ -1091,6 +1399,30 @@ class TreeNode(SkbioObject):
                 child_index_stack.pop()
                 child_index_stack[-1] += 1
 
+    def _cached_order(self, order, include_self):
+        r"""Iterate over the preorder or postorder cached on the root"""
+        if self._order_cache is None:
+            self._order_cache = {}
+
+        nodes = self._order_cache.get(order)
+        if nodes is None:
+            if order == 'preorder':
+                nodes = list(self._preorder())
+            else:
+                nodes = list(self._postorder())
+            # so that changing the children of any of the nodes directly
+            # drops the order (see _children_changed)
+            for node in nodes:
+                node._cache_root = self
+            self._order_cache[order] = nodes
+
+        if include_self:
+            return iter(nodes)
+        elif order == 'preorder':
+            return islice(nodes, 1, None)
+        else:
+            return islice(nodes, len(nodes) - 1)
+
     def pre_and_postorder(self, include_self=True):
         r"""Performs iteration over tree, visiting node before and after
 
@@ -1132,7 +1464,7 @@ class TreeNode(SkbioObject):
         if not self.children:
             if include_self:
                 yield self
-            raise StopIteration
+            return
         child_index_stack = [0]
         curr = self
         curr_children = self.children
@@ -1204,9 +1536,9 @@ class TreeNode(SkbioObject):
         e
 
         """
-        queue = [self]
+        queue = deque([self])
         while queue:
-            curr = queue.pop(0)
+            curr = queue.popleft()
             if include_self or (curr is not self):
                 yield curr
             if curr.children:
@@ -1315,8 +1647,7 @@ class TreeNode(SkbioObject):
         if not self.is_root():
             self.root().invalidate_caches()
         else:
-            self._tip_cache = {}
-            self._non_tip_cache = {}
+            self._clear_lookup_caches()
 
             if self._registered_caches and attr:
                 for n in self.traverse():
@@ -1324,6 +1655,12 @@ class TreeNode(SkbioObject):
                         if hasattr(n, cache):
                             delattr(n, cache)
 
+    def _clear_lookup_caches(self):
+        r"""Drop the name lookups and traversal orders cached on self"""
+        self._tip_cache = None
+        self._non_tip_cache = None
+        self._order_cache = None
+
     def create_caches(self):
         r"""Construct an internal lookups to facilitate searching by name
 
@@ -1721,6 +2058,16 @@ class TreeNode(SkbioObject):
         ValueError
             If no tips could be found in the tree
 
+        See Also
+        --------
+        skbio.tree.LCAIndex
+
+        Notes
+        -----
+        Each call walks the ancestors of every node. For many queries on the
+        same tree, `skbio.tree.LCAIndex` answers pairwise queries in constant
+        time after building an index once.
+
         Examples
         --------
         >>> from six import StringIO
@@ -2087,18 +2434,29 @@ class TreeNode(SkbioObject):
         LEN = 10
         PAD = ' ' * LEN
         PA = ' ' * (LEN - 1)
-        namestr = self.name or ''  # prevents name of NoneType
-        if self.children:
+
+        # the art of each node is built from the art of its children, so
+        # assemble it in postorder
+        arts = {}
+        for node in self.postorder(include_self=True):
+            if node is self:
+                char = char1
+            elif node is node.parent.children[0]:
+                char = '/'
+            elif node is node.parent.children[-1]:
+                char = '\\'
+            else:
+                char = '-'
+            namestr = node.name or ''  # prevents name of NoneType
+
+            if not node.children:
+                arts[id(node)] = ([char + '-' + namestr], 0)
+                continue
+
             mids = []
             result = []
-            for c in self.children:
-                if c is self.children[0]:
-                    char2 = '/'
-                elif c is self.children[-1]:
-                    char2 = '\\'
-                else:
-                    char2 = '-'
-                (clines, mid) = c._ascii_art(char2, show_internal, compact)
+            for c in node.children:
+                (clines, mid) = arts.pop(id(c))
                 mids.append(mid + len(result))
                 result.extend(clines)
                 if not compact:
@@ -2108,15 +2466,15 @@ class TreeNode(SkbioObject):
             (lo, hi, end) = (mids[0], mids[-1], len(result))
             prefixes = [PAD] * (lo + 1) + [PA + '|'] * \
                 (hi - lo - 1) + [PAD] * (end - hi)
-            mid = np.int(np.trunc((lo + hi) / 2))
-            prefixes[mid] = char1 + '-' * (LEN - 2) + prefixes[mid][-1]
+            mid = (lo + hi) // 2
+            prefixes[mid] = char + '-' * (LEN - 2) + prefixes[mid][-1]
             result = [p + l for (p, l) in zip(prefixes, result)]
             if show_internal:
                 stem = result[mid]
                 result[mid] = stem[0] + namestr + stem[len(namestr) + 1:]
-            return (result, mid)
-        else:
-            return ([char1 + '-' + namestr], 0)
+            arts[id(node)] = (result, mid)
+
+        return arts[id(self)]
 
     def ascii_art(self, show_internal=True, compact=False):
         r"""Returns a string containing an ascii drawing of the tree
@@ -2209,6 +2567,8 @@ class TreeNode(SkbioObject):
 
         This method can be used to compute the distances between two tips,
         however, it is not optimized for computing pairwise tip distances.
+        To compute many distances in the same tree, build a
+        `skbio.tree.LCAIndex` once and query it with arrays of node ids.
 
         Parameters
         ----------
@@ -2338,7 +2698,7 @@ class TreeNode(SkbioObject):
                 tips = [tip_a[1], tip_b[1]]
         return longest, tips
 
-    def tip_tip_distances(self, endpoints=None):
+    def tip_tip_distances(self, endpoints=None, out=None, n_jobs=1):
         """Returns distance matrix between pairs of tips, and a tip order.
 
         By default, all pairwise distances are calculated in the tree. If
@@ -2349,6 +2709,13 @@ class TreeNode(SkbioObject):
         ----------
         endpoints : list of TreeNode or str, or None
             A list of TreeNode objects or names of TreeNode objects
+        out : np.ndarray, optional
+            A float64 ``(n, n)`` array to store the distances in, for
+            example a ``np.memmap`` to write a large matrix to disk a block
+            of rows at a time. The returned `DistanceMatrix` uses it as its
+            data.
+        n_jobs : int, optional
+            Number of threads computing blocks of rows in parallel.
 
         Returns
         -------
@@ -2366,6 +2733,14 @@ class TreeNode(SkbioObject):
         --------
         distance
         compare_tip_distances
+        skbio.tree.TreeArray.tip_distances
+
+        Notes
+        -----
+        Distances are computed from the distances of the tips and of their
+        lowest common ancestors to `self`, for blocks of rows at once. To
+        compute distances in single precision or in condensed form, use
+        `skbio.tree.TreeArray.tip_distances`.
 
         Examples
         --------
@@ -2384,64 +2759,25 @@ class TreeNode(SkbioObject):
          [ 15.  16.   9.   0.]]
 
         """
-        all_tips = list(self.tips())
+        # imported here because skbio.tree._array depends on this module
+        from ._array import TreeArray
+
+        self.assign_ids()
+        tree = TreeArray.from_tree_node(self)
         if endpoints is None:
-            tip_order = all_tips
+            tips = tree.tips()
+            names = tree.name[tips].tolist()
         else:
             tip_order = [self.find(n) for n in endpoints]
             for n in tip_order:
                 if not n.is_tip():
                     raise ValueError("Node with name '%s' is not a tip." %
                                      n.name)
+            tips = [n.id for n in tip_order]
+            names = [n.name for n in tip_order]
 
-        # linearize all tips in postorder
-        # .__start, .__stop compose the slice in tip_order.
-        for i, node in enumerate(all_tips):
-            node.__start, node.__stop = i, i + 1
-
-        # the result map provides index in the result matrix
-        result_map = {n.__start: i for i, n in enumerate(tip_order)}
-        num_all_tips = len(all_tips)  # total number of tips
-        num_tips = len(tip_order)  # total number of tips in result
-        result = np.zeros((num_tips, num_tips), float)  # tip by tip matrix
-        distances = np.zeros((num_all_tips), float)  # dist from tip to tip
-
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    if tip1 not in result_map:
-                        continue
-                    t1idx = result_map[tip1]
-                    for tip2 in range(child2.__start, child2.__stop):
-                        if tip2 not in result_map:
-                            continue
-                        t2idx = result_map[tip2]
-                        result[t1idx, t2idx] = distances[
-                            tip1] + distances[tip2]
-
-        for node in self.postorder():
-            if not node.children:
-                continue
-            # subtree with solved child wedges
-            # can possibly use np.zeros
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                if child.length is None:
-                    raise NoLengthError("Node with name '%s' doesn't have a "
-                                        "length." % child.name)
-
-                distances[child.__start:child.__stop] += child.length
-
-                starts.append(child.__start)
-                stops.append(child.__stop)
-
-            node.__start, node.__stop = min(starts), max(stops)
-
-            if len(node.children) > 1:
-                update_result()
-
-        return DistanceMatrix(result + result.T, [n.name for n in tip_order])
+        data = tree.tip_distances(tips, out=out, n_jobs=n_jobs)
+        return DistanceMatrix(data, names)
 
     def compare_rfd(self, other, proportion=False):
         """Calculates the Robinson and Foulds symmetric difference
@@ -2472,6 +2808,7 @@ class TreeNode(SkbioObject):
         --------
         compare_subsets
         compare_tip_distances
+        skbio.tree.rf_dists
 
         References
         ----------
@@ -2829,6 +3166,8 @@ class TreeNode(SkbioObject):
             raise TypeError("Only list, set and frozenset are supported!")
 
         for node in self.postorder(include_self=True):
+            if node._registered_caches is None:
+                node._registered_caches = set()
             node._registered_caches.add(cache_attrname)
 
             cached = [getattr(c, cache_attrname) for c in node.children]
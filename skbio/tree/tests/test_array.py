@@ -0,0 +1,347 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+from scipy.spatial.distance import squareform
+from six import StringIO
+
+from skbio import TreeNode
+from skbio.tree import _array
+from skbio.tree import (TreeArray, LCAIndex, TreeError, NoLengthError,
+                        MissingNodeError)
+
+
+class TreeArrayTests(TestCase):
+    def setUp(self):
+        self.tree = TreeNode.read(StringIO(
+            u"((a:1,b:2)c:3,(d:4,(e:5,f:1)g:2,h:3)i:6)root;"))
+        self.arr = TreeArray.from_tree_node(self.tree)
+
+    def test_from_tree_node_matches_assign_ids(self):
+        tree = self.tree.copy()
+        tree.assign_ids()
+        nodes = sorted(tree.traverse(include_self=True), key=lambda n: n.id)
+
+        npt.assert_equal(self.arr.name, [n.name for n in nodes])
+        npt.assert_equal(self.arr.parent,
+                         [-1 if n.parent is None else n.parent.id
+                          for n in nodes])
+        self.assertEqual(self.arr.root, len(nodes) - 1)
+        self.assertTrue(np.isnan(self.arr.length[self.arr.root]))
+        # the source tree is left untouched
+        self.assertTrue(all(n.id is None for n in self.tree.traverse()))
+
+    def test_from_tree_node_subtree(self):
+        arr = TreeArray.from_tree_node(self.tree.find('i'))
+        self.assertEqual(arr.name[arr.root], 'i')
+        self.assertEqual(len(arr), 6)
+
+    def test_to_tree_node_roundtrip(self):
+        obs = self.arr.to_tree_node()
+        self.assertEqual(str(obs), str(self.tree))
+        for node in obs.non_tips(include_self=True):
+            for child in node.children:
+                self.assertIs(child.parent, node)
+        self.assertIsNone(obs.length)
+
+    def test_children_and_traversals(self):
+        names = self.arr.name
+        i = self.arr.find('i')
+        npt.assert_equal(names[self.arr.children(i)], ['d', 'g', 'h'])
+        self.assertEqual(len(self.arr.children(self.arr.find('d'))), 0)
+
+        npt.assert_equal(names[self.arr.preorder],
+                         [n.name for n in self.tree.preorder()])
+        npt.assert_equal(names[self.arr.postorder],
+                         [n.name for n in self.tree.postorder()])
+        npt.assert_equal(names[self.arr.tips()],
+                         [n.name for n in self.tree.tips()])
+
+    def test_arrays_are_read_only(self):
+        with self.assertRaises(ValueError):
+            self.arr.parent[0] = 3
+        with self.assertRaises(ValueError):
+            self.arr.length[0] = 3
+
+    def test_count_tips_and_sizes(self):
+        names = self.arr.name.tolist()
+        tips = dict(zip(names, self.arr.count_tips()))
+        sizes = dict(zip(names, self.arr.subtree_size()))
+        for node in self.tree.traverse(include_self=True):
+            self.assertEqual(tips[node.name], node.count(tips=True) or 1)
+            self.assertEqual(sizes[node.name], node.count())
+
+    def test_subtree_sum(self):
+        length = np.nan_to_num(self.arr.length)
+        obs = dict(zip(self.arr.name, self.arr.subtree_sum(length)))
+        for node in self.tree.traverse(include_self=True):
+            self.assertAlmostEqual(obs[node.name],
+                                   node.descending_branch_length())
+
+        # each column of a 2-D array is summed separately
+        values = np.column_stack([length, np.arange(len(self.arr))])
+        obs = self.arr.subtree_sum(values)
+        npt.assert_almost_equal(obs[:, 0], self.arr.subtree_sum(length))
+        npt.assert_equal(obs[:, 1],
+                         self.arr.subtree_sum(np.arange(len(self.arr))))
+
+        with self.assertRaises(ValueError):
+            self.arr.subtree_sum([1, 2])
+        with self.assertRaises(ValueError):
+            self.arr.subtree_sum(3)
+
+    def test_depths_and_root_distances(self):
+        names = self.arr.name.tolist()
+        depths = dict(zip(names, self.arr.depths()))
+        dists = dict(zip(names, self.arr.root_distances()))
+        for node in self.tree.traverse(include_self=True):
+            self.assertEqual(depths[node.name], len(node.ancestors()))
+            self.assertAlmostEqual(dists[node.name],
+                                   node.accumulate_to_ancestor(self.tree))
+
+    def test_root_distances_no_length(self):
+        arr = TreeArray.from_tree_node(
+            TreeNode.read(StringIO(u"((a:1,b)c:3,d:4)root;")))
+        with self.assertRaisesRegexp(NoLengthError, 'b'):
+            arr.root_distances()
+
+    def test_lowest_common_ancestor_and_distance(self):
+        nodes = list(self.tree.tips())
+        index = {name: i for i, name in enumerate(self.arr.name)}
+        a = np.array([index[n.name] for n in nodes for _ in nodes])
+        b = np.array([index[m.name] for _ in nodes for m in nodes])
+
+        lca = self.arr.lowest_common_ancestor(a, b)
+        dist = self.arr.distance(a, b)
+        k = 0
+        for n in nodes:
+            for m in nodes:
+                exp = n if n is m else self.tree.lowest_common_ancestor([n, m])
+                self.assertEqual(self.arr.name[lca[k]], exp.name)
+                self.assertAlmostEqual(dist[k], n.distance(m))
+                k += 1
+
+        self.assertEqual(self.arr.distance(index['a'], index['e']), 17.0)
+        # a node and its descendant
+        self.assertEqual(self.arr.lowest_common_ancestor(index['i'],
+                                                         index['f']),
+                         index['i'])
+        self.assertEqual(self.arr.distance(index['i'], index['f']), 3.0)
+        self.assertEqual(self.arr.distance(index['g'], index['g']), 0.0)
+        npt.assert_equal(
+            self.arr.lowest_common_ancestor([[0], [1]], [2, 3]).shape, (2, 2))
+
+    def test_find(self):
+        self.assertEqual(self.arr.name[self.arr.find('g')], 'g')
+        with self.assertRaises(MissingNodeError):
+            self.arr.find('x')
+
+    def test_from_parent_array(self):
+        arr = TreeArray([3, 3, -1, 2, 2], [1, 2, np.nan, 4, 5],
+                        ['a', 'b', 'r', 'x', 'c'])
+        npt.assert_equal(arr.children(2), [3, 4])
+        npt.assert_equal(arr.preorder, [2, 3, 0, 1, 4])
+        npt.assert_equal(arr.postorder, [0, 1, 3, 4, 2])
+        npt.assert_almost_equal(arr.root_distances(), [5, 6, 0, 4, 5])
+        self.assertEqual(str(arr.to_tree_node()),
+                         "((a:1.0,b:2.0)x:4.0,c:5.0)r;\n")
+
+    def test_invalid_parent(self):
+        for parent, regexp in [([[0, -1]], '1-D'),
+                               ([0.5, -1], 'integers'),
+                               ([1, 0], 'exactly one root'),
+                               ([-1, -1], 'exactly one root'),
+                               ([-1, 5], 'outside'),
+                               ([-1, 2, 1], 'not connected')]:
+            with self.assertRaisesRegexp(TreeError, regexp):
+                TreeArray(parent)
+
+        with self.assertRaisesRegexp(TreeError, 'length'):
+            TreeArray([-1, 0], length=[1.0])
+
+    def test_str(self):
+        self.assertEqual(str(self.arr), "TreeArray with 10 nodes (6 tips)")
+
+    def test_deep_tree(self):
+        # a caterpillar tree deeper than the recursion limit
+        n = 5000
+        parent = np.arange(-1, n - 1)
+        arr = TreeArray(parent, np.ones(n))
+        npt.assert_equal(arr.root_distances(), np.arange(n))
+        npt.assert_equal(arr.depths(), np.arange(n))
+        self.assertEqual(arr.distance(n - 1, n // 2), n - 1 - n // 2)
+        self.assertEqual(arr.count_tips()[0], 1)
+
+    def test_tip_distances(self):
+        tips = list(self.tree.tips())
+        exp = np.array([[n.distance(m) for m in tips] for n in tips])
+
+        npt.assert_almost_equal(self.arr.tip_distances(), exp)
+        npt.assert_almost_equal(self.arr.tip_distances(condensed=True),
+                                squareform(exp))
+
+        obs = self.arr.tip_distances(dtype=np.float32)
+        self.assertEqual(obs.dtype, np.float32)
+        npt.assert_almost_equal(obs, exp, decimal=5)
+
+    def test_tip_distances_subset(self):
+        # out of preorder, and with a repeated tip
+        names = ['h', 'a', 'e', 'a']
+        nodes = [self.tree.find(n) for n in names]
+        exp = np.array([[n.distance(m) if n is not m else 0.0
+                         for m in nodes] for n in nodes])
+        tips = [self.arr.find(n) for n in names]
+
+        npt.assert_almost_equal(self.arr.tip_distances(tips), exp)
+        npt.assert_almost_equal(self.arr.tip_distances(tips, condensed=True),
+                                exp[np.triu_indices(4, 1)])
+
+        with self.assertRaisesRegexp(ValueError, "'g' is not a tip"):
+            self.arr.tip_distances([self.arr.find('g')])
+
+    def test_tip_distances_symmetric(self):
+        # distances of tips out of preorder, with branch lengths that are not
+        # exactly representable, are symmetric to the last bit
+        rs = np.random.RandomState(0)
+        for _ in range(50):
+            nodes = ['t%d:%r' % (i, rs.rand()) for i in range(10)]
+            while len(nodes) > 1:
+                i, j = sorted(rs.choice(len(nodes), 2, replace=False))
+                right, left = nodes.pop(j), nodes.pop(i)
+                nodes.append('(%s,%s):%r' % (left, right, rs.rand()))
+            arr = TreeArray.from_tree_node(
+                TreeNode.read(StringIO(u'%s;' % nodes[0])))
+            tips = rs.permutation(arr.tips())
+            obs = arr.tip_distances(tips)
+            npt.assert_array_equal(obs, obs.T)
+            npt.assert_array_equal(arr.tip_distances(tips, condensed=True),
+                                   squareform(obs, checks=False))
+
+    def test_tip_distances_blocks_and_threads(self):
+        exp = self.arr.tip_distances()
+        exp_condensed = squareform(exp)
+        tips = self.arr.tips()[::-1]
+        exp_reversed = exp[::-1, ::-1]
+
+        block_size = _array._BLOCK_SIZE
+        try:
+            for _array._BLOCK_SIZE in (1, 5, 13):
+                for n_jobs in (1, 3):
+                    npt.assert_almost_equal(
+                        self.arr.tip_distances(n_jobs=n_jobs), exp)
+                    npt.assert_almost_equal(
+                        self.arr.tip_distances(condensed=True,
+                                               n_jobs=n_jobs),
+                        exp_condensed)
+                    npt.assert_almost_equal(
+                        self.arr.tip_distances(tips, n_jobs=n_jobs),
+                        exp_reversed)
+        finally:
+            _array._BLOCK_SIZE = block_size
+
+    def test_tip_distances_out(self):
+        out = np.empty((6, 6), dtype=np.float32)
+        obs = self.arr.tip_distances(out=out)
+        self.assertIs(obs, out)
+        npt.assert_almost_equal(out, self.arr.tip_distances(), decimal=5)
+
+        with self.assertRaisesRegexp(ValueError, 'shape'):
+            self.arr.tip_distances(condensed=True, out=out)
+
+    def test_tip_distances_small(self):
+        arr = TreeArray([-1], [np.nan])
+        npt.assert_equal(arr.tip_distances(), [[0.0]])
+        self.assertEqual(arr.tip_distances(condensed=True).shape, (0,))
+        self.assertEqual(arr.tip_distances([]).shape, (0, 0))
+
+    def test_tip_distances_no_length(self):
+        arr = TreeArray.from_tree_node(
+            TreeNode.read(StringIO(u"((a:1,b)c:3,d:4)root;")))
+        with self.assertRaises(NoLengthError):
+            arr.tip_distances()
+
+    def test_lca_index_is_cached(self):
+        self.assertIs(self.arr.lca_index(), self.arr.lca_index())
+        self.assertIs(self.arr.lca_index().tree, self.arr)
+
+
+class LCAIndexTests(TestCase):
+    def setUp(self):
+        self.tree = TreeNode.read(StringIO(
+            u"((a:1,b:2)c:3,(d:4,(e:5,f:1)g:2,h:3)i:6)root;"))
+
+    def test_from_tree_node_uses_ids(self):
+        index = LCAIndex(self.tree)
+        tips = list(self.tree.tips())
+        a = [n.id for n in tips for _ in tips]
+        b = [m.id for _ in tips for m in tips]
+        lca = index.lowest_common_ancestor(a, b)
+        dist = index.distance(a, b)
+        k = 0
+        for n in tips:
+            for m in tips:
+                exp = n if n is m else self.tree.lowest_common_ancestor([n, m])
+                self.assertEqual(lca[k], exp.id)
+                self.assertAlmostEqual(dist[k], n.distance(m))
+                k += 1
+
+    def test_scalar_and_broadcast(self):
+        index = LCAIndex(self.tree)
+        e, f, i = (self.tree.find(n).id for n in 'efi')
+        self.assertEqual(index.lowest_common_ancestor(e, f),
+                         self.tree.find('g').id)
+        self.assertEqual(index.distance(i, f), 3.0)
+        self.assertEqual(index.distance(i, i), 0.0)
+        self.assertEqual(index.lowest_common_ancestor([[e], [f]],
+                                                      [e, f, i]).shape,
+                         (2, 3))
+
+    def test_matches_parent_walk(self):
+        # random trees with nodes in arbitrary order
+        rng = np.random.RandomState(0)
+        for n in (1, 2, 3, 17, 300):
+            parent = np.array([-1] + [rng.randint(0, i) for i in range(1, n)])
+            perm = rng.permutation(n)
+            inv = np.argsort(perm)
+            parent = np.where(parent[perm] < 0, -1, inv[parent[perm]])
+            arr = TreeArray(parent)
+            index = LCAIndex(arr)
+
+            def ancestors(x):
+                path = []
+                while x != -1:
+                    path.append(x)
+                    x = parent[x]
+                return path
+
+            a = rng.randint(0, n, 200)
+            b = rng.randint(0, n, 200)
+            exp = []
+            for x, y in zip(a, b):
+                seen = set(ancestors(x))
+                exp.append(next(z for z in ancestors(y) if z in seen))
+            npt.assert_equal(index.lowest_common_ancestor(a, b), exp)
+
+    def test_distance_no_length(self):
+        index = LCAIndex(TreeNode.read(StringIO(u"((a:1,b)c:3,d:4)root;")))
+        self.assertEqual(index.lowest_common_ancestor(0, 1), 2)
+        with self.assertRaises(NoLengthError):
+            index.distance(0, 1)
+
+    def test_str(self):
+        self.assertEqual(str(LCAIndex(self.tree)),
+                         "LCAIndex over a tree with 10 nodes")
+
+
+if __name__ == '__main__':
+    main()
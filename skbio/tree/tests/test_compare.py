@@ -0,0 +1,134 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase, main
+
+from six import StringIO
+import numpy as np
+import numpy.testing as npt
+
+from skbio import TreeNode
+from skbio.tree import rf_dists, wrf_dists, NoLengthError
+
+
+def _random_tree(names, rng):
+    nodes = [TreeNode(name, length=rng.rand()) for name in names]
+    while len(nodes) > 1:
+        i = rng.randint(len(nodes) - 1)
+        parent = TreeNode(length=rng.rand(), children=nodes[i:i + 2])
+        nodes[i:i + 2] = [parent]
+    return nodes[0]
+
+
+class RFDistsTests(TestCase):
+    def setUp(self):
+        self.trees = [TreeNode.read(StringIO(u"((a,b),(c,d));")),
+                      TreeNode.read(StringIO(u"(((a,b),c),d);")),
+                      TreeNode.read(StringIO(u"(((a,c),b),d);"))]
+
+    def test_rf_dists(self):
+        obs = rf_dists(self.trees, ids=['x', 'y', 'z'])
+        self.assertEqual(obs.ids, ('x', 'y', 'z'))
+        npt.assert_equal(obs.data, [[0, 2, 4], [2, 0, 2], [4, 2, 0]])
+
+        obs = rf_dists(self.trees, proportion=True)
+        self.assertEqual(obs.ids, ('0', '1', '2'))
+        npt.assert_equal(obs.data, [[0, 0.5, 1], [0.5, 0, 0.5],
+                                    [1, 0.5, 0]])
+
+    def test_rf_dists_compare_rfd(self):
+        rng = np.random.RandomState(0)
+        names = ['t%d' % i for i in range(100)]
+        trees = [_random_tree(rng.permutation(names), rng)
+                 for _ in range(6)]
+
+        obs = rf_dists(trees)
+        for i, tree in enumerate(trees):
+            for j, other in enumerate(trees):
+                self.assertEqual(obs[i, j], tree.compare_rfd(other))
+
+        npt.assert_equal(rf_dists(trees, n_jobs=2).data, obs.data)
+
+    def test_rf_dists_unrooted(self):
+        rng = np.random.RandomState(1)
+        names = ['t%d' % i for i in range(70)]
+        tree = _random_tree(names, rng)
+        rerooted = tree.root_at(tree.find('t35').parent)
+        other = _random_tree(names, rng)
+
+        obs = rf_dists([tree, rerooted, other], rooted=False)
+        self.assertEqual(obs[0, 1], 0)
+        self.assertEqual(obs[0, 2], obs[1, 2])
+        self.assertGreater(obs[0, 2], 0)
+        self.assertGreater(rf_dists([tree, rerooted])[0, 1], 0)
+
+    def test_rf_dists_identical(self):
+        obs = rf_dists([self.trees[0], self.trees[0].copy()],
+                       proportion=True)
+        npt.assert_equal(obs.data, np.zeros((2, 2)))
+
+        trees = [TreeNode.read(StringIO(u"(a,b);"))] * 2
+        npt.assert_equal(rf_dists(trees, proportion=True).data,
+                         np.zeros((2, 2)))
+
+    def test_rf_dists_invalid(self):
+        trees = self.trees + [TreeNode.read(StringIO(u"((a,b),c);"))]
+        with self.assertRaisesRegexp(ValueError, 'same tips'):
+            rf_dists(trees)
+
+        trees = self.trees + [TreeNode.read(StringIO(u"((a,b),(c,a),d);"))]
+        with self.assertRaisesRegexp(ValueError, 'unique'):
+            rf_dists(trees)
+
+
+class WRFDistsTests(TestCase):
+    def test_wrf_dists(self):
+        trees = [TreeNode.read(StringIO(u"((a:1,b:2):1,c:1);")),
+                 TreeNode.read(StringIO(u"((a:1,b:2):3,c:1);")),
+                 TreeNode.read(StringIO(u"((a:1,c:1):1,b:2);"))]
+        obs = wrf_dists(trees)
+        npt.assert_equal(obs.data, [[0, 2, 2], [2, 0, 4], [2, 4, 0]])
+        npt.assert_equal(wrf_dists(trees, n_jobs=2).data, obs.data)
+
+    def test_wrf_dists_brute_force(self):
+        rng = np.random.RandomState(2)
+        names = ['t%d' % i for i in range(80)]
+        trees = [_random_tree(rng.permutation(names), rng)
+                 for _ in range(5)]
+
+        def branches(tree):
+            return {node.subset() if node.children else
+                    frozenset([node.name]): node.length
+                    for node in tree.traverse(include_self=False)}
+
+        obs = wrf_dists(trees)
+        for i, tree in enumerate(trees):
+            for j, other in enumerate(trees):
+                a, b = branches(tree), branches(other)
+                exp = sum(abs(a.get(c, 0) - b.get(c, 0))
+                          for c in set(a) | set(b))
+                npt.assert_almost_equal(obs[i, j], exp)
+
+    def test_wrf_dists_unrooted(self):
+        trees = [TreeNode.read(StringIO(u"((a:1,b:1):2,(c:1,d:1):3);")),
+                 TreeNode.read(StringIO(u"(a:1,b:1,(c:1,d:1):5);"))]
+        npt.assert_equal(wrf_dists(trees, rooted=False).data,
+                         np.zeros((2, 2)))
+        npt.assert_equal(wrf_dists(trees).data, [[0, 4], [4, 0]])
+
+    def test_wrf_dists_no_length(self):
+        trees = [TreeNode.read(StringIO(u"((a:1,b:2):1,c:1);")),
+                 TreeNode.read(StringIO(u"((a:1,b):1,c:1);"))]
+        with self.assertRaises(NoLengthError):
+            wrf_dists(trees)
+
+
+if __name__ == '__main__':
+    main()
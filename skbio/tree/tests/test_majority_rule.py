@@ -12,9 +12,11 @@ from unittest import TestCase, main
 
 from six import StringIO
 import numpy as np
+import numpy.testing as npt
 
 from skbio import TreeNode
 from skbio.tree import majority_rule
+from skbio.tree import _majority_rule
 from skbio.tree._majority_rule import (_walk_clades, _filter_clades,
                                        _build_trees)
 
@@ -72,6 +74,51 @@ class MajorityRuleTests(TestCase):
         obs = set([frozenset([n.name for n in t.traverse()]) for t in trees])
         self.assertEqual(obs, exp)
 
+    def test_majority_rule_n_jobs(self):
+        trees = [TreeNode.read(StringIO("((a,b),(c,d),(e,f));")),
+                 TreeNode.read(StringIO("((a,b),(c,(d,e)),f);")),
+                 TreeNode.read(StringIO("(((a,b),c),(d,e),f);")),
+                 TreeNode.read(StringIO("((a,b),c,(d,(e,f)));"))]
+        exp = majority_rule(trees)
+        obs = majority_rule(trees, n_jobs=2)
+        self.assertEqual(len(obs), 1)
+        self.assertEqual(str(obs[0]), str(exp[0]))
+        self.assertEqual([n.support for n in obs[0].traverse()],
+                         [n.support for n in exp[0].traverse()])
+
+    def test_majority_rule_many_tips(self):
+        # more tips than fit in a single word of the bitsets
+        names = ['t%d' % i for i in range(150)]
+        nested = '(%s)' % ','.join(names[100:])
+        for name in reversed(names[:100]):
+            nested = '(%s,%s)' % (name, nested)
+        tree = TreeNode.read(StringIO(nested + ';'))
+        other = TreeNode.read(StringIO('(%s);' % ','.join(names)))
+
+        batch_rows = _majority_rule._BATCH_ROWS
+        try:
+            _majority_rule._BATCH_ROWS = 16
+            obs = majority_rule([tree, tree.copy(), other])
+        finally:
+            _majority_rule._BATCH_ROWS = batch_rows
+
+        self.assertEqual(len(obs), 1)
+        self.assertEqual(obs[0].compare_subsets(tree), 0.0)
+        self.assertEqual([n.name for n in obs[0].tips()], names)
+        self.assertEqual(obs[0].support, 3.0)
+        self.assertEqual(obs[0].children[1].support, 2.0)
+
+    def test_majority_rule_no_supported_clades(self):
+        trees = [TreeNode.read(StringIO("((a,b),c);")),
+                 TreeNode.read(StringIO("((a,c),b);")),
+                 TreeNode.read(StringIO("(d,e);"))]
+        self.assertEqual(majority_rule(trees, cutoff=0.7), [])
+
+    def test_majority_rule_duplicate_tips(self):
+        trees = [TreeNode.read(StringIO("((a,b),(c,a));"))]
+        with self.assertRaisesRegexp(ValueError, 'unique'):
+            majority_rule(trees)
+
     def test_walk_clades(self):
         trees = [TreeNode.read(StringIO("((A,B),(D,E));")),
                  TreeNode.read(StringIO("((A,B),(D,(E,X)));"))]
@@ -88,19 +135,6 @@ class MajorityRuleTests(TestCase):
             (frozenset(['D', 'E', 'X']), 1.0),
             (frozenset(['A', 'B', 'D', 'E', 'X']), 1.0)]
 
-        exp_lengths_nolength = {
-            frozenset(['A']): None,
-            frozenset(['B']): None,
-            frozenset(['A', 'B']): None,
-            frozenset(['D', 'E']): None,
-            frozenset(['D', 'E', 'A', 'B']): None,
-            frozenset(['D']): None,
-            frozenset(['E']): None,
-            frozenset(['X']): None,
-            frozenset(['E', 'X']): None,
-            frozenset(['D', 'E', 'X']): None,
-            frozenset(['A', 'B', 'D', 'E', 'X']): None}
-
         exp_lengths = {
             frozenset(['A']): 2.0,
             frozenset(['B']): 2.0,
@@ -114,57 +148,66 @@ class MajorityRuleTests(TestCase):
             frozenset(['D', 'E', 'X']): 1.0,
             frozenset(['A', 'B', 'D', 'E', 'X']): 1.0}
 
-        obs_clades, obs_lengths = _walk_clades(trees, np.ones(len(trees)))
-        self.assertEqual(set(obs_clades), set(exp_clades))
-        self.assertEqual(obs_lengths, exp_lengths_nolength)
+        tip_names, clades, support, lengths = _walk_clades(
+            trees, np.ones(len(trees)))
+        self.assertEqual(tip_names, ['A', 'B', 'D', 'E', 'X'])
+        obs_clades = [_clade_names(tip_names, c) for c in clades]
+        self.assertEqual(set(zip(obs_clades, support)), set(exp_clades))
+        self.assertTrue(np.isnan(lengths).all())
+
+        # largest clades first
+        sizes = [len(c) for c in obs_clades]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
 
         for t in trees:
             for n in t.traverse(include_self=True):
                 n.length = 2.0
 
-        obs_clades, obs_lengths = _walk_clades(trees, np.ones(len(trees)))
-
-        self.assertEqual(set(obs_clades), set(exp_clades))
-        self.assertEqual(obs_lengths, exp_lengths)
+        tip_names, clades, support, lengths = _walk_clades(
+            trees, np.ones(len(trees)), n_jobs=2)
+        obs_clades = [_clade_names(tip_names, c) for c in clades]
+        self.assertEqual(set(zip(obs_clades, support)), set(exp_clades))
+        self.assertEqual(dict(zip(obs_clades, lengths)), exp_lengths)
 
     def test_filter_clades(self):
-        clade_counts = [(frozenset(['A', 'B']), 8),
-                        (frozenset(['A', 'C']), 7),
-                        (frozenset(['A']), 6),
-                        (frozenset(['B']), 5)]
-        obs = _filter_clades(clade_counts, 2)
-        exp = {frozenset(['A', 'B']): 8,
-               frozenset(['A']): 6,
-               frozenset(['B']): 5}
-        self.assertEqual(obs, exp)
+        # A, B, C are bits 0, 1 and 2
+        clades = np.array([[3], [5], [1], [2]], dtype=np.uint64)
+        support = np.array([8, 7, 6, 5], dtype=float)
+        obs = _filter_clades(clades, support, 2, 8)
+        npt.assert_equal(obs, [0, 2, 3])
 
-        clade_counts = [(frozenset(['A']), 8),
-                        (frozenset(['B']), 7),
-                        (frozenset(['C']), 7),
-                        (frozenset(['A', 'B']), 6),
-                        (frozenset(['A', 'B', 'C']), 5),
-                        (frozenset(['D']), 2)]
-        obs = _filter_clades(clade_counts, 4)
-        exp = {frozenset(['A']): 8,
-               frozenset(['B']): 7,
-               frozenset(['C']): 7,
-               frozenset(['A', 'B']): 6,
-               frozenset(['A', 'B', 'C']): 5}
-        self.assertEqual(obs, exp)
+        # without conflicts to check for
+        obs = _filter_clades(clades, support, 5, 8)
+        npt.assert_equal(obs, [0, 1, 2])
+
+        clades = np.array([[1], [2], [4], [3], [7], [8]], dtype=np.uint64)
+        support = np.array([8, 7, 7, 6, 5, 2], dtype=float)
+        obs = _filter_clades(clades, support, 4, 10)
+        npt.assert_equal(obs, [0, 1, 2, 3, 4])
 
     def test_build_trees(self):
-        clade_counts = {frozenset(['A', 'B']): 6,
-                        frozenset(['A']): 7,
-                        frozenset(['B']): 8}
-        edge_lengths = {frozenset(['A', 'B']): 1,
-                        frozenset(['A']): 2,
-                        frozenset(['B']): 3}
-        tree = _build_trees(clade_counts, edge_lengths, 'foo')[0]
+        clades = np.array([[3], [1], [2]], dtype=np.uint64)
+        support = np.array([6, 7, 8], dtype=float)
+        lengths = np.array([1, 2, 3], dtype=float)
+        tree = _build_trees(['A', 'B'], clades, support, lengths, 'foo')[0]
         self.assertEqual(tree.foo, 6)
-        tree_foos = set([c.foo for c in tree.children])
-        tree_lens = set([c.length for c in tree.children])
-        self.assertEqual(tree_foos, set([7, 8]))
-        self.assertEqual(tree_lens, set([2, 3]))
+        self.assertEqual([c.name for c in tree.children], ['A', 'B'])
+        self.assertEqual([c.foo for c in tree.children], [7, 8])
+        self.assertEqual([c.length for c in tree.children], [2, 3])
+
+        lengths[0] = np.nan
+        trees = _build_trees(['A', 'B', 'C'], clades, support, lengths, 'foo')
+        self.assertEqual(len(trees), 1)
+        self.assertIsNone(trees[0].length)
+
+        trees = _build_trees(['A', 'B', 'C'], clades[1:], support[1:],
+                             lengths[1:], 'foo')
+        self.assertEqual([t.name for t in trees], ['A', 'B'])
+
+
+def _clade_names(tip_names, clade):
+    return frozenset(name for i, name in enumerate(tip_names)
+                     if int(clade[i // 64]) >> (i % 64) & 1)
 
 
 if __name__ == '__main__':
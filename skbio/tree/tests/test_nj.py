@@ -11,10 +11,12 @@ from __future__ import absolute_import, division, print_function
 from six import StringIO
 from unittest import TestCase, main
 
+import numpy as np
+import numpy.testing as npt
+
 from skbio import DistanceMatrix, TreeNode, nj
 from skbio.tree._nj import (
-    _compute_q, _compute_collapsed_dm, _lowest_index, _otu_to_new_node,
-    _pair_members_to_new_node)
+    _lowest_q_index, _otu_to_new_node, _pair_members_to_new_node, _to_newick)
 
 
 class NjTests(TestCase):
@@ -122,70 +124,74 @@ class NjTests(TestCase):
         dm = DistanceMatrix(data, list('ab'))
         self.assertRaises(ValueError, nj, dm)
 
-    def test_compute_q(self):
-        expected_data = [[0, -50, -38, -34, -34],
-                         [-50,   0, -38, -34, -34],
-                         [-38, -38,   0, -40, -40],
-                         [-34, -34, -40,   0, -48],
-                         [-34, -34, -40, -48,   0]]
-        expected_ids = list('abcde')
-        expected = DistanceMatrix(expected_data, expected_ids)
-        self.assertEqual(_compute_q(self.dm1), expected)
-
-        data = [[0, 3, 2],
-                [3, 0, 3],
-                [2, 3, 0]]
-        dm = DistanceMatrix(data, list('abc'))
-        # computed this manually
-        expected_data = [[0, -8, -8],
-                         [-8,  0, -8],
-                         [-8, -8,  0]]
-        expected = DistanceMatrix(expected_data, list('abc'))
-        self.assertEqual(_compute_q(dm), expected)
-
-    def test_compute_collapsed_dm(self):
-        expected_data = [[0,  7,  7,  6],
-                         [7,  0,  8,  7],
-                         [7,  8,  0,  3],
-                         [6,  7,  3,  0]]
-        expected_ids = ['x', 'c', 'd', 'e']
-        expected1 = DistanceMatrix(expected_data, expected_ids)
-        self.assertEqual(_compute_collapsed_dm(self.dm1, 'a', 'b', True, 'x'),
-                         expected1)
-
-        # computed manually
-        expected_data = [[0, 4, 3],
-                         [4, 0, 3],
-                         [3, 3, 0]]
-        expected_ids = ['yy', 'd', 'e']
-        expected2 = DistanceMatrix(expected_data, expected_ids)
+    def test_nj_matches_tip_distances(self):
+        # an additive distance matrix is reconstructed exactly
+        tree = TreeNode.read(StringIO(
+            "((((a:1,b:2):3,(c:4,d:1):2):1,(e:3,f:1):2):1,((g:2,h:5):1,"
+            "(i:1,(j:2,k:3):1):2):4,l:2);"))
+        dm = tree.tip_tip_distances()
+        actual = nj(dm)
+        self.assertAlmostEqual(actual.compare_tip_distances(tree), 0.0)
+        npt.assert_almost_equal(
+            actual.tip_tip_distances().filter(dm.ids).data, dm.data)
+
+    def test_nj_newick_matches_tree(self):
+        newick = nj(self.dm2, result_constructor=str)
+        self.assertAlmostEqual(TreeNode.read(StringIO(newick))
+                               .compare_tip_distances(nj(self.dm2)), 0.0)
+
+    def test_lowest_q_index(self):
+        d = self.dm1.data.copy()
+        row_sums = d.sum(axis=1)
+        np.fill_diagonal(d, np.inf)
+        keys = np.arange(5)
+        # Q matrix of dm1:
+        # [[0, -50, -38, -34, -34],
+        #  [-50,  0, -38, -34, -34],
+        #  [-38, -38,  0, -40, -40],
+        #  [-34, -34, -40,  0, -48],
+        #  [-34, -34, -40, -48,  0]]
         self.assertEqual(
-            _compute_collapsed_dm(expected1, 'x', 'c', True, 'yy'), expected2)
-
-    def test_lowest_index(self):
-        self.assertEqual(_lowest_index(self.dm1), (4, 3))
-        self.assertEqual(_lowest_index(_compute_q(self.dm1)), (1, 0))
+            _lowest_q_index(d, row_sums, d.min(axis=1), keys, 5), (1, 0))
+
+        # ties are broken by the first pair in key order, and the first slot
+        # returned has the larger key
+        d = np.array([[0, 3, 2], [3, 0, 3], [2, 3, 0]], dtype=float)
+        row_sums = d.sum(axis=1)
+        np.fill_diagonal(d, np.inf)
+        self.assertEqual(_lowest_q_index(d, row_sums, d.min(axis=1),
+                                         np.array([0, 1, 2]), 3), (1, 0))
+        self.assertEqual(_lowest_q_index(d, row_sums, d.min(axis=1),
+                                         np.array([2, 1, 0]), 3), (1, 2))
+
+    def test_lowest_q_index_blocks(self):
+        d = self.dm3.data.copy()
+        row_sums = d.sum(axis=1)
+        np.fill_diagonal(d, np.inf)
+        keys = np.arange(6)
+        expected = _lowest_q_index(d, row_sums, d.min(axis=1), keys, 6)
+        self.assertEqual(_lowest_q_index(d, row_sums, d.min(axis=1), keys, 6,
+                                         block_size=1), expected)
 
     def test_otu_to_new_node(self):
-        self.assertEqual(_otu_to_new_node(self.dm1, 'a', 'b', 'c', True), 7)
-        self.assertEqual(_otu_to_new_node(self.dm1, 'a', 'b', 'd', True), 7)
-        self.assertEqual(_otu_to_new_node(self.dm1, 'a', 'b', 'e', True), 6)
+        d = self.dm1.data
+        self.assertEqual(_otu_to_new_node(d[0, 2], d[1, 2], d[0, 1], True), 7)
+        self.assertEqual(_otu_to_new_node(d[0, 3], d[1, 3], d[0, 1], True), 7)
+        self.assertEqual(_otu_to_new_node(d[0, 4], d[1, 4], d[0, 1], True), 6)
+        npt.assert_equal(_otu_to_new_node(d[0], d[1], d[0, 1], True),
+                         [0, 0, 7, 7, 6])
 
     def test_otu_to_new_node_zero_branch_length(self):
-        data = [[0, 40, 3],
-                [40, 0, 3],
-                [3, 3, 0]]
-        ids = ['a', 'b', 'c']
-        dm = DistanceMatrix(data, ids)
-        self.assertEqual(_otu_to_new_node(dm, 'a', 'b', 'c', True), 0)
-        self.assertEqual(_otu_to_new_node(dm, 'a', 'b', 'c', False), -17)
+        self.assertEqual(_otu_to_new_node(3, 3, 40, True), 0)
+        self.assertEqual(_otu_to_new_node(3, 3, 40, False), -17)
 
     def test_pair_members_to_new_node(self):
-        self.assertEqual(_pair_members_to_new_node(self.dm1, 'a', 'b', True),
+        r = self.dm1.data.sum(axis=1)
+        self.assertEqual(_pair_members_to_new_node(5, r[0], r[1], 5, True),
                          (2, 3))
-        self.assertEqual(_pair_members_to_new_node(self.dm1, 'a', 'c', True),
+        self.assertEqual(_pair_members_to_new_node(9, r[0], r[2], 5, True),
                          (4, 5))
-        self.assertEqual(_pair_members_to_new_node(self.dm1, 'd', 'e', True),
+        self.assertEqual(_pair_members_to_new_node(3, r[3], r[4], 5, True),
                          (2, 1))
 
     def test_pair_members_to_new_node_zero_branch_length(self):
@@ -193,15 +199,17 @@ class NjTests(TestCase):
         # (I'm not sure how you end up with these distances between
         # three sequences), but that doesn't really matter for the sake
         # of this test
-        data = [[0, 4, 2],
-                [4, 0, 38],
-                [2, 38, 0]]
-        ids = ['a', 'b', 'c']
-        dm = DistanceMatrix(data, ids)
-        self.assertEqual(_pair_members_to_new_node(dm, 'a', 'b', True), (0, 4))
+        self.assertEqual(_pair_members_to_new_node(4, 6, 42, 3, True), (0, 4))
         # this makes it clear why negative branch lengths don't make sense...
         self.assertEqual(
-            _pair_members_to_new_node(dm, 'a', 'b', False), (-16, 20))
+            _pair_members_to_new_node(4, 6, 42, 3, False), (-16, 20))
+
+    def test_to_newick(self):
+        tree = TreeNode.read(StringIO("(a:1,(b:2.5,c:0.125):3,d:4);"))
+        self.assertEqual(_to_newick(tree),
+                         "(a:1.000000, (b:2.500000, c:0.125000):3.000000, "
+                         "d:4.000000);")
+
 
 if __name__ == "__main__":
     main()
@@ -8,6 +8,9 @@
 
 from __future__ import absolute_import, division, print_function
 
+import pickle
+import sys
+import tempfile
 from unittest import TestCase, main
 
 import numpy as np
@@ -73,6 +76,35 @@ class TreeTests(TestCase):
             self.assertEqual(a.name, b.name)
             self.assertEqual(a.length, b.length)
 
+    def test_copy_extra_attributes(self):
+        class LabeledNode(TreeNode):
+            __slots__ = ('label',)
+
+        t = LabeledNode('e', children=[
+            LabeledNode('c', children=[LabeledNode('a'), LabeledNode('b')]),
+            LabeledNode('d')])
+        t.label = 'top'
+        t.find('c').support = [0.9]
+        cp = t.copy()
+
+        self.assertIsInstance(cp, LabeledNode)
+        self.assertEqual(cp.label, 'top')
+        self.assertFalse(hasattr(cp.find('d'), 'label'))
+        self.assertEqual(cp.find('c').support, [0.9])
+        self.assertIsNot(cp.find('c').support, t.find('c').support)
+
+    def test_slots(self):
+        node = TreeNode('a', length=1.0)
+        self.assertEqual(node.__dict__, {})
+
+        # other attributes are still supported
+        node.support = 0.5
+        self.assertEqual(node.__dict__, {'support': 0.5})
+
+        t = pickle.loads(pickle.dumps(self.simple_t, -1))
+        self.assertEqual(str(t), str(self.simple_t))
+        self.assertIs(t.children[0].parent, t)
+
     def test_append(self):
         """Append a node to a tree"""
         second_tree = TreeNode.read(StringIO(u"(x,y)z;"))
@@ -297,8 +329,8 @@ class TreeTests(TestCase):
         self.assertNotEqual(root._tip_cache, {})
         self.assertNotEqual(root._non_tip_cache, {})
         root.invalidate_caches()
-        self.assertEqual(root._tip_cache, {})
-        self.assertEqual(root._non_tip_cache, {})
+        self.assertIsNone(root._tip_cache)
+        self.assertIsNone(root._non_tip_cache)
 
     def test_invalidate_attr_caches(self):
         tree = TreeNode.read(StringIO(u"((a,b,(c,d)e)f,(g,h)i)root;"))
@@ -361,7 +393,7 @@ class TreeTests(TestCase):
         exp_non_tip_cache_keys = set(['c', 'f'])
         tip_a = t.children[0].children[0]
         tip_a.create_caches()
-        self.assertEqual(tip_a._tip_cache, {})
+        self.assertIsNone(tip_a._tip_cache)
         self.assertEqual(set(t._tip_cache), exp_tip_cache_keys)
         self.assertEqual(set(t._non_tip_cache), exp_non_tip_cache_keys)
         self.assertEqual(t._non_tip_cache['f'], [t.children[1], t.children[2]])
@@ -544,6 +576,75 @@ class TreeTests(TestCase):
         exp = '(G:3.0,M:3.7);\n'
         self.assertEqual(obs, exp)
 
+    def test_shear_prune_order(self):
+        # children reached through collapsed nodes go last, as with prune
+        t = TreeNode.read(StringIO(u"((a:1,b:2)c:3,(d:1,e:1)f:1,g)root;"))
+        self.assertEqual(str(t.shear(['a', 'd', 'e', 'g'])),
+                         "((d:1.0,e:1.0)f:1.0,g,a:4.0)root;\n")
+
+        # the root is not collapsed
+        self.assertEqual(str(t.shear(['a', 'b'])),
+                         "((a:1.0,b:2.0)c:3.0)root;\n")
+
+        with self.assertRaisesRegexp(ValueError, 'subset'):
+            t.shear(['a', 'x'])
+
+    def test_shear_renamed_tips(self):
+        t = TreeNode.read(StringIO(u"((a:1,b:2)c:3,(d:1,e:1)f:1)root;"))
+        self.assertEqual(str(t.shear(['a', 'd'])), "(a:4.0,d:2.0)root;\n")
+
+        t.find('a').name = 'x'
+        t.find('d').length = 5
+        self.assertEqual(str(t.shear(['x', 'd'])), "(x:4.0,d:6.0)root;\n")
+        with self.assertRaisesRegexp(ValueError, 'subset'):
+            t.shear(['a', 'd'])
+
+    def test_shear_matches_prune(self):
+        rng = np.random.RandomState(0)
+        names = ['t%d' % i for i in range(60)]
+        nodes = [TreeNode(name, length=float(i % 3) or None)
+                 for i, name in enumerate(names)]
+        while len(nodes) > 1:
+            i = rng.randint(len(nodes) - 1)
+            k = rng.randint(1, 4)
+            parent = TreeNode('n%d' % len(nodes),
+                              length=rng.choice([None, 0.5]),
+                              children=nodes[i:i + k])
+            parent.support = [k]
+            nodes[i:i + k] = [parent]
+        tree = nodes[0]
+
+        for size in (1, 2, 5, 30, 60):
+            keep = set(rng.choice(names, size, replace=False))
+            exp = tree.deepcopy()
+            while len(list(exp.tips())) != len(keep):
+                for n in list(exp.tips()):
+                    if n.name not in keep:
+                        n.parent.remove(n)
+            exp.prune()
+
+            obs = tree.shear(keep)
+            self.assertEqual(str(obs), str(exp))
+            self.assertEqual([getattr(n, 'support', None)
+                              for n in obs.traverse()],
+                             [getattr(n, 'support', None)
+                              for n in exp.traverse()])
+
+    def test_shear_many(self):
+        t = TreeNode.read(StringIO(u'((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        obs = [str(s) for s in t.shear_many([['G', 'M'], ['H', 'G'], []])]
+        self.assertEqual(obs, ['(G:3.0,M:3.7);\n', '((H:1.0,G:1.0):2.0);\n',
+                               ';\n'])
+
+        # the index is rebuilt once the tree changes
+        t.find('H').append(TreeNode('X', 1.0))
+        self.assertEqual(str(t.shear(['X', 'M'])), '(X:4.0,M:3.7);\n')
+
+        # nodes are copies
+        for sheared in t.shear_many([['X', 'G', 'R']]):
+            for node in sheared.traverse(include_self=True):
+                self.assertNotIn(node, list(t.traverse(include_self=True)))
+
     def test_compare_tip_distances(self):
         t = TreeNode.read(StringIO(u'((H:1,G:1):2,(R:0.5,M:0.7):3);'))
         t2 = TreeNode.read(StringIO(u'(((H:1,G:1,O:1):2,R:3):1,X:4);'))
@@ -600,6 +701,30 @@ class TreeTests(TestCase):
         obs = t.tip_tip_distances(endpoints=nodes)
         self.assertEqual(obs, exp)
 
+    def test_tip_tip_distances_endpoints_out_of_order(self):
+        t = TreeNode.read(StringIO(
+            u'((H:0.1,G:0.7):0.3,(R:0.35,(M:0.9,Q:0.11):0.7):0.13);'))
+        names = ['Q', 'H', 'R', 'G', 'M']
+        obs = t.tip_tip_distances(endpoints=names)
+        nptest.assert_array_equal(obs.data, obs.data.T)
+        for a in names:
+            for b in names:
+                exp = t.find(a).distance(t.find(b)) if a != b else 0.0
+                self.assertAlmostEqual(obs[a, b], exp)
+        self.assertAlmostEqual(t.compare_tip_distances(t), 0.0)
+
+    def test_tip_tip_distances_out(self):
+        t = TreeNode.read(StringIO(u'((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        exp = t.tip_tip_distances()
+        with tempfile.NamedTemporaryFile() as fh:
+            out = np.memmap(fh, dtype=float, mode='w+', shape=(4, 4))
+            obs = t.tip_tip_distances(out=out, n_jobs=2)
+            self.assertEqual(obs, exp)
+            self.assertTrue(np.may_share_memory(obs.data, out))
+            out.flush()
+            nptest.assert_equal(np.fromfile(fh.name).reshape(4, 4),
+                                exp.data)
+
     def test_tip_tip_distances_non_tip_endpoints(self):
         t = TreeNode.read(StringIO(u'((H:1,G:1)foo:2,(R:0.5,M:0.7):3);'))
         with self.assertRaises(ValueError):
@@ -834,6 +959,98 @@ class TreeTests(TestCase):
 
         self.assertEqual(t_ids.intersection(obs_ids), set())
 
+    def test_deep_ladder_tree(self):
+        # deeper than the recursion limit, so nothing may recurse per level
+        depth = sys.getrecursionlimit() * 2
+        root = TreeNode('n0')
+        node = root
+        for i in range(1, depth):
+            node = TreeNode('n%d' % i, length=1.0,
+                            children=[TreeNode('t%d' % i, length=1.0)],
+                            parent=node)
+            node.parent.children.append(node)
+        leaf = TreeNode('leaf', length=1.0, parent=node)
+        node.children.append(leaf)
+
+        self.assertEqual(len(list(root.postorder())), 2 * depth)
+        self.assertEqual(root.count(tips=True), depth)
+
+        obs = root.copy()
+        self.assertEqual([n.name for n in obs.preorder()],
+                         [n.name for n in root.preorder()])
+
+        obs = leaf.unrooted_copy()
+        self.assertEqual(obs.name, 'root')
+        self.assertEqual(obs.count(), 2 * depth)
+
+        # the old root keeps a single neighbour, so it becomes a tip
+        obs = root.root_at('n%d' % (depth // 2))
+        self.assertEqual(obs.count(tips=True), depth + 1)
+
+        # a chain of single children keeps the drawing a single line
+        chain = TreeNode('c0')
+        node = chain
+        for i in range(1, depth):
+            node.append(TreeNode('c%d' % i))
+            node = node.children[0]
+        self.assertEqual(len(chain.ascii_art().splitlines()), 1)
+
+    def test_traversal_order_cache(self):
+        t = TreeNode.read(StringIO(u"((a,b)c,(d,e)f)root;"))
+        self.assertEqual([n.name for n in t.preorder()],
+                         ['root', 'c', 'a', 'b', 'f', 'd', 'e'])
+        self.assertEqual([n.name for n in t.preorder(include_self=False)],
+                         ['c', 'a', 'b', 'f', 'd', 'e'])
+        self.assertEqual([n.name for n in t.postorder(include_self=False)],
+                         ['a', 'b', 'c', 'd', 'e', 'f'])
+
+        # changes to the topology are picked up
+        t.find('c').append(TreeNode('g'))
+        self.assertEqual([n.name for n in t.postorder()],
+                         ['a', 'b', 'g', 'c', 'd', 'e', 'f', 'root'])
+        t.remove_deleted(lambda n: n.name == 'f')
+        self.assertEqual([n.name for n in t.preorder()],
+                         ['root', 'c', 'a', 'b', 'g'])
+
+        # a detached subtree is a root of its own
+        c = t.find('c')
+        t.remove(c)
+        c.append(TreeNode('h'))
+        self.assertEqual([n.name for n in c.preorder()],
+                         ['c', 'a', 'b', 'g', 'h'])
+        self.assertEqual([n.name for n in t.preorder()], ['root'])
+
+    def test_traversal_order_cache_direct_children_edits(self):
+        def names(nodes):
+            return [n.name for n in nodes]
+
+        t = TreeNode.read(StringIO(u"((b,a)c,(e,d)f)root;"))
+        self.assertEqual(names(t.tips()), ['b', 'a', 'e', 'd'])
+
+        t.find('c').children.sort(key=lambda n: n.name)
+        self.assertEqual(names(t.tips()), ['a', 'b', 'e', 'd'])
+        self.assertEqual(str(t), "((a,b)c,(e,d)f)root;\n")
+
+        t.children.pop()
+        self.assertEqual(names(t.postorder()), ['a', 'b', 'c', 'root'])
+
+        t.find('c').children = []
+        self.assertEqual(names(t.preorder()), ['root', 'c'])
+        self.assertEqual(names(t.tips()), ['c'])
+
+        c = t.children[0]
+        c.children[:] = [TreeNode('x'), TreeNode('y')]
+        del c.children[0]
+        self.assertEqual(names(t.preorder()), ['root', 'c', 'y'])
+        self.assertEqual(str(t), "((y)c)root;\n")
+
+        # the children are still a list, and are restored by pickle and copy
+        self.assertIsInstance(t.children, list)
+        for obs in pickle.loads(pickle.dumps(t)), t.copy():
+            self.assertEqual(names(obs.preorder()), ['root', 'c', 'y'])
+            obs.children.append(TreeNode('z'))
+            self.assertEqual(names(obs.tips()), ['y', 'z'])
+
     def test_descending_branch_length(self):
         """Calculate descending branch_length"""
         tr = TreeNode.read(StringIO(u"(((A:.1,B:1.2)C:.6,(D:.9,E:.6)F:.9)G:2.4"